@@ -0,0 +1,58 @@
+import java.io.EOFException;
+import java.io.File;
+
+import org.hps.analysis.examples.PrintGeometryDriver;
+import org.hps.conditions.database.DatabaseConditionsManager;
+import org.lcsim.conditions.ConditionsManager;
+import org.lcsim.geometry.Detector;
+import org.lcsim.lcio.LCIOReader;
+
+/**
+ * Print the geometry of several detectors in one JVM.
+ *
+ * Run as single-file source program with the hps-java bin jar on the class path,
+ * java -cp hps-distribution-bin.jar PrintGeometries.java INPUT RUN DETECTOR [DETECTOR ...]
+ *
+ * Like the geoPrint.lcsim job of a single detector, the first event of the
+ * INPUT slcio file is read, its data is not used.
+ * The conditions are set up for every detector in turn and the output of the
+ * PrintGeometryDriver for each detector is preceded by a marker line
+ * "PrintGeometries: detector NAME", so it can be split up again.
+ */
+public class PrintGeometries {
+
+    public static final String MARKER = "PrintGeometries: detector ";
+
+    /** PrintGeometryDriver prints the geometry when the detector changes */
+    static class Printer extends PrintGeometryDriver {
+        void print(Detector detector) {
+            detectorChanged(detector);
+        }
+    }
+
+    public static void main(String[] args) throws Exception {
+        if (args.length < 3) {
+            System.err.println("usage: PrintGeometries INPUT RUN DETECTOR [DETECTOR ...]");
+            System.exit(1);
+        }
+        LCIOReader reader = new LCIOReader(new File(args[0]));
+        try {
+            reader.read();
+        } catch (EOFException e) {
+            System.err.println("no event in " + args[0]);
+            System.exit(1);
+        } finally {
+            reader.close();
+        }
+        int run = Integer.parseInt(args[1]);
+        DatabaseConditionsManager manager = DatabaseConditionsManager.getInstance();
+        for (int i = 2; i < args.length; i++) {
+            manager.setDetector(args[i], run);
+            Detector detector = ConditionsManager.defaultInstance()
+                .getCachedConditions(Detector.class, "compact.xml").getCachedData();
+            System.out.println(MARKER + args[i]);
+            new Printer().print(detector);
+            System.out.flush();
+        }
+    }
+}
@@ -2,11 +2,22 @@
 import typer
 
 from pathlib import Path
+from typing import List
 import subprocess
 import os
 from ._write import write_mapping
 from ._cli import app
 
+GLOBAL_HEADER = ['sensor',
+                 'hpsx', 'hpsy', 'hpsz',
+                 'svtx', 'svty', 'svtz',
+                 'ux', 'uy', 'uz',
+                 'vx', 'vy', 'vz',
+                 'wx', 'wy', 'wz']
+
+# line printed by PrintGeometries.java before the geometry of each detector
+BATCH_MARKER = 'PrintGeometries: detector '
+
 
 @app.command(
     short_help="dump coordinates and orientations of sensors in the global frame",
@@ -15,10 +26,13 @@ This is done by running a specific driver in hps-java and then processing its ou
 Since we are running hps-java there are unfortunately many required inputs.
 
 Run numbers: 2015 use 5772, 2016 use 7800, 2019 use 10716, and 2021 use 14166.
+
+Several detectors can be given, they are all loaded in one JVM and
+written to one CSV file per detector.
 """
 )
 def global_coord(
-    detname: str = typer.Argument(..., help='name of detector to dump'),
+    detnames: List[str] = typer.Argument(..., help='names of detectors to dump, several detectors are run in one JVM'),
     input_file: Path = typer.Argument(
         ..., help='input slcio file to "run over", data within this file is never used just needs '
         'to have at least one event in it so hps-java can get to the detector loading stage of processing.'),
@@ -31,7 +45,9 @@ def global_coord(
          'hps-distribution' / '5.2-SNAPSHOT' / 'hps-distribution-5.2-SNAPSHOT-bin.jar'),
         help='java bin jar to use to run geometry printer'
     ),
-    output_file: str = typer.Option(None, help='output file to write data to, uses detector name by default')
+    output_file: str = typer.Option(None, help='output file to write data to, uses detector name by default'),
+    output_dir: Path = typer.Option(Path('.'), help='directory to write the files named after the detectors to'),
+    log_file: Path = typer.Option(None, help='file to write the java log to, uses the first output file with .log extension by default')
 ):
     """dump coordinates of sensors in global frame
 
@@ -73,12 +89,13 @@ def global_coord(
     Parameters
     ----------
 
-    detname : str
-        The name of the detector to load
+    detnames : List[str]
+        The names of the detectors to load
     input_file : Path
         the driver does not look at any
         of the events in the slcio file so it just needs to
         be /any/ slcio file with at least one event in it.
+        This holds for both modes.
     run_number : int
         The run number needs to be a valid run number for that year
         so that hps-java can pull down condition
@@ -89,72 +106,266 @@ def global_coord(
         hps-java master for awhile so this does not need to
         be incredibly recent. The default is the path to the 5.2-SNAPSHOT
         located in the user's home maven repository.
+    output_file : str, optional
+        only for a single detector, '{detname}-global.csv' in output_dir by default
+    output_dir : Path, optional
+        directory of the files named after the detectors
+    log_file : Path, optional
+        the java log on stderr is written to this file while the output
+        on stdout is parsed line by line as java prints it
+
+    Batch Mode
+    ^^^^^^^^^^
 
+    With several detectors, java would have to start, load the jar and
+    set up the conditions for every detector. Instead PrintGeometries.java
+    is run as single-file source program (needs java 11 or later): it sets up
+    the conditions for each detector in turn within one JVM and lets the
+    PrintGeometryDriver print its geometry after a marker line naming the
+    detector. The output is split up at these markers while it is parsed. Like the
+    steering file, it reads the first event of the input file.
     """
 
-    if output_file is None:
-        # deduce default to be name of detector + extension
-        output_file = f'{detname}-global.csv'
+    if len(detnames) > 1 and output_file is not None:
+        raise ValueError('--output-file only works for a single detector, use --output-dir for several detectors')
 
-    if Path(output_file).suffix == '':
-        # no extension provided, add it manually
-        output_file += '.csv'
+    if log_file is None:
+        log_file = Path(csv_name(detnames[0], output_file, output_dir)).with_suffix('.log')
 
-    geo_print_result = subprocess.run(
-        [
+    if len(detnames) == 1:
+        command = [
             'java',
             '-XX:+UseSerialGC',
             '-Xmx3000m',
             '-jar', str(jar),
             str(Path(__file__).parent / 'geoPrint.lcsim'),
             '-i', str(input_file),
-            '-d', detname,
+            '-d', detnames[0],
             '-R', str(run_number),
             '-n', '1'
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        check=True
-    )
-
-    sensor_map = {}
-    svtFrameCount = False
-    svtFrameLine = 0
-
-    for line in geo_print_result.stdout.splitlines():
-        line = line.decode('utf-8')
-        if 'sensor' in line and ':' in line:
-            svtFrameCount = True
+        ]
+        parser = GeometryParser(detnames[0])
+    else:
+        # one JVM for all detectors, the conditions are set up for each detector in turn
+        command = [
+            'java',
+            '-XX:+UseSerialGC',
+            '-Xmx3000m',
+            '-cp', str(jar),
+            str(Path(__file__).parent / 'PrintGeometries.java'),
+            str(input_file),
+            str(run_number),
+            *detnames
+        ]
+        parser = GeometryParser()
+
+    geometries = run_geometry_printer(command, parser, log_file)
+
+    for detname in detnames:
+        if detname not in geometries:
+            raise ValueError(f'no geometry printed for detector {detname}, see {log_file}')
+        write_global(csv_name(detname, output_file, output_dir), geometries[detname])
+
+
+def run_geometry_printer(command, parser, log_file):
+    """run java and parse its output while it is running
+
+    The output of java is read line by line and handed to the parser
+    as it arrives, so the parsing overlaps with the java run and the
+    output is never held in memory. The (verbose) log on stderr is written
+    to the log file directly by the child process. The output is decoded
+    as UTF-8 independent of the locale, undecodable bytes are replaced.
+
+    Parameters
+    ----------
+    command : List[str]
+        java command printing the geometry
+    parser : GeometryParser
+        parser of the printed geometry
+    log_file : Path
+        file to write stderr of java to
+
+    Returns
+    -------
+    geometries : dict
+        sensors of each detector, see :meth:`GeometryParser.close`
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        if java fails
+    """
+    with open(log_file, 'w') as log:
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=log,
+                              encoding='utf-8', errors='replace', bufsize=1) as process:
+            try:
+                for line in process.stdout:
+                    parser.feed(line)
+            except BaseException:
+                process.kill()
+                raise
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command,
+                                                output=f'java failed, see {log_file}')
+    return parser.close()
+
+
+class GeometryParser:
+    """incremental parser of the sensors printed by the PrintGeometryDriver
+
+    Lines are fed one at a time and only the sensors parsed so far are kept.
+    Every sensor is printed as a record of several lines starting with
+
+        <name>: [ X, Y, Z] [ ux, uy, uz] [ vx, vy, vz] [ wx, wy, wz]
+
+    and ending with the position in the SVT frame, printed after its label
+
+        the SVT frame
+        [ x, y, z]
+
+    The records are recognized by these lines, not by their line numbers:
+    the transforms printed in between, log lines interleaved with the record
+    and any other output are skipped. The marker lines of PrintGeometries.java
+    switch to the next detector.
+
+    Parameters
+    ----------
+    detname : str, optional
+        detector of the lines fed before the first marker line
+    """
+
+    # label of the SVT frame position, the position follows on the next vector line
+    SVT_POSITION_LABEL = 'the SVT frame'
+
+    def __init__(self, detname=None):
+        self.geometries = {}
+        self._sensors = None if detname is None else self.geometries.setdefault(detname, {})
+        self._name = None
+        self._pending = None
+        self._svt_label = False
+
+    def feed(self, line):
+        """parse the next line of output
+
+        Parameters
+        ----------
+        line : str
+            line printed by java
+        """
+        line = line.strip()
+        if line.startswith(BATCH_MARKER):
+            self._finish()
+            self._sensors = self.geometries.setdefault(line[len(BATCH_MARKER):].strip(), {})
+            return
+
+        line_elements = line.split()
+        if self._sensors is not None and self._is_sensor_line(line_elements):
+            self._finish()
             # line printing sensor name and coordinate position
             #   <name>: [ X, Y, Z] [ ux, uy, uz] [ vx, vy, vz] [ wx, wy, wz]
-            line_elements = line.strip().split()
             # drop colon at end of name
-            name = line_elements[0][:-1]
+            self._name = line_elements[0][:-1]
             # drop either comma or closing square bracket
-            position = [float(line_elements[i][:-1]) for i in range(2, 5)]
-            u = [float(line_elements[i][:-1]) for i in range(6, 9)]
-            v = [float(line_elements[i][:-1]) for i in range(10, 13)]
-            w = [float(line_elements[i][:-1]) for i in range(14, 17)]
-            sensor_map[name] = dict(
-                hps_position=position,
-                u=u, v=v, w=w
+            self._pending = dict(
+                hps_position=[float(line_elements[i][:-1]) for i in range(2, 5)],
+                u=[float(line_elements[i][:-1]) for i in range(6, 9)],
+                v=[float(line_elements[i][:-1]) for i in range(10, 13)],
+                w=[float(line_elements[i][:-1]) for i in range(14, 17)]
             )
-        if svtFrameCount:
-            svtFrameLine += 1
-        if svtFrameLine == 14:
-            svtFrameLine = 0
-            svtFrameCount = False
-            line_elements = line.strip().split()
-            position = [float(line_elements[i][:-1]) for i in range(1, 4)]
-            sensor_map[name]['svt_position'] = position
+            self._svt_label = False
+            return
+
+        if self._pending is None:
+            return
+        if line == self.SVT_POSITION_LABEL:
+            self._svt_label = True
+        elif self._svt_label and line.startswith('['):
+            try:
+                self._pending['svt_position'] = [float(line_elements[i][:-1]) for i in range(1, 4)]
+            except (IndexError, ValueError):
+                raise ValueError(f'expected SVT frame position of {self._name}, got "{line}"') from None
+            self._finish()
+
+    @staticmethod
+    def _is_sensor_line(line_elements):
+        """whether a line starts a sensor record, '<name>: [ X, ...' with 'sensor' in the name"""
+        return (len(line_elements) > 1 and line_elements[0].endswith(':')
+                and 'sensor' in line_elements[0] and line_elements[1] == '[')
+
+    def _finish(self):
+        """store the sensor record being parsed"""
+        if self._pending is None:
+            return
+        if 'svt_position' not in self._pending:
+            raise ValueError(f'output of sensor {self._name} ended before its SVT frame position')
+        self._sensors[self._name] = self._pending
+        self._pending = None
+        self._svt_label = False
+
+    def close(self):
+        """finish parsing
+
+        Returns
+        -------
+        geometries : dict
+            hps_position, svt_position, u, v and w of each sensor
+            for each detector
+        """
+        self._finish()
+        return self.geometries
+
+
+def csv_name(detname, output_file=None, output_dir=Path('.')):
+    """get the CSV file to write the global coordinates of a detector to
+
+    Parameters
+    ----------
+    detname : str
+        name of the detector
+    output_file : str
+        output file given by the user, None to deduce it from the detector name
+    output_dir : Path
+        directory of the deduced output file
+
+    Returns
+    -------
+    output_file : str
+        output file with '.csv' extension
+    """
+    if output_file is None:
+        # deduce default to be name of detector + extension
+        output_file = str(Path(output_dir) / f'{detname}-global.csv')
+
+    if Path(output_file).suffix == '':
+        # no extension provided, add it manually
+        output_file += '.csv'
+
+    return output_file
+
+
+def parse_geometry(lines):
+    """parse the sensor positions and orientations printed by the PrintGeometryDriver
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        lines printed by the PrintGeometryDriver for one detector
+
+    Returns
+    -------
+    sensor_map : dict
+        hps_position, svt_position, u, v and w of each sensor
+    """
+    parser = GeometryParser('')
+    for line in lines:
+        parser.feed(line)
+    return parser.close()['']
+
 
+def write_global(output_file, sensor_map):
+    """write the global coordinates of the sensors of a detector, see :meth:`parse_geometry`"""
     write_mapping(output_file, sensor_map,
-                  header=['sensor',
-                          'hpsx', 'hpsy', 'hpsz',
-                          'svtx', 'svty', 'svtz',
-                          'ux', 'uy', 'uz',
-                          'vx', 'vy', 'vz',
-                          'wx', 'wy', 'wz'],
+                  header=GLOBAL_HEADER,
                   getrow=lambda sensor, loc:
                   [sensor,
                    *loc['hps_position'],
@@ -1,5 +1,6 @@
 """Get survey data from OGP measurement files"""
 
+import time
 import typer
 from pathlib import Path
 import json
@@ -8,6 +9,19 @@ from ._cli import app
 from .._cli import typer_unpacker
 
 from . import _survey
+from . import _benchmark
+from . import _campaigns
+from . import _incremental
+from . import _watch
+from . import _synthetic
+from . import _uncertainty
+from . import _resampling
+from . import _sensitivity
+from . import _diff
+from . import _registration
+from ._parser import parse_cache
+from ._profile import profiling, print_profile, write_profile
+from ._store import FeatureStore, DEFAULT_CACHE_DIR
 
 
 @app.command()
@@ -15,18 +29,63 @@ from . import _survey
 def data(
     year: int = typer.Argument(..., help='year of detector'),
     input_file: Path = typer.Argument(..., help='file containing paths to survey data files'),
-    output_file: str = typer.Option(None, help='output file to write data to')
+    output_file: str = typer.Option(None, help='output file to write data to'),
+    cache_dir: Path = typer.Option(DEFAULT_CACHE_DIR, help='directory of the store of parsed survey data files'),
+    cache: bool = typer.Option(True, help='use the store of parsed survey data files'),
+    rebuild_cache: bool = typer.Option(False, help='parse all survey data files again and overwrite the store'),
+    incremental: bool = typer.Option(False, help='only recompute SurveyVolumes whose survey data files changed since the last run'),
+    profile: bool = typer.Option(False, help='print the time spent per stage and the file accesses of the run'),
+    profile_output: str = typer.Option(None, help='JSON file to write the profile to, implies --profile')
 ):
-    """some more explanation"""
+    """some more explanation
+
+    Parsed survey data files are kept in a store in cache_dir, keyed by the file content,
+    so later runs load them directly instead of parsing them again.
+    Use --no-cache to bypass the store and --rebuild-cache to overwrite it.
+
+    With --incremental, the SurveyVolumes are kept in {output_file}.deps.json together with the content
+    hashes of the survey data files they depend on, and only those with changed inputs are recomputed.
+
+    With --profile, the time spent parsing, constructing frames, transforming sensors and writing the XML file,
+    the files opened, lines scanned, get_coords calls and frame inversions are printed after the run.
+    --profile-output writes them to a JSON file to compare benchmark runs.
+    """
+    if profile or profile_output is not None:
+        with profiling() as profiler:
+            start = time.perf_counter()
+            get_data(year, input_file, output_file, cache_dir, cache, rebuild_cache, incremental)
+            wall_time = time.perf_counter() - start
+        report = profiler.report()
+        print_profile(report, wall_time)
+        if profile_output is not None:
+            write_profile(profile_output, report, wall_time, year=year, input_file=str(input_file),
+                          incremental=incremental, cache=cache, parse_cache=parse_cache.stats())
+            print(f'profile written to {profile_output}')
+        return
+
+    get_data(year, input_file, output_file, cache_dir, cache, rebuild_cache, incremental)
+
+
+def get_data(year, input_file, output_file=None, cache_dir=DEFAULT_CACHE_DIR, cache=True, rebuild_cache=False, incremental=False):
+    """Get survey data and write it to output_file, see `data`"""
+    if cache:
+        parse_cache.store = FeatureStore(cache_dir, rebuild=rebuild_cache)
+    else:
+        parse_cache.store = None
+
     with open(input_file) as json_file:
         survey_files = json.load(json_file)
 
     if output_file is None:
         output_file = f'{year}_survey_results.xml'
 
-    if year == 2019:
-        survey = _survey.Survey2019(survey_files)
-    else:
-        raise ValueError(f'year {year} not supported')
+    if incremental:
+        volumes, recomputed = _incremental.update_survey_volumes(year, survey_files, _incremental.state_file_name(output_file))
+        _survey.write_survey_volumes(output_file, volumes)
+        print(f'recomputed {len(recomputed)} of {len(volumes)} SurveyVolumes')
+        for name in recomputed:
+            print(f'  {name}')
+        return
 
+    survey = _survey.make_survey(year, survey_files)
     survey.print_results(output_file)
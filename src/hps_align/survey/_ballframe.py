@@ -1,10 +1,12 @@
 
 from ._utils import *
-from ._parser import Parser
+from ._parser import Parser, Feature
+from ._transform import RigidTransform
+from ._frames import Observable
 from ._cli import app
 
 
-class BallFrame:
+class BallFrame(Observable):
     """SVT uchannel ball frame class
 
     Gets ball positions from survey data file and calculates basis vectors and origin.
@@ -72,6 +74,8 @@ class BallFrame:
         else:
             raise ValueError('Invalid layer: {}'.format(layer))
 
+        self.changed()
+
     def get_ball(self, layer, ball_type):
         """Get ball coordinates for a given layer and ball type
 
@@ -106,7 +110,7 @@ class BallFrame:
         else:
             raise ValueError('Invalid layer: {}'.format(layer))
 
-        return np.array([ball['x'], ball['y'], ball['z']])
+        return location(ball)
 
     def get_midpoint(self, layer):
         """Get midpoint between hole and slot balls for a given layer
@@ -146,7 +150,7 @@ class BallFrame:
 
         basis = make_basis(vec1, vec2)
 
-        return np.array([basis[1], basis[2], basis[0]]), origin
+        return basis[..., [1, 2, 0], :], origin
 
 
 class MattBallFrame(BallFrame):
@@ -164,7 +168,16 @@ class MattBallFrame(BallFrame):
         Dictionary of L1 midpoint coordinates {'x': x, 'y': y, 'z': z}
     L3_midpoint_dict : dict
         Dictionary of L3 midpoint coordinates {'x': x, 'y': y, 'z': z}
+
+    The ball and midpoint coordinates are read from the survey data file the first time they are used.
     """
+    L1_hole_ball_dict = Feature('L1 hole ball')
+    L1_slot_ball_dict = Feature('L1 slot ball')
+    L3_hole_ball_dict = Feature('L3 hole ball')
+    L3_slot_ball_dict = Feature('L3 slot ball')
+    L1_midpoint_dict = Feature('Step:  5', 20)
+    L3_midpoint_dict = Feature('Step:  6', 20)
+
     def __init__(self, input_file=None):
         """Initialize MattBallFrame object
 
@@ -174,17 +187,11 @@ class MattBallFrame(BallFrame):
             Survey data file
         """
         self.parser = None
-        self.L1_midpoint_dict = {'x': 0, 'y': 0, 'z': 0}
-        self.L3_midpoint_dict = {'x': 0, 'y': 0, 'z': 0}
         super().__init__(input_file)
 
-        if self.parser:
-            self.L1_hole_ball_dict = self.parser.get_coords('L1 hole ball')
-            self.L1_slot_ball_dict = self.parser.get_coords('L1 slot ball')
-            self.L3_hole_ball_dict = self.parser.get_coords('L3 hole ball')
-            self.L3_slot_ball_dict = self.parser.get_coords('L3 slot ball')
-            self.L1_midpoint_dict = self.parser.get_coords('Step:  5', 20)
-            self.L3_midpoint_dict = self.parser.get_coords('Step:  6', 20)
+        if input_file is None:
+            self.L1_midpoint_dict = {'x': 0, 'y': 0, 'z': 0}
+            self.L3_midpoint_dict = {'x': 0, 'y': 0, 'z': 0}
 
     def set_midpoint(self, midpoint_coords, layer):
         """Set midpoint coordinates for a given layer
@@ -208,6 +215,8 @@ class MattBallFrame(BallFrame):
         else:
             raise ValueError('Invalid layer: {}'.format(layer))
 
+        self.changed()
+
     def get_meas_midpoint(self, layer):
         """Get midpoint coordinates for a given layer
 
@@ -228,7 +237,7 @@ class MattBallFrame(BallFrame):
         else:
             raise ValueError('Invalid layer: {}'.format(layer))
 
-        return np.array([midpoint['x'], midpoint['y'], midpoint['z']])
+        return location(midpoint)
 
     def get_matt_basis(self, volume):
         """Get basis vectors for Matt's ballframe
@@ -270,10 +279,7 @@ class MattBallFrame(BallFrame):
         origin : np.array
             Origin in Matt coordinates
         """
-        basis_matt, origin_matt = self.get_matt_basis(volume)
-        ball_basis, ball_origin = super().get_basis(volume)
-
-        origin = np.matmul(ball_origin - origin_matt, np.linalg.inv(basis_matt))
-        basis = np.matmul(ball_basis, np.linalg.inv(basis_matt))
+        ogp_matt = RigidTransform(*self.get_matt_basis(volume))
+        ogp_ball = RigidTransform(*super().get_basis(volume))
 
-        return basis, origin
+        return tuple(ogp_matt.inverse() @ ogp_ball)
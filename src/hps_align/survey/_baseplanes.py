@@ -1,10 +1,11 @@
 
 from ._utils import *
-from ._parser import Parser
+from ._parser import Parser, Feature
+from ._frames import Observable
 from ._cli import app
 
 
-class BasePlane:
+class BasePlane(Observable):
     """SVT uchannel base plane class
 
     The base planes are at the locations at which the sensors are mounted. The pins are mounted on the base planes.
@@ -20,7 +21,14 @@ class BasePlane:
         Dictionary of L2 base plane coordinates {'x': x, 'y': y, 'z': z, 'xy_angle': xy_angle, 'elevation': elevation}
     L3_base_plane_dict : dict
         Dictionary of L3 base plane coordinates {'x': x, 'y': y, 'z': z, 'xy_angle': xy_angle, 'elevation': elevation}
+
+    The base plane coordinates are read from the survey data file the first time they are used.
     """
+    L0_base_plane_dict = Feature('L0 base plane')
+    L1_base_plane_dict = Feature('L1 base plane')
+    L2_base_plane_dict = Feature('L2 base plane')
+    L3_base_plane_dict = Feature('L3 base plane')
+
     def __init__(self, input_file=None):
         """Initialize BasePlane object
 
@@ -37,10 +45,6 @@ class BasePlane:
             return
 
         self.parser = Parser(input_file)
-        self.L0_base_plane_dict = self.parser.get_coords('L0 base plane')
-        self.L1_base_plane_dict = self.parser.get_coords('L1 base plane')
-        self.L2_base_plane_dict = self.parser.get_coords('L2 base plane')
-        self.L3_base_plane_dict = self.parser.get_coords('L3 base plane')
 
     def set_base_plane_dict(self, base_plane_coords, layer):
         """Set base plane coordinates for a given layer
@@ -67,6 +71,8 @@ class BasePlane:
         else:
             raise ValueError('Invalid layer number')
 
+        self.changed()
+
     def get_base_plane(self, layer):
         """Get base plane origin coordinates and normal vector for a given layer
 
@@ -95,7 +101,25 @@ class BasePlane:
         else:
             raise ValueError('Invalid layer number')
 
-        origin = np.array([base_plane['x'], base_plane['y'], base_plane['z']])
+        origin = location(base_plane)
         normal = normal_vector(base_plane['xy_angle'], base_plane['elevation'])
 
         return origin, normal
+
+    def get_base_planes(self, layers):
+        """Get base plane origins and normal vectors of several layers
+
+        Parameters
+        ----------
+        layers : list
+            Layer numbers
+
+        Returns
+        -------
+        origins : np.array
+            Base plane origin coordinates, shape (layers, 3)
+        normals : np.array
+            Base plane normal vectors, shape (layers, 3)
+        """
+        base_planes = [self.get_base_plane(layer) for layer in layers]
+        return np.stack([origin for origin, _ in base_planes]), np.stack([normal for _, normal in base_planes])
@@ -0,0 +1,196 @@
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import typer
+
+from ._parser import Parser, BACKENDS, parse_cache
+from ._survey import make_survey
+from ._synthetic import generate_survey
+from ._cli import app
+
+# phases of the survey timed by `benchmark_survey`
+PHASES = ('parse', 'frames', 'print_results', 'end_to_end')
+
+
+def find_survey_files(paths):
+    """Collect survey data files
+
+    Parameters
+    ----------
+    paths : list
+        Survey data files or directories that are searched recursively for .txt files
+
+    Returns
+    -------
+    files : list
+        Sorted list of survey data files
+    """
+    files = set()
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.update(path.rglob('*.txt'))
+        else:
+            files.add(path)
+    return sorted(str(f) for f in files)
+
+
+def benchmark_parsers(files, backends=BACKENDS, repeat=5):
+    """Time parsing of survey data files with each parser backend
+
+    Every file is parsed without the parse cache, the best of ``repeat`` runs is kept.
+
+    Parameters
+    ----------
+    files : list
+        Survey data files to parse
+    backends : tuple
+        Parser backends to compare, see `Parser`
+    repeat : int
+        Number of times every backend parses all files
+
+    Returns
+    -------
+    results : dict
+        {backend: {'total': seconds, 'files': {file: seconds}, 'steps': number of steps}}
+    """
+    results = {}
+    for backend in backends:
+        per_file = {}
+        steps = 0
+        for input_file in files:
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                table = Parser.parse_file(input_file, backend)
+                best = min(best, time.perf_counter() - start)
+            per_file[input_file] = best
+            steps += len(table)
+        results[backend] = {'total': sum(per_file.values()), 'files': per_file, 'steps': steps}
+    return results
+
+
+@app.command()
+def bench_parser(
+    paths: List[Path] = typer.Argument(None, help='survey data files or directories to parse, defaults to survey_data'),
+    repeat: int = typer.Option(5, help='number of times every file is parsed, the best time is kept')
+):
+    """Compare the speed of the survey data parser backends
+
+    All survey data files are parsed with every backend and the best total time is printed.
+    """
+    files = find_survey_files(paths or [Path('survey_data')])
+    if len(files) == 0:
+        raise ValueError('no survey data files found in {}'.format(paths))
+
+    results = benchmark_parsers(files, repeat=repeat)
+
+    reference = results[BACKENDS[0]]['total']
+    print(f'{len(files)} files, best of {repeat}')
+    print(f'{"backend":<10} {"steps":>8} {"total [ms]":>12} {"per file [ms]":>14} {"speedup":>8}')
+    for backend, result in results.items():
+        total = result['total']
+        print(f'{backend:<10} {result["steps"]:>8} {1e3 * total:>12.3f} {1e3 * total / len(files):>14.3f} {reference / total:>8.2f}')
+
+
+def _best_time(function, repeat):
+    """Get the best time of repeat calls of function in s"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_survey(year, survey_files, repeat=5, backend='mmap'):
+    """Time the phases of getting the survey data
+
+    The phases are
+
+    * parse: parsing all survey data files without any cache
+    * frames: building the survey and computing all SurveyVolumes from already parsed files
+    * print_results: `Survey.print_results` of a survey whose features were already read
+    * end_to_end: building the survey and writing the results, including the parsing
+
+    The process-wide parse cache is cleared and its store disabled while the benchmark runs.
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    survey_files : dict
+        Paths to survey data files, see `Survey2019`
+    repeat : int
+        Number of times every phase is run, the best time is kept
+    backend : str
+        Parser backend, see `Parser`
+
+    Returns
+    -------
+    result : dict
+        {'files': number of survey data files, 'steps': number of steps, 'timings': {phase: seconds}}
+    """
+    files = sorted(set(survey_files.values()))
+    store = parse_cache.store
+    parse_cache.store = None
+    try:
+        timings = {'parse': _best_time(lambda: [Parser.parse_file(input_file, backend) for input_file in files], repeat)}
+
+        parse_cache.clear()
+        steps = sum(len(parse_cache.get(input_file, backend)) for input_file in files)
+        timings['frames'] = _best_time(lambda: make_survey(year, survey_files).survey_volumes(), repeat)
+
+        survey = make_survey(year, survey_files)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = os.path.join(tmp_dir, 'survey_results.xml')
+            timings['print_results'] = _best_time(lambda: survey.print_results(output_file), repeat)
+
+            def end_to_end():
+                parse_cache.clear()
+                make_survey(year, survey_files).print_results(output_file)
+            timings['end_to_end'] = _best_time(end_to_end, repeat)
+    finally:
+        parse_cache.clear()
+        parse_cache.store = store
+
+    return {'files': len(files), 'steps': steps, 'timings': timings}
+
+
+@app.command()
+def bench_survey(
+    input_file: Path = typer.Option('survey_data/2019_file_list.json', help='file containing paths to survey data files'),
+    year: int = typer.Option(2019, help='year of detector'),
+    steps: List[int] = typer.Option([100, 1000, 10000], help='number of steps of the synthetic reports, can be given several times'),
+    repeat: int = typer.Option(5, help='number of times every phase is run, the best time is kept'),
+    output_file: Path = typer.Option('survey_benchmark.json', help='JSON file to write the results to'),
+    seed: int = typer.Option(0, help='seed of the random number generator of the synthetic reports')
+):
+    """Time parsing, frame construction and writing of the survey data
+
+    The survey is run on the survey data files in input_file and on synthetic reports of
+    each number of steps, which start with the steps of the real files (see synthesize).
+    The timings are printed and written to output_file.
+    """
+    with open(input_file) as json_file:
+        survey_files = json.load(json_file)
+
+    results = [dict(dataset=str(input_file), **benchmark_survey(year, survey_files, repeat=repeat))]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_steps in steps:
+            synthetic_files = generate_survey(os.path.join(tmp_dir, str(n_steps)), survey_files, n_steps, seed=seed)
+            results.append(dict(dataset=f'synthetic {n_steps}', **benchmark_survey(year, synthetic_files, repeat=repeat)))
+
+    print(f'best of {repeat}, times in ms')
+    print(f'{"dataset":<36} {"files":>6} {"steps":>8}' + ''.join(f' {phase:>14}' for phase in PHASES))
+    for result in results:
+        print(f'{result["dataset"]:<36} {result["files"]:>6} {result["steps"]:>8}'
+              + ''.join(f' {1e3 * result["timings"][phase]:>14.3f}' for phase in PHASES))
+
+    with open(output_file, 'w') as json_file:
+        json.dump({'year': year, 'repeat': repeat, 'results': results}, json_file, indent=4)
@@ -0,0 +1,152 @@
+
+import csv
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List
+
+import typer
+
+from ._cli import app
+from ._parser import parse_cache
+from ._store import FeatureStore, DEFAULT_CACHE_DIR
+from ._survey import make_survey
+
+TABLE_HEADER = ['campaign', 'volume',
+                'origin_x', 'origin_y', 'origin_z',
+                'X_x', 'X_y', 'X_z',
+                'Y_x', 'Y_y', 'Y_z',
+                'Z_x', 'Z_y', 'Z_z']
+
+
+def find_file_lists(patterns):
+    """Expand glob patterns of survey file lists
+
+    Parameters
+    ----------
+    patterns : list
+        Paths or glob patterns of JSON files containing paths to survey data files
+
+    Returns
+    -------
+    file_lists : list
+        Sorted list of unique file lists
+    """
+    file_lists = set()
+    for pattern in patterns:
+        matches = glob.glob(str(pattern))
+        if len(matches) == 0:
+            raise ValueError('no file lists found for {}'.format(pattern))
+        file_lists.update(matches)
+    return sorted(file_lists)
+
+
+def campaign_name(file_list):
+    """Get campaign name of a survey file list, i.e. the file name without extension"""
+    return Path(file_list).stem
+
+
+def run_campaign(year, file_list, output_file, cache_dir=None, rebuild_cache=False):
+    """Build the survey of one campaign and write its SurveyVolumes
+
+    This is run in a worker process, so the store of parsed survey data files is configured
+    again from the arguments.
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    file_list : str
+        JSON file containing paths to survey data files
+    output_file : str
+        Output file to write the SurveyVolumes to
+    cache_dir : str
+        Directory of the store of parsed survey data files, None to not use a store
+    rebuild_cache : bool
+        Parse all survey data files again and overwrite the store
+
+    Returns
+    -------
+    volumes : np.ndarray
+        SurveyVolumes of the campaign, see `Survey2019.volume_table`
+    """
+    if cache_dir is not None:
+        parse_cache.store = FeatureStore(cache_dir, rebuild=rebuild_cache)
+    else:
+        parse_cache.store = None
+
+    with open(file_list) as json_file:
+        survey_files = json.load(json_file)
+
+    survey = make_survey(year, survey_files)
+    survey.print_results(output_file)
+    return survey.volume_table()
+
+
+def write_campaign_table(output_file, results):
+    """Write the origins and unit vectors of all campaigns to one CSV file
+
+    Parameters
+    ----------
+    output_file : str
+        Path to output CSV file
+    results : dict
+        {campaign: volumes}, see `run_campaign`
+    """
+    with open(output_file, 'w', newline='') as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(TABLE_HEADER)
+        for campaign, volumes in results.items():
+            for volume in volumes:
+                row = [campaign, volume['name']]
+                row += [str(value) for value in volume['origin']]
+                row += [str(value) for unitvec in volume['basis'] for value in unitvec]
+                csvwriter.writerow(row)
+
+
+@app.command()
+def campaigns(
+    year: int = typer.Argument(..., help='year of detector'),
+    file_lists: List[str] = typer.Argument(..., help='files containing paths to survey data files, one per campaign, glob patterns are expanded'),
+    output_dir: Path = typer.Option(Path('.'), help='directory to write the results to'),
+    table: str = typer.Option(None, help='combined table of all campaigns, defaults to {year}_survey_campaigns.csv in output_dir'),
+    jobs: int = typer.Option(None, help='number of worker processes, defaults to the number of campaigns or CPUs'),
+    cache_dir: Path = typer.Option(DEFAULT_CACHE_DIR, help='directory of the store of parsed survey data files'),
+    cache: bool = typer.Option(True, help='use the store of parsed survey data files'),
+    rebuild_cache: bool = typer.Option(False, help='parse all survey data files again and overwrite the store')
+):
+    """Get survey data of several campaigns in parallel
+
+    The survey of every campaign is built in its own worker process and written to
+    {campaign}_survey_results.xml in output_dir, where the campaign is named after its file list.
+    The origins and unit vectors of all campaigns are collected in one CSV table.
+    Campaigns that miss sensors of the other campaigns are reported as incomplete.
+    """
+    file_lists = find_file_lists(file_lists)
+    names = [campaign_name(file_list) for file_list in file_lists]
+    if len(set(names)) != len(names):
+        raise ValueError('file lists of different campaigns must have different names: {}'.format(file_lists))
+
+    os.makedirs(output_dir, exist_ok=True)
+    if table is None:
+        table = os.path.join(output_dir, f'{year}_survey_campaigns.csv')
+    if jobs is None:
+        jobs = min(len(file_lists), os.cpu_count() or 1)
+
+    store_dir = str(cache_dir) if cache else None
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {name: executor.submit(run_campaign, year, file_list,
+                                         os.path.join(output_dir, f'{name}_survey_results.xml'),
+                                         store_dir, rebuild_cache)
+                   for name, file_list in zip(names, file_lists)}
+        results = {name: future.result() for name, future in futures.items()}
+
+    write_campaign_table(table, results)
+    volume_names = {volume['name'] for volumes in results.values() for volume in volumes}
+    for name, volumes in results.items():
+        missing = sorted(volume_names - set(volumes['name'].tolist()))
+        if missing:
+            print(f'campaign {name} is incomplete, missing {", ".join(missing)}')
+    print(f'{len(results)} campaigns written to {output_dir}, combined table in {table}')
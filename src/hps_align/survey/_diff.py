@@ -0,0 +1,113 @@
+
+import csv
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import typer
+
+from ._cli import app
+from ._survey import read_survey_volumes
+from ._watch import volume_delta
+
+DIFF_HEADER = ['file', 'volume', 'origin_dx', 'origin_dy', 'origin_dz', 'shift', 'angle']
+
+
+def align_volumes(tables):
+    """Select the SurveyVolumes contained in all tables, in the order of the first table
+
+    Parameters
+    ----------
+    tables : list
+        SurveyVolumes of each file, see `read_survey_volumes`
+
+    Returns
+    -------
+    names : list
+        Names of the common SurveyVolumes
+    origins : np.array
+        Origins of the common SurveyVolumes, shape (files, volumes, 3)
+    bases : np.array
+        Bases of the common SurveyVolumes, shape (files, volumes, 3, 3)
+    missing : list
+        Names of the SurveyVolumes missing in each table
+    """
+    all_names = [table['name'].tolist() for table in tables]
+    common = set.intersection(*[set(names) for names in all_names])
+    names = [name for name in all_names[0] if name in common]
+    missing = [sorted(set().union(*all_names) - set(names_file)) for names_file in all_names]
+
+    rows = [[index[name] for name in names] for index in [{name: i for i, name in enumerate(names_file)} for names_file in all_names]]
+    origins = np.stack([table['origin'][index] for table, index in zip(tables, rows)])
+    bases = np.stack([table['basis'][index] for table, index in zip(tables, rows)])
+    return names, origins, bases, missing
+
+
+def diff_survey_volumes(tables):
+    """Compare the SurveyVolumes of several result files with those of the first file
+
+    All files and SurveyVolumes are compared at once.
+
+    Parameters
+    ----------
+    tables : list
+        SurveyVolumes of each file, see `read_survey_volumes`
+
+    Returns
+    -------
+    names : list
+        Names of the SurveyVolumes contained in all files
+    deltas : np.array
+        Change of the origins, shape (files, volumes, 3)
+    shifts : np.array
+        Distance of the origins, shape (files, volumes)
+    angles : np.array
+        Rotation angle between the bases in rad, shape (files, volumes)
+    missing : list
+        Names of the SurveyVolumes missing in each file
+    """
+    names, origins, bases, missing = align_volumes(tables)
+    reference = {'origin': origins[0], 'basis': bases[0]}
+    shifts, angles = volume_delta(reference, {'origin': origins, 'basis': bases})
+    return names, origins - origins[0], shifts, angles, missing
+
+
+def write_diff_table(output_file, files, names, deltas, shifts, angles):
+    """Write the differences of all files to one CSV file, see `diff_survey_volumes`"""
+    with open(output_file, 'w', newline='') as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(DIFF_HEADER)
+        for i, file_name in enumerate(files[1:], start=1):
+            for j, name in enumerate(names):
+                csvwriter.writerow([file_name, name] + [str(value) for value in deltas[i, j]]
+                                   + [str(shifts[i, j]), str(angles[i, j])])
+
+
+@app.command()
+def diff(
+    files: List[Path] = typer.Argument(..., help='SurveyVolume result files, the first one is the reference'),
+    output_file: str = typer.Option(None, help='CSV file to write the differences to')
+):
+    """Compare SurveyVolume result files
+
+    For every SurveyVolume contained in all files, prints the shift of the origin (um)
+    and the rotation angle of the unit vectors (mrad) with respect to the first file.
+    """
+    if len(files) < 2:
+        raise ValueError('at least two files are needed for a comparison')
+
+    tables = [read_survey_volumes(file_name) for file_name in files]
+    names, deltas, shifts, angles, missing = diff_survey_volumes(tables)
+
+    for file_name, names_missing in zip(files, missing):
+        if names_missing:
+            print(f'{file_name} has no SurveyVolumes {", ".join(names_missing)}')
+
+    print(f'{"volume":<32} ' + ' '.join(f'{Path(file_name).stem[:23]:>23}' for file_name in files[1:]))
+    print(f'{"":<32} ' + ' '.join(f'{"shift (um)":>11} {"rot (mrad)":>11}' for _ in files[1:]))
+    for j, name in enumerate(names):
+        print(f'{name:<32} ' + ' '.join(f'{shifts[i, j] * 1000:11.3f} {angles[i, j] * 1000:11.4f}' for i in range(1, len(files))))
+
+    if output_file is not None:
+        write_diff_table(output_file, [str(file_name) for file_name in files], names, deltas, shifts, angles)
+        print(f'differences written to {output_file}')
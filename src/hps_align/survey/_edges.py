@@ -2,11 +2,33 @@
 import warnings
 
 from ._utils import *
-from ._parser import Parser
+from ._parser import Parser, Feature
 from ._cli import app
 
 
 class SensorEdge:
+    """Sensor edges measured on the assembled modules
+
+    The front edges of the axial sensors and the back edges of the stereo sensors of L0-L3.
+
+    Attributes
+    ----------
+    L0_axial_frontedge_dict : dict
+        Dictionary of L0 axial front edge coordinates {'x': x, 'y': y, 'z': z, 'xy_angle': xy_angle, 'elevation': elevation}
+    L0_stereo_backedge_dict : dict
+        Dictionary of L0 stereo back edge coordinates, likewise for L1-L3
+
+    The coordinates are read from the step index of the survey data file the first time they are used,
+    so the file is read once for all edges.
+    """
+    L0_axial_frontedge_dict = Feature('L0 axial front edge')
+    L0_stereo_backedge_dict = Feature('L0 stereo back edge')
+    L1_axial_frontedge_dict = Feature('L1 axial front edge')
+    L1_stereo_backedge_dict = Feature('Step:  51', 20)
+    L2_axial_frontedge_dict = Feature('L2 axial front edge')
+    L2_stereo_backedge_dict = Feature('L2 stereo back edge')
+    L3_axial_frontedge_dict = Feature('L3 axial front edge')
+    L3_stereo_backedge_dict = Feature('L3 stereo back edge')
 
     def __init__(self, input_file=None):
         """Initialize SensorEdge object
@@ -31,98 +53,30 @@ class SensorEdge:
         self.input_file = input_file
         self.parser = Parser(input_file)
 
-    def _find_L0_axial_frontedge(self):
-        """Find L0 axial front edge coordinates in survey data file
+    def get_edge(self, layer, sensor):
+        """Get the measured edge of a sensor
 
-        Returns
-        -------
-        L0_axial_frontedge : dict
-            Dictionary of L0 axial front edge coordinates
-        """
-        L0_axial_frontedge = self.parser.find_coords(
-            self.parser.find_names(['L0 axial front edge'])['L0 axial front edge'] + 1)
-        return L0_axial_frontedge
-
-    def _find_L0_stereo_backedge(self):
-        """Find L0 stereo back edge coordinates in survey data file
-
-        Returns
-        -------
-        L0_stereo_backedge : dict
-            Dictionary of L0 stereo back edge coordinates
-        """
-        L0_stereo_backedge = self.parser.find_coords(
-            self.parser.find_names(['L0 stereo back edge'])['L0 stereo back edge'] + 1)
-        return L0_stereo_backedge
-
-    def _find_L1_axial_frontedge(self):
-        """Find L1 axial front edge coordinates in survey data file
-
-        Returns
-        -------
-        L1_axial_frontedge : dict
-            Dictionary of L1 axial front edge coordinates
-        """
-        L1_axial_frontedge = self.parser.find_coords(
-            self.parser.find_names(['L1 axial front edge'])['L1 axial front edge'] + 1)
-        return L1_axial_frontedge
-
-    def _find_L1_stereo_backedge(self):
-        """Find L1 stereo back edge coordinates in survey data file
-
-        Returns
-        -------
-        L1_stereo_backedge : dict
-            Dictionary of L1 stereo back edge coordinates
-        """
-        L1_stereo_backedge = self.parser.find_coords(
-            self.parser.find_names(['Step:  51'])['Step:  51'] + 1, 20)
-        return L1_stereo_backedge
-
-    def _find_L2_axial_frontedge(self):
-        """Find L2 axial front edge coordinates in survey data file
-
-        Returns
-        -------
-        L2_axial_frontedge : dict
-            Dictionary of L2 axial front edge coordinates
-        """
-        L2_axial_frontedge = self.parser.find_coords(
-            self.parser.find_names(['L2 axial front edge'])['L2 axial front edge'] + 1)
-        return L2_axial_frontedge
-
-    def _find_L2_stereo_backedge(self):
-        """Find L2 stereo back edge coordinates in survey data file
-
-        Returns
-        -------
-        L2_stereo_backedge : dict
-            Dictionary of L2 stereo back edge coordinates
-        """
-        L2_stereo_backedge = self.parser.find_coords(
-            self.parser.find_names(['L2 stereo back edge'])['L2 stereo back edge'] + 1)
-        return L2_stereo_backedge
-
-    def _find_L3_axial_frontedge(self):
-        """Find L3 axial front edge coordinates in survey data file
-
-        Returns
-        -------
-        L3_axial_frontedge : dict
-            Dictionary of L3 axial front edge coordinates
-        """
-        L3_axial_frontedge = self.parser.find_coords(
-            self.parser.find_names(['L3 axial front edge'])['L3 axial front edge'] + 1)
-        return L3_axial_frontedge
-
-    def _find_L3_stereo_backedge(self):
-        """Find L3 stereo back edge coordinates in survey data file
+        Parameters
+        ----------
+        layer : int
+            Layer number (0-3)
+        sensor : str
+            'axial' for the front edge or 'stereo' for the back edge
 
         Returns
         -------
-        L3_stereo_backedge : dict
-            Dictionary of L3 stereo back edge coordinates
+        point : np.array
+            Point on the edge in OGP (or other global) coordinates
+        direction : np.array
+            Direction of the edge in OGP (or other global) coordinates
         """
-        L3_stereo_backedge = self.parser.find_coords(
-            self.parser.find_names(['L3 stereo back edge'])['L3 stereo back edge'] + 1)
-        return L3_stereo_backedge
+        if layer not in range(4):
+            raise ValueError('Invalid layer: {}'.format(layer))
+        if sensor == 'axial':
+            edge = getattr(self, f'L{layer}_axial_frontedge_dict')
+        elif sensor == 'stereo':
+            edge = getattr(self, f'L{layer}_stereo_backedge_dict')
+        else:
+            raise ValueError('Invalid sensor: {}'.format(sensor))
+
+        return location(edge), normal_vector(edge['xy_angle'], edge['elevation'])
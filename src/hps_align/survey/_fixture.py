@@ -2,11 +2,13 @@
 import numpy as np
 
 from ._utils import *
-from ._parser import Parser
+from ._parser import Parser, Feature
+from ._transform import RigidTransform
+from ._frames import Observable, memoized
 from ._cli import app
 
 
-class Fixture:
+class Fixture(Observable):
     """Fixture for measuring sensors
 
     The fixture is used to measure the sensors. It consists of a base plane, a ball frame and a pin frame.
@@ -35,7 +37,16 @@ class Fixture:
         Dictionary of pin coordinates {'x': x, 'y': y, 'z': z}, slot side
     axipin_dict : dict
         Dictionary of pin coordinates {'x': x, 'y': y, 'z': z}, hole side
+
+    The coordinates are read from the survey data file the first time they are used.
     """
+    oriball_dict = Feature('oriball')
+    diagball_dict = Feature('diagball')
+    axiball_dict = Feature('axiball')
+    base_plane_dict = Feature('fixture plane')
+    oripin_dict = Feature('oripin')
+    axipin_dict = Feature('axipin')
+
     def __init__(self, input_file=None):
         if input_file is None:
             self.oriball_dict = {'x': 0, 'y': 0, 'z': 0}
@@ -49,14 +60,6 @@ class Fixture:
 
         self.parser = Parser(input_file)
 
-        if self.parser:
-            self.oriball_dict = self.parser.get_coords('oriball')
-            self.diagball_dict = self.parser.get_coords('diagball')
-            self.axiball_dict = self.parser.get_coords('axiball')
-            self.base_plane_dict = self.parser.get_coords('fixture plane')
-            self.oripin_dict = self.parser.get_coords('oripin')
-            self.axipin_dict = self.parser.get_coords('axipin')
-
     def set_ball(self, ball_coords, type):
         """Set fixture ball coordinates for a given layer and ball type
 
@@ -81,6 +84,8 @@ class Fixture:
         else:
             raise ValueError('Invalid ball type: {}'.format(type))
 
+        self.changed()
+
     def get_ball(self, type):
         """Get fixture ball coordinates from survey data file
 
@@ -103,8 +108,9 @@ class Fixture:
             ball = self.axiball_dict
         else:
             raise ValueError('Invalid ball type: {}'.format(type))
-        return np.array([ball['x'], ball['y'], ball['z']])
+        return location(ball)
 
+    @memoized
     def get_ball_basis(self):
         """Get basis vectors for fixture
 
@@ -135,6 +141,8 @@ class Fixture:
 
         self.base_plane_dict = base_plane_coords
 
+        self.changed()
+
     def get_base_plane(self):
         """Get base plane coordinates.
 
@@ -147,7 +155,7 @@ class Fixture:
         normal : np.array
             Normal vector of base plane in OGP (or other global) coordinates
         """
-        origin = np.array([self.base_plane_dict['x'], self.base_plane_dict['y'], self.base_plane_dict['z']])
+        origin = location(self.base_plane_dict)
         normal = normal_vector(self.base_plane_dict['xy_angle'], self.base_plane_dict['elevation'])
         return origin, normal
 
@@ -173,6 +181,8 @@ class Fixture:
         else:
             raise ValueError('Invalid pin type: {}'.format(type))
 
+        self.changed()
+
     def get_pin(self, type):
         """Get pin coordinates.
 
@@ -193,8 +203,9 @@ class Fixture:
             pin = self.axipin_dict
         else:
             raise ValueError('Invalid pin type: {}'.format(type))
-        return np.array([pin['x'], pin['y'], pin['z']])
+        return location(pin)
 
+    @memoized
     def get_pin_basis(self):
         """Get basis vectors for pin frame
 
@@ -219,6 +230,7 @@ class Fixture:
 
         return basis, origin
 
+    @memoized
     def get_pin_in_ball(self):
         """Get basis vectors for pin frame in fixture ball coordinates
 
@@ -229,15 +241,36 @@ class Fixture:
         origin : np.array
             Origin in fixture ball frame
         """
-        pin_basis, pin_origin = self.get_pin_basis()
-        ball_basis, ball_origin = self.get_ball_basis()
-
-        basis = np.matmul(pin_basis, np.linalg.inv(ball_basis))
-        origin = pin_origin - ball_origin
-        origin = np.matmul(origin, np.linalg.inv(ball_basis))
+        ogp_pin = RigidTransform(*self.get_pin_basis())
+        ogp_ball = RigidTransform(*self.get_ball_basis())
 
-        return basis, origin
+        return tuple(ogp_ball.inverse() @ ogp_pin)
 
+    @memoized
     def get_ball_in_pin(self):
-        basis, origin = self.get_pin_in_ball()
-        return np.linalg.inv(basis), -np.matmul(origin, np.linalg.inv(basis))
+        """Get basis vectors for fixture ball frame in pin frame coordinates
+
+        Returns
+        -------
+        basis : np.array
+            Basis vectors in fixture pin frame
+        origin : np.array
+            Origin in fixture pin frame
+        """
+        return tuple(RigidTransform(*self.get_pin_in_ball()).inverse())
+
+    def register_frames(self, frames, name):
+        """Register the fixture frames in a frame graph
+
+        The ball frame '{name} ball' and the pin frame '{name} pin' are registered
+        in the coordinate system of the measurement '{name} ogp'.
+
+        Parameters
+        ----------
+        frames : FrameGraph
+            Frame graph of the survey
+        name : str
+            Name of the fixture, prefix of the frame names
+        """
+        frames.add_edge(f'{name} ogp', f'{name} ball', self.get_ball_basis, sources=[self])
+        frames.add_edge(f'{name} ogp', f'{name} pin', self.get_pin_basis, sources=[self])
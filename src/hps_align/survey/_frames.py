@@ -0,0 +1,215 @@
+
+import functools
+from collections import deque
+
+import numpy as np
+
+from ._transform import RigidTransform
+from ._cli import app
+
+
+def _read_only(value):
+    """Make arrays of a cached result read-only, so callers cannot modify the cache"""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, tuple):
+        for item in value:
+            _read_only(item)
+    return value
+
+
+def memoized(method):
+    """Cache the result of a method of an `Observable` until its measurements change
+
+    The results are kept per object and arguments, the arguments have to be hashable.
+    Returned arrays are read-only.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        memo = self.__dict__.setdefault('_memo', {})
+        key = (method.__qualname__,) + args
+        if key not in memo:
+            memo[key] = _read_only(method(self, *args))
+        return memo[key]
+
+    return wrapper
+
+
+class Observable:
+    """Mixin for survey objects that notify others when their measurements are overridden
+
+    The set_* methods of the survey classes call `changed`, so everything derived from
+    the measurements can be dropped: the results of `memoized` methods and e.g. the cached
+    transforms of a `FrameGraph`. Measurements assigned to the attributes directly are not noticed.
+    """
+
+    def add_observer(self, callback):
+        """Call callback(self) whenever a measurement is overridden"""
+        self.__dict__.setdefault('_observers', []).append(callback)
+
+    def observe(self, *others):
+        """Drop the results of memoized methods whenever measurements of others are overridden"""
+        for other in others:
+            other.add_observer(lambda other: self.changed())
+
+    def changed(self):
+        """Drop the results of memoized methods and notify the observers"""
+        self.__dict__.pop('_memo', None)
+        for callback in self.__dict__.get('_observers', ()):
+            callback(self)
+
+
+class FrameGraph:
+    """Registry of the coordinate frames of a survey
+
+    Frames are identified by their names, e.g. 'top ball' or 'fixture pin'. Every survey object
+    registers the frames it defines as edges from a parent frame, see `add_edge`.
+    `transform` finds the path between any two frames, composes the transformations along the path
+    and caches the result. Cached transforms are dropped as soon as a measurement they depend on is
+    overridden by one of the set_* methods of the survey objects.
+
+    Attributes
+    ----------
+    edges : dict
+        {(parent, child): derive} of the registered edges
+    """
+
+    def __init__(self):
+        self.edges = {}
+        self._neighbours = {}
+        self._sources = {}
+        self._edge_cache = {}
+        self._cache = {}
+
+    def add_edge(self, parent, child, derive, sources=()):
+        """Register a frame given in a parent frame
+
+        Parameters
+        ----------
+        parent : str
+            Name of the parent frame
+        child : str
+            Name of the frame
+        derive : callable
+            Returns the (basis, origin) of child in parent, it is only called when needed
+        sources : list
+            `Observable` survey objects the frame is derived from
+        """
+        key = (parent, child)
+        if key in self.edges or (child, parent) in self.edges:
+            raise ValueError('Frames {} and {} are already connected'.format(parent, child))
+
+        self.edges[key] = derive
+        self._neighbours.setdefault(parent, []).append(child)
+        self._neighbours.setdefault(child, []).append(parent)
+        for source in sources:
+            self._sources.setdefault(id(source), []).append(key)
+            if len(self._sources[id(source)]) == 1:
+                source.add_observer(self.invalidate)
+
+    @property
+    def frames(self):
+        """Names of all registered frames"""
+        return list(self._neighbours)
+
+    def path(self, src, dst):
+        """Find the shortest path between two frames
+
+        Parameters
+        ----------
+        src : str
+            Name of the first frame
+        dst : str
+            Name of the last frame
+
+        Returns
+        -------
+        path : list
+            Names of the frames from src to dst
+        """
+        for frame in [src, dst]:
+            if frame not in self._neighbours:
+                raise KeyError('Unknown frame: {}'.format(frame))
+
+        previous = {src: None}
+        queue = deque([src])
+        while queue:
+            frame = queue.popleft()
+            if frame == dst:
+                break
+            for neighbour in self._neighbours[frame]:
+                if neighbour not in previous:
+                    previous[neighbour] = frame
+                    queue.append(neighbour)
+
+        if dst not in previous:
+            raise ValueError('No path from {} to {}'.format(src, dst))
+
+        path = [dst]
+        while path[-1] != src:
+            path.append(previous[path[-1]])
+        return path[::-1]
+
+    def edge(self, parent, child):
+        """Get a registered frame in its parent frame
+
+        Parameters
+        ----------
+        parent : str
+            Name of the parent frame
+        child : str
+            Name of the frame
+
+        Returns
+        -------
+        transform : RigidTransform
+            Frame child in frame parent
+        """
+        key = (parent, child)
+        if key not in self._edge_cache:
+            self._edge_cache[key] = RigidTransform(*self.edges[key]())
+        return self._edge_cache[key]
+
+    def transform(self, src, dst):
+        """Get a frame in another frame
+
+        Parameters
+        ----------
+        src : str
+            Name of the frame
+        dst : str
+            Name of the frame to express src in
+
+        Returns
+        -------
+        transform : RigidTransform
+            Frame src in frame dst, i.e. transforms coordinates in src to coordinates in dst
+        """
+        if (src, dst) not in self._cache:
+            path = self.path(dst, src)
+            transform = RigidTransform()
+            for parent, child in zip(path[:-1], path[1:]):
+                if (parent, child) in self.edges:
+                    transform = transform @ self.edge(parent, child)
+                else:
+                    transform = transform @ self.edge(child, parent).inverse()
+            self._cache[(src, dst)] = transform, set(zip(path[:-1], path[1:])) | set(zip(path[1:], path[:-1]))
+        return self._cache[(src, dst)][0]
+
+    def invalidate(self, source=None):
+        """Drop cached transforms
+
+        Parameters
+        ----------
+        source : Observable
+            Survey object whose measurements changed, drop everything if None
+        """
+        if source is None:
+            self._edge_cache.clear()
+            self._cache.clear()
+            return
+
+        keys = set(self._sources.get(id(source), ()))
+        for key in keys:
+            self._edge_cache.pop(key, None)
+        self._cache = {frames: cached for frames, cached in self._cache.items() if not keys & cached[1]}
@@ -0,0 +1,153 @@
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from ._survey import make_survey
+
+# bump whenever the layout of the state file or the derivation of the SurveyVolumes changes
+STATE_VERSION = 1
+
+
+def file_hash(input_file):
+    """Get content hash of a survey data file
+
+    Parameters
+    ----------
+    input_file : str
+        Path to survey data file
+
+    Returns
+    -------
+    digest : str
+        Hex digest of the sha256 hash of the file content
+    """
+    digest = hashlib.sha256()
+    with open(input_file, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def state_file_name(output_file):
+    """Get name of the state file kept next to an output file"""
+    return str(output_file) + '.deps.json'
+
+
+def load_state(state_file, year):
+    """Load SurveyVolumes of a previous run
+
+    Parameters
+    ----------
+    state_file : str
+        Path to state file
+    year : int
+        Year of detector, the state of another year is not used
+
+    Returns
+    -------
+    volumes : dict
+        {name: {'inputs': {key: [path, hash]}, 'desc': str, 'origin': list, 'basis': list}},
+        empty if there is no usable state
+    """
+    try:
+        with open(state_file) as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if state.get('version') != STATE_VERSION or state.get('year') != year:
+        return {}
+    return state.get('volumes', {})
+
+
+def save_state(state_file, year, volumes):
+    """Save SurveyVolumes and their inputs
+
+    Parameters
+    ----------
+    state_file : str
+        Path to state file
+    year : int
+        Year of detector
+    volumes : dict
+        SurveyVolumes, see `load_state`
+    """
+    state_dir = os.path.dirname(os.path.abspath(state_file))
+    # write to a temporary file first so an interrupted run never leaves a partial state
+    fd, tmp_path = tempfile.mkstemp(dir=state_dir, suffix='.json.tmp')
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump({'version': STATE_VERSION, 'year': year, 'volumes': volumes}, file, indent=1)
+        os.replace(tmp_path, state_file)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def update_survey_volumes(year, survey_files, state_file, skip_missing=False):
+    """Get SurveyVolumes, recomputing only those whose survey data files changed
+
+    Every SurveyVolume is stored in the state file together with the paths and content hashes
+    of the survey data files it depends on (see `Survey2019.volume_inputs`).
+    A SurveyVolume is only recomputed if one of these files changed, all others are taken
+    from the state file. Since the survey objects read their survey data files lazily,
+    unchanged files are not parsed.
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    survey_files : dict
+        Paths to survey data files, see `Survey2019`
+    state_file : str
+        Path to state file, it is created if it does not exist
+    skip_missing : bool
+        Leave out SurveyVolumes whose survey data files do not exist (yet) instead of failing
+
+    Returns
+    -------
+    volumes : list
+        List of SurveyVolumes in output order, see `Survey2019.survey_volume`
+    recomputed : list
+        Names of the recomputed SurveyVolumes
+    """
+    survey = make_survey(year, survey_files)
+    previous = load_state(state_file, year)
+
+    hashes = {}
+    volumes = []
+    recomputed = []
+    state = {}
+    for key in survey.volume_keys():
+        input_keys = survey.volume_inputs(*key)
+        if skip_missing and not all(os.path.isfile(survey_files[input_key]) for input_key in input_keys):
+            continue
+
+        inputs = {}
+        for input_key in input_keys:
+            path = survey_files[input_key]
+            if path not in hashes:
+                hashes[path] = file_hash(path)
+            inputs[input_key] = [path, hashes[path]]
+
+        # the name does not depend on the inputs, get it without computing the SurveyVolume
+        name = survey.volume_name(*key)
+        entry = previous.get(name)
+        if entry is not None and entry['inputs'] == inputs:
+            volume = {'name': name, 'desc': entry['desc'],
+                      'basis': np.array(entry['basis']), 'origin': np.array(entry['origin'])}
+        else:
+            volume = survey.survey_volume(*key)
+            recomputed.append(name)
+
+        volumes.append(volume)
+        state[name] = {'inputs': inputs, 'desc': volume['desc'],
+                       'origin': np.asarray(volume['origin']).tolist(), 'basis': np.asarray(volume['basis']).tolist()}
+
+    if recomputed or state.keys() != previous.keys():
+        save_state(state_file, year, state)
+    return volumes, recomputed
@@ -1,8 +1,10 @@
 
 import numpy as np
 
-from ._parser import Parser
+from ._parser import Parser, Feature
 from ._fixture import *
+from ._transform import RigidTransform
+from ._frames import memoized
 from ._utils import *
 from ._cli import app
 from ._sensors import Sensor
@@ -30,56 +32,37 @@ class MattSensor(Sensor):
         Dictionary of sensor origin coordinates {'x': x, 'y': y, 'z': z}, Matt coordinates
     sensor_plane_dict : dict
         Dictionary of sensor plane coordinates {'x': x, 'y': y, 'z': z, 'xy_angle': xy_angle, 'elevation': elevation}, Matt coordinates
+    active_edge_beam_dict : dict
+        Dictionary of active edge (closer to beam) coordinates {'x': x, 'y': y, 'z': z, 'xy_angle': xy_angle, 'elevation': elevation},
+        Matt coordinates
+    active_edge_away_dict : dict
+        Dictionary of active edge (away from beam) coordinates, Matt coordinates
+    physical_edge_dict : dict
+        Dictionary of sensor physical edge coordinates, Matt coordinates
+
+    The coordinates are read from the survey data file the first time they are used.
     """
+    # OGP coordinates
+    oriball_dict = Feature('oriball')
+    diagball_dict = Feature('diagball')
+    axiball_dict = Feature('axiball')
+    # Matt coordinates
+    ball_plane_dict = Feature('Step:  4', 20)
+    sensor_origin_dict = Feature('Sensor origin')
+    # the stereo sensors of the later campaigns spell it in lower case
+    sensor_plane_dict = Feature('Sensor plane', aliases=('sensor plane',))
+    active_edge_beam_dict = Feature('Active edge beam')
+    active_edge_away_dict = Feature('Active edge away')
+    physical_edge_dict = Feature('Sensor physical edge')
+
     def __init__(self, fixture, input_file=None):
         self.parser = None
         super().__init__(fixture, input_file)
 
-        if self.parser:
-            # OGP coordinates
-            self.oriball_dict = self.parser.get_coords('oriball')
-            self.diagball_dict = self.parser.get_coords('diagball')
-            self.axiball_dict = self.parser.get_coords('axiball')
-            # Matt coordinates
-            self.ball_plane_dict = self.parser.get_coords('Step:  4', 20)
-            self.sensor_origin_dict = self.parser.get_coords('Sensor origin')
-            self.sensor_plane_dict = self.parser.get_coords('Sensor plane')
-
-    def _find_sensor_active_edge_beam(self):
-        """Find sensor active edge (closer to beam) coordinates in survey data file
-
-        Returns
-        -------
-        sensor_active_edge : dict
-            Dictionary of sensor active edge coordinates in Matt coordinates
-        """
-        sensor_active_edge_beam = self.parser.find_coords(
-            self.parser.find_names(['Active edge beam'])['Active edge beam'] + 1)
-        return sensor_active_edge_beam
-
-    def _find_sensor_active_edge_away(self):
-        """Find sensor active edge (away from beam) coordinates in survey data file
-
-        Returns
-        -------
-        sensor_active_edge : dict
-            Dictionary of sensor active edge coordinates in Matt coordinates
-        """
-        sensor_active_edge_away = self.parser.find_coords(
-            self.parser.find_names(['Active edge away'])['Active edge away'] + 1)
-        return sensor_active_edge_away
-
-    def _find_sensor_physical_edge(self):
-        """Find sensor physical edge coordinates in survey data file
-
-        Returns
-        -------
-        sensor_physical_edge : dict
-            Dictionary of sensor physical edge coordinates in Matt coordinates
-        """
-        sensor_physical_edge = self.parser.find_coords(
-            self.parser.find_names(['Sensor physical edge'])['Sensor physical edge'] + 1)
-        return sensor_physical_edge
+        if input_file is None:
+            self.active_edge_beam_dict = {'x': 0, 'y': 0, 'z': 0, 'xy_angle': 0, 'elevation': 0}
+            self.active_edge_away_dict = {'x': 0, 'y': 0, 'z': 0, 'xy_angle': 0, 'elevation': 0}
+            self.physical_edge_dict = {'x': 0, 'y': 0, 'z': 0, 'xy_angle': 0, 'elevation': 0}
 
     def get_sensor_origin(self):
         """Get sensor origin coordinates
@@ -89,7 +72,7 @@ class MattSensor(Sensor):
         origin : np.array
             Sensor origin in Matt coordinates
         """
-        return np.array([self.sensor_origin_dict['x'], self.sensor_origin_dict['y'], self.sensor_origin_dict['z']])
+        return location(self.sensor_origin_dict)
 
     def get_sensor_normal(self):
         """Get sensor normal vector
@@ -101,6 +84,7 @@ class MattSensor(Sensor):
         """
         return normal_vector(self.sensor_plane_dict["xy_angle"], self.sensor_plane_dict["elevation"])
 
+    @memoized
     def get_matt_basis(self):
         """Get basis vectors for Matt sensor
 
@@ -116,8 +100,9 @@ class MattSensor(Sensor):
         vec2 = normal_vector(self.ball_plane_dict["xy_angle"], self.ball_plane_dict["elevation"])
         basis = make_basis(vec1, vec2)
 
-        return np.array([basis[0], -basis[2], basis[1]]), origin
+        return np.stack([basis[..., 0, :], -basis[..., 2, :], basis[..., 1, :]], axis=-2), origin
 
+    @memoized
     def matt_to_ball(self):
         """Get transformation matrix from Matt to fixture ballframe
 
@@ -128,11 +113,12 @@ class MattSensor(Sensor):
         transformation : np.array
             Transformation matrix from Matt coordinates to fixture ballframe
         """
-        ball_basis = self.get_ball_basis()[0]
-        matt_basis = self.get_matt_basis()[0]
+        ogp_ball = RigidTransform(*self.get_ball_basis())
+        ogp_matt = RigidTransform(*self.get_matt_basis())
 
-        return np.matmul(matt_basis, np.linalg.inv(ball_basis))
+        return (ogp_ball.inverse() @ ogp_matt).basis
 
+    @memoized
     def get_sensor_origin_ballframe(self):
         """Get sensor origin coordinates in fixture ballframe
 
@@ -142,8 +128,9 @@ class MattSensor(Sensor):
             Sensor origin in fixture ballframe
         """
         origin = self.get_sensor_origin()  # in matt coords
-        return np.matmul(origin, self.matt_to_ball())
+        return RigidTransform(self.matt_to_ball()).rotate(origin)
 
+    @memoized
     def get_sensor_normal_ballframe(self):
         """Get sensor normal in fixture ballframe
 
@@ -153,7 +140,7 @@ class MattSensor(Sensor):
             Sensor normal in fixture ballframe
         """
         normal = self.get_sensor_normal()  # in matt coords
-        return np.matmul(normal, self.matt_to_ball())
+        return RigidTransform(self.matt_to_ball()).rotate(normal)
 
     def get_active_edge_dir(self):
         """Get sensor active edge direction in matt coordinates
@@ -163,10 +150,9 @@ class MattSensor(Sensor):
         direction : np.array
             Sensor active edge direction in Matt coordinates
         """
-        active_edge_dict = self._find_sensor_active_edge_beam()  # in matt coords
-        direction = normal_vector(active_edge_dict['xy_angle'], active_edge_dict['elevation'])
-        return direction
+        return normal_vector(self.active_edge_beam_dict['xy_angle'], self.active_edge_beam_dict['elevation'])
 
+    @memoized
     def get_strip_direction_ballframe(self):
         """Get sensor strip direction in fixture ballframe
 
@@ -176,14 +162,14 @@ class MattSensor(Sensor):
             Sensor strip direction in fixture ballframe
         """
         strip_direction = self.get_active_edge_dir()  # in matt coords
-        strip_direction = np.matmul(strip_direction, self.matt_to_ball())  # in fixture ballframe
+        strip_direction = RigidTransform(self.matt_to_ball()).rotate(strip_direction)  # in fixture ballframe
         basis = self.fixture.get_pin_in_ball()[0]  # in fixture ballframe
-        # basis x vector points away from slot pin
-        if np.dot(strip_direction, basis[0]) < 0:
-            # strip direction needs to point away from slot pin
-            strip_direction = -strip_direction
-        return -strip_direction
+        # basis x vector points away from slot pin,
+        # strip direction needs to point away from slot pin
+        away = np.sum(strip_direction * basis[..., 0, :], axis=-1, keepdims=True) >= 0
+        return np.where(away, -strip_direction, strip_direction)
 
+    @memoized
     def get_strip_direction_pinframe(self):
         """Get sensor strip direction in fixture pinframe
 
@@ -192,11 +178,10 @@ class MattSensor(Sensor):
         direction : np.array
             Sensor strip direction in fixture pinframe
         """
-        strip_direction = self.get_strip_direction_ballframe()  # in fixture ballframe
-        ball_in_pin_basis = self.fixture.get_ball_in_pin()[0]  # ball to pin
-
-        return np.matmul(strip_direction, ball_in_pin_basis)
+        pin_ball = RigidTransform(*self.fixture.get_ball_in_pin())  # ball to pin
+        return pin_ball.rotate(self.get_strip_direction_ballframe())
 
+    @memoized
     def get_sensor_basis_pinframe(self):
         """Get sensor basis vectors in fixture pinframe
 
@@ -212,6 +197,20 @@ class MattSensor(Sensor):
         strip_direction = self.get_strip_direction_pinframe()  # in fixture pinframe
 
         basis = make_basis(normal, strip_direction)
-        basis = np.array([basis[2], basis[1], basis[0]])
+        basis = basis[..., [2, 1, 0], :]
 
         return basis, origin
+
+    def register_frames(self, frames, name, pin_frame):
+        """Register the sensor frame in a frame graph
+
+        Parameters
+        ----------
+        frames : FrameGraph
+            Frame graph of the survey
+        name : str
+            Name of the sensor frame
+        pin_frame : str
+            Name of the pin frame the sensor is mounted on, it corresponds to the fixture pin frame
+        """
+        frames.add_edge(pin_frame, name, self.get_sensor_basis_pinframe, sources=[self, self.fixture])
@@ -1,27 +1,461 @@
 
+import io
 import math
+import mmap
+import os
+import re
+
+import numpy as np
+
+from ._store import FeatureStore
+from ._profile import profiler
 from ._cli import app
 
 
+_STEP_HEADER = re.compile(r'^\s*Step:\s+(\d+)')
+_STEP_NAME = re.compile(r'^\s*Step:\s+(\d+)\s*$')
+_MEASUREMENT = re.compile(r'^\s+([A-Za-z][A-Za-z0-9 \-/]*?)\s+([+-]\d+\.\d+(?:\s+[+-]\d+\.\d+)*)')
+
+# measured quantities kept in the step table, labels as given in the survey data file
+QUANTITIES = {'X Location': 'x', 'Y Location': 'y', 'Z Location': 'z',
+              'XY Angle': 'xy_angle', 'Elevation': 'elevation', 'Diameter': 'diameter'}
+COLUMNS = ('actual', 'nominal', 'upper', 'lower')
+
+# byte-level scanner of the 'mmap' backend, matches step headers, comments, feature types and
+# measurement rows of the quantities above in a single pass over the whole file.
+# Every alternative starts with a literal so the regular expression engine can skip ahead quickly,
+# group 1 is the step number, 2 the comment, 3 the feature type, 4 and following the values of QUANTITIES
+_VALUES = rb'[ \t]+([+-]\d+\.\d+(?:[ \t]+[+-]\d+\.\d+)*)'
+_SCANNER = re.compile(
+    rb'Step:[ \t]+(\d+)'
+    rb'|Comment:[^\n]*\n([^\n]*)'
+    rb'|Prompt:[^\n]*\n(?:[ \t\r]*\n)*(?![ \t]*Step:)([^\n]*)'
+    + b''.join(b'|' + label.encode() + _VALUES for label in QUANTITIES))
+_SCANNER_LABELS = {4 + i: label for i, label in enumerate(QUANTITIES)}
+_FEATURE_END = re.compile(r'\s{2,}')
+BACKENDS = ('lines', 'mmap')
+
+_QUANTITY_INDEX = {label: i for i, label in enumerate(QUANTITIES)}
+_QUANTITY_DTYPE = np.dtype([(name, 'f8') for name in QUANTITIES.values()])
+STEP_DTYPE = np.dtype([('step', 'i4'), ('comment', 'U80'), ('feature', 'U32')]
+                      + [(column, _QUANTITY_DTYPE) for column in COLUMNS])
+
+
+class ParseCache:
+    """Process-wide cache of parsed survey data files
+
+    Parsed files are keyed by their resolved path together with their modification time and size,
+    so all parsers reading the same file share one parsed result and a file that changed
+    on disk is parsed again.
+    If a `FeatureStore` is attached, files missing in the cache are loaded from the store
+    and only parsed (and then saved to the store) if their content has not been parsed before.
+
+    Parameters
+    ----------
+    store : FeatureStore
+        On-disk store of parsed files, None to always parse files missing in the cache
+
+    Attributes
+    ----------
+    store : FeatureStore
+        On-disk store of parsed files
+    hits : int
+        Number of lookups served from the cache
+    misses : int
+        Number of lookups that were not in the cache
+    loaded : int
+        Number of misses served from the store
+    """
+
+    def __init__(self, store=None):
+        self._entries = {}
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.loaded = 0
+
+    @staticmethod
+    def key(input_file):
+        """Get cache key of a survey data file
+
+        Parameters
+        ----------
+        input_file : str
+            Path to survey data file
+
+        Returns
+        -------
+        path : str
+            Resolved path of the file
+        stamp : tuple
+            Modification time and size of the file
+        """
+        path = os.path.realpath(input_file)
+        stat = os.stat(path)
+        return path, (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, input_file, backend='mmap'):
+        """Get the step table of a survey data file, parsing it if necessary
+
+        Parameters
+        ----------
+        input_file : str
+            Path to survey data file
+        backend : str
+            Parser backend used if the file has to be parsed, see `Parser`
+
+        Returns
+        -------
+        steps : np.ndarray
+            Step table, see `Parser.read_steps`
+        """
+        path, stamp = self.key(input_file)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        if self.store is None:
+            steps = Parser.parse_file(path, backend)
+        else:
+            profiler.count('files opened', 1, input_file)
+            with open(path, 'rb') as file:
+                content = file.read()
+            key = self.store.key(content)
+            steps = self.store.load(key)
+            if steps is None:
+                if profiler.enabled:
+                    profiler.count('lines scanned', content.count(b'\n'), input_file)
+                steps = Parser.parse_content(content, backend)
+                self.store.save(key, steps)
+            else:
+                self.loaded += 1
+        self._entries[path] = (stamp, steps)
+        return steps
+
+    def evict(self, input_file):
+        """Remove a survey data file from the cache
+
+        Parameters
+        ----------
+        input_file : str
+            Path to survey data file
+        """
+        self._entries.pop(os.path.realpath(input_file), None)
+
+    def clear(self):
+        """Remove all files from the cache and reset the hit/miss counts
+
+        The on-disk store is left untouched.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.loaded = 0
+
+    def stats(self):
+        """Get cache statistics
+
+        Returns
+        -------
+        stats : dict
+            Number of cached files, hits, misses and misses loaded from the store
+        """
+        return {'files': len(self._entries), 'hits': self.hits, 'misses': self.misses, 'loaded': self.loaded}
+
+    def __contains__(self, input_file):
+        return os.path.realpath(input_file) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+parse_cache = ParseCache(FeatureStore.from_env())
+
+
 class Parser:
     """Class to parse survey data files and extract relevant information
 
+    By default the survey data file is read once into an index of its steps
+    (see `index`) the first time a feature is looked up, and all further lookups
+    are served from memory. The index is taken from the process-wide `parse_cache`,
+    so parsers of the same file share one parsed result.
+    With ``indexed=False`` every lookup scans the file line by line using `find_names` and `find_coords`.
+
     Parameters
     ----------
     input_file : str
         Path to survey data file
+    indexed : bool
+        Whether to read the file once into an index of steps
+    cache : ParseCache
+        Cache of parsed files to take the index from, None to parse the file for this parser only
+    backend : str
+        How the file is read into the index, 'mmap' to scan the memory-mapped file with
+        a compiled regular expression (see `scan_steps`) or 'lines' to go through the file line by line
+        (see `read_steps`)
 
     Attributes
     ----------
     input_file : str
         Path to survey data file
+    indexed : bool
+        Whether lookups are served from the step index
+    backend : str
+        How the file is read into the index
     """
 
-    def __init__(self, input_file):
+    def __init__(self, input_file, indexed=True, cache=parse_cache, backend='mmap'):
         if input_file is None:
             raise ValueError('Invalid survey data file: {}'.format(input_file))
 
+        if backend not in BACKENDS:
+            raise ValueError('Invalid parser backend: {}'.format(backend))
+
         self.input_file = input_file
+        self.indexed = indexed
+        self.cache = cache
+        self.backend = backend
+        self._steps = None
+        self._comments = None
+
+    @staticmethod
+    def read_steps(lines):
+        """Read the steps of a survey data file into a table
+
+        Parameters
+        ----------
+        lines : iterable
+            Lines of the survey data file
+
+        Returns
+        -------
+        steps : np.ndarray
+            Structured array with one row per step (see `STEP_DTYPE`): step number, comment,
+            feature type and the actual, nominal, upper and lower values of every quantity in `QUANTITIES`.
+            Values are in the units of the file (mm, degrees), quantities not measured in a step are NaN.
+        """
+        rows = []
+        step = None
+        expect = None
+        for line in lines:
+            header = _STEP_HEADER.match(line)
+            if header:
+                step = [int(header.group(1)), '', '', {}]
+                rows.append(step)
+                expect = None
+                continue
+            if step is None:
+                continue
+
+            stripped = line.strip()
+            if expect == 'comment':
+                step[1] = stripped
+                expect = None
+            elif expect == 'feature':
+                if stripped:
+                    step[2] = _FEATURE_END.split(stripped)[0]
+                    expect = None
+            elif stripped.startswith('Comment:'):
+                expect = 'comment'
+            elif stripped.startswith('Prompt:'):
+                expect = 'feature'
+            else:
+                measurement = _MEASUREMENT.match(line)
+                if measurement and measurement.group(1) in QUANTITIES and measurement.group(1) not in step[3]:
+                    step[3][measurement.group(1)] = [float(v) for v in measurement.group(2).split()]
+
+        return Parser._step_table(rows)
+
+    @staticmethod
+    def scan_steps(buffer):
+        """Scan the steps of a survey data file into a table
+
+        Equivalent to `read_steps`, but all step headers and measurement rows are pulled
+        out of the raw bytes in one pass of a precompiled regular expression.
+
+        Parameters
+        ----------
+        buffer : bytes or mmap.mmap
+            Content of the survey data file
+
+        Returns
+        -------
+        steps : np.ndarray
+            Structured array with one row per step, see `read_steps`
+        """
+        rows = []
+        step = None
+        for match in _SCANNER.finditer(buffer):
+            start = match.start()
+            # only accept matches at the start of a line, after optional indentation like read_steps
+            indent = buffer[buffer.rfind(b'\n', 0, start) + 1:start]
+            if indent.strip():
+                continue
+
+            group = match.lastindex
+            if group == 1:
+                step = [int(match.group(1)), '', '', {}]
+                rows.append(step)
+            elif step is None:
+                continue
+            elif group == 2:
+                step[1] = match.group(2).decode().strip()
+            elif group == 3:
+                step[2] = _FEATURE_END.split(match.group(3).decode().strip())[0]
+            elif indent:
+                label = _SCANNER_LABELS[group]
+                if label not in step[3]:
+                    step[3][label] = [float(v) for v in match.group(group).split()]
+
+        return Parser._step_table(rows)
+
+    @staticmethod
+    def parse_file(input_file, backend='mmap'):
+        """Read the steps of a survey data file into a table
+
+        Parameters
+        ----------
+        input_file : str
+            Path to survey data file
+        backend : str
+            'mmap' to use `scan_steps` on the memory-mapped file, 'lines' to use `read_steps`
+
+        Returns
+        -------
+        steps : np.ndarray
+            Structured array with one row per step, see `read_steps`
+        """
+        if backend == 'lines':
+            profiler.count('files opened', 1, input_file)
+            with open(input_file, 'r') as file:
+                return Parser.read_steps(profiler.lines(file, input_file))
+        elif backend == 'mmap':
+            profiler.count('files opened', 1, input_file)
+            with open(input_file, 'rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return Parser._step_table([])
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    if profiler.enabled:
+                        profiler.count('lines scanned', buffer[:].count(b'\n'), input_file)
+                    return Parser.scan_steps(buffer)
+        else:
+            raise ValueError('Invalid parser backend: {}'.format(backend))
+
+    @staticmethod
+    def parse_content(content, backend='mmap'):
+        """Read the steps of an in-memory survey data file into a table
+
+        Parameters
+        ----------
+        content : bytes
+            Content of the survey data file
+        backend : str
+            'mmap' to use `scan_steps`, 'lines' to use `read_steps`
+
+        Returns
+        -------
+        steps : np.ndarray
+            Structured array with one row per step, see `read_steps`
+        """
+        if backend == 'lines':
+            return Parser.read_steps(io.StringIO(content.decode(), newline=None))
+        elif backend == 'mmap':
+            return Parser.scan_steps(content)
+        else:
+            raise ValueError('Invalid parser backend: {}'.format(backend))
+
+    @staticmethod
+    def _step_table(rows):
+        """Convert step rows [number, comment, feature, {label: values}] to the step table"""
+        records = []
+        for number, comment, feature, values in rows:
+            columns = [[math.nan] * len(QUANTITIES) for _ in COLUMNS]
+            for label, measured in values.items():
+                quantity = _QUANTITY_INDEX[label]
+                for column, value in zip(columns, measured):
+                    column[quantity] = value
+            records.append((number, comment, feature, *map(tuple, columns)))
+
+        return np.array(records, dtype=STEP_DTYPE)
+
+    @property
+    def index(self):
+        """Step table of the survey data file, read on first access
+
+        Returns
+        -------
+        steps : np.ndarray
+            Structured array with one row per step, see `read_steps`
+        """
+        if self._steps is None:
+            with profiler.timer('parsing'):
+                if self.cache is None:
+                    self._steps = self.parse_file(self.input_file, self.backend)
+                else:
+                    self._steps = self.cache.get(self.input_file, self.backend)
+            self._comments = {}
+            for row, comment in enumerate(self._steps['comment']):
+                self._comments.setdefault(comment, row)
+        return self._steps
+
+    def find_step(self, input_string):
+        """Find the step of a feature in the step table
+
+        The feature is given either by its step ('Step:  4') or by its comment.
+        Comments are matched exactly first, then by the first step whose comment
+        contains input_string, mirroring the first appearance search of `find_names`.
+
+        Parameters
+        ----------
+        input_string : str
+            Step or name of feature to find
+
+        Returns
+        -------
+        step : np.void
+            Row of the step table, see `read_steps`
+        """
+        steps = self.index
+
+        step_name = _STEP_NAME.match(input_string)
+        if step_name:
+            rows = np.flatnonzero(steps['step'] == int(step_name.group(1)))
+        elif input_string in self._comments:
+            rows = [self._comments[input_string]]
+        else:
+            rows = np.flatnonzero(np.char.find(steps['comment'], input_string) >= 0)
+
+        if len(rows) == 0:
+            raise KeyError('{} not found in survey data file {}'.format(input_string, self.input_file))
+        return steps[rows[0]]
+
+    @staticmethod
+    def step_coords(step, column='actual'):
+        """Convert a step to a dictionary of coordinates
+
+        Only the location and direction quantities measured in the step are included.
+
+        Parameters
+        ----------
+        step : np.void
+            Row of the step table, see `read_steps`
+        column : str
+            Value column to use ('actual', 'nominal', 'upper' or 'lower')
+
+        Returns
+        -------
+        coordinates : dict
+            Dictionary of coordinates, angles in radians
+        """
+        coordinates = {}
+        for name in ('x', 'y', 'z', 'xy_angle', 'elevation'):
+            value = float(step[column][name])
+            if not math.isnan(value):
+                coordinates[name] = math.radians(value) if name in ('xy_angle', 'elevation') else value
+
+        return coordinates
 
     def find_names(self, input_strings):
         """Find line numbers of first appearances of strings in survey data file
@@ -38,8 +472,9 @@ class Parser:
         """
         first_appearances = {}
 
+        profiler.count('files opened', 1, self.input_file)
         with open(self.input_file, 'r') as file:
-            for line_num, line in enumerate(file):
+            for line_num, line in enumerate(profiler.lines(file, self.input_file)):
                 for string in input_strings:
                     if string in line and string not in first_appearances:
                         first_appearances[string] = line_num
@@ -62,7 +497,9 @@ class Parser:
             Dictionary of coordinates
         """
         coordinates = {}
+        profiler.count('files opened', 1, self.input_file)
         with open(self.input_file, 'r') as file:
+            file = profiler.lines(file, self.input_file)
             for _ in range(line_number - 1):
                 next(file)  # Skip lines until we reach the desired starting line
 
@@ -89,6 +526,70 @@ class Parser:
         input_string : str
             Name of feature to find coordinates of
         num_lines_to_read : int
-            Number of lines to read from first appearance of input_string
+            Number of lines to read from first appearance of input_string,
+            only used if the parser is not indexed
+        pos : int
+            Position of the value in the split line, 2 selects the "Actual" column
         """
+        profiler.count('get_coords calls', 1, self.input_file)
+        if self.indexed:
+            return self.step_coords(self.find_step(input_string), COLUMNS[pos - 2])
         return self.find_coords(self.find_names([input_string])[input_string] + 1, num_lines_to_read, pos)
+
+
+class Feature:
+    """Feature of a survey data file that is resolved on first access
+
+    Used as class attribute of the survey classes, e.g. ``L0_hole_pin_dict = Feature('L0 hole pin')``.
+    The coordinates are looked up with the ``parser`` of the instance the first time the attribute
+    is accessed and then kept in the instance, so features that are never used are never looked up.
+    Assigning the attribute (e.g. in the ``set_*`` methods) overrides the coordinates from the file.
+
+    Parameters
+    ----------
+    name : str
+        Name of the feature in the survey data file, see `Parser.get_coords`
+    num_lines_to_read : int
+        Number of lines to read for the feature, see `Parser.get_coords`
+    aliases : tuple
+        Other names of the feature, tried in order if name is not found,
+        e.g. for campaigns that spell the feature differently
+    """
+
+    def __init__(self, name, num_lines_to_read=15, aliases=()):
+        self.name = name
+        self.num_lines_to_read = num_lines_to_read
+        self.aliases = tuple(aliases)
+        self.attr = None
+
+    def __set_name__(self, owner, attr):
+        self.attr = attr
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+
+        coords = self.lookup(lambda name: obj.parser.get_coords(name, self.num_lines_to_read))
+        obj.__dict__[self.attr] = coords
+        return coords
+
+    def lookup(self, find):
+        """Look up the feature by its name, then by its aliases
+
+        Parameters
+        ----------
+        find : callable
+            Looks up a name, e.g. `Parser.find_step`, raises KeyError if it is not found
+
+        Returns
+        -------
+        result : object
+            Result of find for the first name that is found
+        """
+        names = (self.name,) + self.aliases
+        for name in names[:-1]:
+            try:
+                return find(name)
+            except KeyError:
+                pass
+        return find(names[-1])
@@ -58,3 +58,28 @@ class PinFrame:
         basis = make_basis(slot_to_hole, plane_normal)
 
         return basis, hole_pin_projected
+
+    def get_bases(self, layers):
+        """Get basis vectors for the pin frames of several layers at once, see `get_basis`
+
+        Parameters
+        ----------
+        layers : list
+            Layer numbers
+
+        Returns
+        -------
+        bases : np.array
+            Basis vectors in OGP (or other global) coordinates, shape (layers, 3, 3)
+        hole_pins_projected : np.array
+            Origins in OGP (or other global) coordinates, shape (layers, 3)
+        """
+        hole_pins = self.pins.get_pins(layers, 'hole')
+        slot_pins = self.pins.get_pins(layers, 'slot')
+        plane_origins, plane_normals = self.base_planes.get_base_planes(layers)
+
+        hole_pins_projected = project_to_plane_batch(hole_pins, plane_origins, plane_normals)
+        slot_pins_projected = project_to_plane_batch(slot_pins, plane_origins, plane_normals)
+
+        bases = make_basis_batch(hole_pins_projected - slot_pins_projected, plane_normals)
+        return bases, hole_pins_projected
@@ -1,10 +1,11 @@
 
 from ._utils import *
-from ._parser import Parser
+from ._parser import Parser, Feature
+from ._frames import Observable
 from ._cli import app
 
 
-class Pin:
+class Pin(Observable):
     """SVT uchannel pin class
 
     The pins are mounted on the base planes and are used to align the sensors.
@@ -28,7 +29,18 @@ class Pin:
         Dictionary of L3 hole pin coordinates {'x': x, 'y': y, 'z': z}
     L3_slot_pin_dict : dict
         Dictionary of L3 slot pin coordinates {'x': x, 'y': y, 'z': z}
+
+    The pin coordinates are read from the survey data file the first time they are used.
     """
+    L0_hole_pin_dict = Feature('L0 hole pin')
+    L0_slot_pin_dict = Feature('L0 slot pin')
+    L1_hole_pin_dict = Feature('L1 hole pin')
+    L1_slot_pin_dict = Feature('L1 slot pin')
+    L2_hole_pin_dict = Feature('L2 hole pin')
+    L2_slot_pin_dict = Feature('L2 slot pin')
+    L3_hole_pin_dict = Feature('L3 hole pin')
+    L3_slot_pin_dict = Feature('L3 slot pin')
+
     def __init__(self, input_file=None):
         """Initialize Pin object
 
@@ -50,15 +62,6 @@ class Pin:
 
         self.parser = Parser(input_file)
 
-        self.L0_hole_pin_dict = self.parser.get_coords('L0 hole pin')
-        self.L0_slot_pin_dict = self.parser.get_coords('L0 slot pin')
-        self.L1_hole_pin_dict = self.parser.get_coords('L1 hole pin')
-        self.L1_slot_pin_dict = self.parser.get_coords('L1 slot pin')
-        self.L2_hole_pin_dict = self.parser.get_coords('L2 hole pin')
-        self.L2_slot_pin_dict = self.parser.get_coords('L2 slot pin')
-        self.L3_hole_pin_dict = self.parser.get_coords('L3 hole pin')
-        self.L3_slot_pin_dict = self.parser.get_coords('L3 slot pin')
-
     def set_pin(self, pin_coords, layer, pin_type):
         """Set pin coordinates to given values
 
@@ -107,6 +110,8 @@ class Pin:
         else:
             raise ValueError('Invalid layer number')
 
+        self.changed()
+
     def get_pin(self, layer, pin_type):
         """Get pin coordinates
 
@@ -155,4 +160,21 @@ class Pin:
         else:
             raise ValueError('Invalid layer number')
 
-        return np.array([pin['x'], pin['y'], pin['z']])
+        return location(pin)
+
+    def get_pins(self, layers, pin_type):
+        """Get pin coordinates of several layers
+
+        Parameters
+        ----------
+        layers : list
+            Layer numbers
+        pin_type : str
+            Pin type
+
+        Returns
+        -------
+        pins : np.array
+            Pin positions in OGP (or other global) coordinates, shape (layers, 3)
+        """
+        return np.stack([self.get_pin(layer, pin_type) for layer in layers])
@@ -0,0 +1,196 @@
+
+import contextlib
+import copy
+import functools
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+from ._cli import app
+
+# stages of a survey run timed by `profiler`, in the order they are printed
+STAGES = ('parsing', 'frame construction', 'sensor transforms', 'xml writing')
+# counters of a survey run, counted per survey data file where given
+COUNTERS = ('files opened', 'lines scanned', 'get_coords calls', 'frame inversions')
+
+
+class Profiler:
+    """Counters and timers of the survey package
+
+    The survey classes count their file accesses, lookups and frame inversions and time their stages with
+    the process-wide `profiler`. Nothing is recorded unless the profiler is enabled, so the
+    instrumentation costs one attribute lookup per call otherwise.
+
+    Timers can be nested. The total time of a timer includes the nested timers,
+    its self time does not, so the self times of all stages add up to the time spent in them.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether counters and timers are recorded
+    counters : dict
+        {counter: {'total': n, 'files': {input_file: n}}}, the survey data files are given by their
+        resolved path relative to the working directory
+    timers : dict
+        {stage: {'calls': n, 'total': seconds, 'self': seconds}}
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        self.timers = {}
+        self._stack = []
+
+    def reset(self):
+        """Drop all recorded counts and times"""
+        self.counters = {}
+        self.timers = {}
+        self._stack = []
+
+    def count(self, name, n=1, input_file=None):
+        """Increment a counter
+
+        Parameters
+        ----------
+        name : str
+            Name of the counter, e.g. 'files opened'
+        n : int
+            Increment
+        input_file : str
+            Survey data file the count belongs to, None if it belongs to no file
+        """
+        if not self.enabled:
+            return
+        counter = self.counters.setdefault(name, {'total': 0, 'files': {}})
+        counter['total'] += n
+        if input_file is not None:
+            # the parse cache opens files by their resolved path, count them under one name
+            input_file = os.path.relpath(os.path.realpath(input_file))
+            counter['files'][input_file] = counter['files'].get(input_file, 0) + n
+
+    def lines(self, lines, input_file=None):
+        """Count the lines of an iterable of lines while they are read, see `count`"""
+        if not self.enabled:
+            return lines
+        return self._counted(lines, input_file)
+
+    def _counted(self, lines, input_file):
+        for line in lines:
+            self.count('lines scanned', 1, input_file)
+            yield line
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """Time a stage
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage, e.g. 'parsing'
+        """
+        if not self.enabled:
+            yield
+            return
+
+        # [start, time of nested timers]
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[0]
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] += elapsed
+            timer = self.timers.setdefault(name, {'calls': 0, 'total': 0.0, 'self': 0.0})
+            timer['calls'] += 1
+            timer['total'] += elapsed
+            timer['self'] += elapsed - frame[1]
+
+    def timed(self, name):
+        """Decorator timing every call of a function as stage name, see `timer`"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def report(self):
+        """Get the recorded counts and times
+
+        Returns
+        -------
+        report : dict
+            {'counters': ..., 'timers': ...}, see the attributes
+        """
+        return {'counters': copy.deepcopy(self.counters), 'timers': copy.deepcopy(self.timers)}
+
+
+profiler = Profiler()
+
+
+@contextlib.contextmanager
+def profiling():
+    """Enable the `profiler` with fresh counters and timers, the previous state is restored afterwards"""
+    enabled = profiler.enabled
+    profiler.reset()
+    profiler.enabled = True
+    try:
+        yield profiler
+    finally:
+        profiler.enabled = enabled
+
+
+def print_profile(report, wall_time):
+    """Print the stages and counters of a profiled survey run
+
+    Parameters
+    ----------
+    report : dict
+        Report of the profiler, see `Profiler.report`
+    wall_time : float
+        Wall time of the whole run in s
+    """
+    timers = report['timers']
+    print(f'{"stage":<24} {"calls":>8} {"total [ms]":>12} {"self [ms]":>12} {"self [%]":>9}')
+    for name in list(STAGES) + sorted(set(timers) - set(STAGES)):
+        if name not in timers:
+            continue
+        timer = timers[name]
+        print(f'{name:<24} {timer["calls"]:>8} {1e3 * timer["total"]:>12.3f} {1e3 * timer["self"]:>12.3f} '
+              f'{100 * timer["self"] / wall_time if wall_time > 0 else 0:>9.1f}')
+    other = wall_time - sum(timer['self'] for timer in timers.values())
+    print(f'{"other":<24} {"":>8} {"":>12} {1e3 * other:>12.3f} {100 * other / wall_time if wall_time > 0 else 0:>9.1f}')
+    print(f'{"wall time":<24} {"":>8} {1e3 * wall_time:>12.3f}')
+
+    counters = report['counters']
+    print()
+    print(f'{"counter":<24} {"total":>10} {"files":>6} {"max per file":>13}')
+    for name in list(COUNTERS) + sorted(set(counters) - set(COUNTERS)):
+        counter = counters.get(name, {'total': 0, 'files': {}})
+        per_file = counter['files'].values()
+        print(f'{name:<24} {counter["total"]:>10} {len(per_file):>6} {max(per_file, default=0):>13}')
+
+
+def write_profile(output_file, report, wall_time, **info):
+    """Write the report of a profiled survey run to a JSON file
+
+    Parameters
+    ----------
+    output_file : str
+        Output file
+    report : dict
+        Report of the profiler, see `Profiler.report`
+    wall_time : float
+        Wall time of the whole run in s
+    info : dict
+        Further entries of the report, e.g. the year and input file of the run
+    """
+    output = dict(info, python=platform.python_version(), numpy=np.__version__, wall_time=wall_time, **report)
+    with open(output_file, 'w') as json_file:
+        json.dump(output, json_file, indent=4)
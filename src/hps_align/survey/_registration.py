@@ -0,0 +1,236 @@
+
+import csv
+import json
+from typing import List
+
+import numpy as np
+import typer
+
+from ._cli import app
+from ._ballframe import BallFrame
+from ._campaigns import find_file_lists, campaign_name
+from ._survey import make_survey
+from ._transform import RigidTransform
+from ._watch import volume_delta
+
+REGISTRATION_HEADER = ['campaign', 'frame', 'points', 'rms', 'shift', 'angle', 'frame_shift', 'frame_angle']
+
+# measured points of the ball frames, in the coordinate system of their measurement
+BALL_POINTS = {'L1 hole ball': 'L1_hole_ball_dict', 'L1 slot ball': 'L1_slot_ball_dict',
+               'L3 hole ball': 'L3_hole_ball_dict', 'L3 slot ball': 'L3_slot_ball_dict',
+               'L1 midpoint': 'L1_midpoint_dict', 'L3 midpoint': 'L3_midpoint_dict'}
+FIXTURE_POINTS = {'oriball': 'oriball_dict', 'diagball': 'diagball_dict', 'axiball': 'axiball_dict',
+                  'oripin': 'oripin_dict', 'axipin': 'axipin_dict'}
+
+
+def kabsch(source, target, weights=None):
+    """Find the best-fit rigid transformations between point sets
+
+    Solves min sum_i w_i |origin + source_i @ basis - target_i|^2 with the SVD of the
+    cross-covariance matrix (Kabsch algorithm), for all point sets at once.
+    The point sets can have leading batch dimensions, which are broadcast against each other,
+    e.g. source (K, N, 3) and target (K, N, 3) for K frames with N points each.
+
+    Parameters
+    ----------
+    source : np.array
+        Points in the local frame, shape (..., N, 3)
+    target : np.array
+        Corresponding points in the parent frame, shape (..., N, 3)
+    weights : np.array
+        Weights of the points, shape (..., N), all points weighted equally if not given
+
+    Returns
+    -------
+    transform : RigidTransform
+        Best-fit frame of source in target, basis (..., 3, 3) and origin (..., 3)
+    rms : np.array
+        Weighted root mean square distance of the transformed source and target points, shape (...)
+    """
+    source = np.asarray(source, dtype=float)
+    target = np.asarray(target, dtype=float)
+    if weights is None:
+        weights = np.ones(np.broadcast_shapes(source.shape, target.shape)[:-1])
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum(axis=-1, keepdims=True)
+
+    source_centroid = (weights[..., np.newaxis] * source).sum(axis=-2)
+    target_centroid = (weights[..., np.newaxis] * target).sum(axis=-2)
+    source_centered = source - source_centroid[..., np.newaxis, :]
+    target_centered = target - target_centroid[..., np.newaxis, :]
+
+    # cross-covariance H = S^T W T, the rotation maximizing trace(R^T H) is U V^T,
+    # with the sign of the smallest singular value flipped if that would be a reflection
+    covariance = np.swapaxes(source_centered, -1, -2) @ (weights[..., np.newaxis] * target_centered)
+    u, _, vh = np.linalg.svd(covariance)
+    sign = np.sign(np.linalg.det(u @ vh))
+    u[..., :, 2] *= np.where(sign == 0, 1, sign)[..., np.newaxis]
+    basis = u @ vh
+
+    transform = RigidTransform(basis, target_centroid - RigidTransform(basis).rotate(source_centroid))
+    residuals = transform.origin[..., np.newaxis, :] + source @ basis - target
+    rms = np.sqrt((weights * (residuals ** 2).sum(axis=-1)).sum(axis=-1))
+    return transform, rms
+
+
+def registration_frames(survey):
+    """Get the frames of a survey that are defined by measured balls
+
+    Parameters
+    ----------
+    survey : Survey
+        Survey object
+
+    Returns
+    -------
+    frames : dict
+        {frame: (object, points, derive)}, where points is {point name: attribute} of the measured
+        points and derive returns the (basis, origin) of the frame in the coordinate system of the measurement
+    """
+    uchannel = survey.uchannel
+    frames = {}
+    for volume, ballframe in [('top', uchannel.ballframe_top), ('bottom', uchannel.ballframe_bot)]:
+        # the ball frame in the OGP system, also for the MattBallFrame
+        frames[f'{volume} ball'] = ballframe, BALL_POINTS, lambda ballframe=ballframe: BallFrame.get_basis(ballframe)
+    for name in ['fixture', 'transition_fixture']:
+        if hasattr(survey, name):
+            fixture = getattr(survey, name)
+            frames[f'{name} ball'] = fixture, FIXTURE_POINTS, fixture.get_ball_basis
+    return frames
+
+
+def measured_points(obj, points):
+    """Get the measured points of a survey object
+
+    Points that are not measured in the survey data file are left out.
+
+    Parameters
+    ----------
+    obj : object
+        Survey object, e.g. Fixture or MattBallFrame
+    points : dict
+        {point name: attribute}
+
+    Returns
+    -------
+    points : dict
+        {point name: np.array}
+    """
+    result = {}
+    for name, attr in points.items():
+        try:
+            coords = getattr(obj, attr)
+        except (AttributeError, KeyError):
+            continue
+        result[name] = np.array([coords['x'], coords['y'], coords['z']], dtype=float)
+    return result
+
+
+def register_campaigns(surveys, reference=None):
+    """Register the ball frames of several campaigns onto a reference campaign
+
+    For every frame, the points measured in all campaigns are stacked to (K, N, 3) and the
+    best-fit rigid transformations of the reference points onto the points of every campaign are
+    solved at once, for all frames with the same number of points in a single batched SVD.
+
+    The frame as defined from two or three points (e.g. `Fixture.get_ball_basis`) is compared
+    with the best fit: frame_shift and frame_angle are the difference between the frame of a campaign
+    and the reference frame moved by the best-fit transformation.
+
+    Parameters
+    ----------
+    surveys : dict
+        {campaign: Survey}
+    reference : str
+        Campaign to register the others onto, defaults to the first campaign
+
+    Returns
+    -------
+    results : list
+        {'frame': str, 'points': list, 'transform': RigidTransform, 'rms': np.array,
+        'shift': np.array, 'angle': np.array, 'frame_shift': np.array, 'frame_angle': np.array}
+        for every frame, arrays with one entry per campaign
+    """
+    campaigns = list(surveys)
+    if reference is None:
+        reference = campaigns[0]
+    if reference not in surveys:
+        raise ValueError('Unknown reference campaign: {}'.format(reference))
+    ref = campaigns.index(reference)
+
+    all_frames = [registration_frames(survey) for survey in surveys.values()]
+    frames = {}
+    for name in all_frames[0]:
+        if not all(name in survey_frames for survey_frames in all_frames):
+            continue
+        points = [measured_points(*survey_frames[name][:2]) for survey_frames in all_frames]
+        common = [point for point in points[0] if all(point in campaign_points for campaign_points in points)]
+        if len(common) < 3:
+            continue
+        frames[name] = common, np.stack([[campaign_points[point] for point in common] for campaign_points in points])
+
+    results = {}
+    for n_points in sorted({len(common) for common, _ in frames.values()}):
+        names = [name for name, (common, _) in frames.items() if len(common) == n_points]
+        points = np.stack([frames[name][1] for name in names])  # (frames, campaigns, points, 3)
+        transform, rms = kabsch(points[:, ref:ref + 1], points)
+        shift, angle = volume_delta({'origin': 0, 'basis': np.identity(3)}, {'origin': transform.origin, 'basis': transform.basis})
+
+        for i, name in enumerate(names):
+            bases, origins = zip(*[survey_frames[name][2]() for survey_frames in all_frames])
+            defined = RigidTransform(np.stack(bases), np.stack(origins))
+            # the reference frame moved by the best fit, compared with the frame defined in every campaign
+            moved = RigidTransform(transform.basis[i], transform.origin[i]) @ RigidTransform(defined.basis[ref], defined.origin[ref])
+            frame_shift, frame_angle = volume_delta({'origin': moved.origin, 'basis': moved.basis},
+                                                    {'origin': defined.origin, 'basis': defined.basis})
+            results[name] = {'frame': name, 'points': frames[name][0],
+                             'transform': RigidTransform(transform.basis[i], transform.origin[i]),
+                             'rms': rms[i], 'shift': shift[i], 'angle': angle[i],
+                             'frame_shift': frame_shift, 'frame_angle': frame_angle}
+    return [results[name] for name in frames]
+
+
+def write_registration(output_file, campaigns, results):
+    """Write the registration of all frames and campaigns to one CSV file, see `register_campaigns`"""
+    with open(output_file, 'w', newline='') as csvfile:
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerow(REGISTRATION_HEADER)
+        for result in results:
+            for k, campaign in enumerate(campaigns):
+                csvwriter.writerow([campaign, result['frame'], len(result['points'])]
+                                   + [str(result[key][k]) for key in REGISTRATION_HEADER[3:]])
+
+
+@app.command()
+def registration(
+    year: int = typer.Argument(..., help='year of detector'),
+    file_lists: List[str] = typer.Argument(..., help='files containing paths to survey data files, one per campaign, glob patterns are expanded'),
+    reference: str = typer.Option(None, help='campaign to register the others onto, defaults to the first one'),
+    output_file: str = typer.Option(None, help='CSV file to write the registration to')
+):
+    """Fit the measured balls of every frame across campaigns
+
+    For the uchannel ball frames and the fixtures, all measured balls, midpoints and pins are
+    registered onto those of the reference campaign with a best-fit rigid transformation.
+    Prints the RMS residual (um), which measures how consistent the measured points are between
+    the campaigns, and the deviation of the frame defined from two or three points from the
+    best fit (shift in um, rotation in mrad).
+    """
+    file_lists = find_file_lists(file_lists)
+    surveys = {}
+    for file_list in file_lists:
+        with open(file_list) as json_file:
+            surveys[campaign_name(file_list)] = make_survey(year, json.load(json_file))
+
+    results = register_campaigns(surveys, reference)
+    campaigns = list(surveys)
+
+    print(f'{"frame":<24} {"campaign":<24} {"points":>6} {"rms (um)":>9} {"frame shift (um)":>16} {"frame rot (mrad)":>16}')
+    for result in results:
+        for k, campaign in enumerate(campaigns):
+            print(f'{result["frame"]:<24} {campaign:<24} {len(result["points"]):>6} {result["rms"][k] * 1000:9.3f} '
+                  f'{result["frame_shift"][k] * 1000:16.3f} {result["frame_angle"][k] * 1000:16.4f}')
+
+    if output_file is not None:
+        write_registration(output_file, campaigns, results)
+        print(f'registration written to {output_file}')
@@ -0,0 +1,348 @@
+
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import typer
+
+from ._cli import app
+from ._campaigns import find_file_lists, campaign_name
+from ._parser import parse_cache
+from ._store import FeatureStore, DEFAULT_CACHE_DIR
+from ._survey import make_survey
+from ._uncertainty import PARAMETERS, volume_parameters, print_uncertainties
+
+MODES = ('bootstrap', 'jackknife', 'all')
+
+
+def resampling_units(campaigns):
+    """Group the survey data files into the units that are resampled together
+
+    Keys of the file lists that point to the same file in every campaign belong to the same
+    measurement, e.g. the ball frame and pin frame of a uchannel volume, and are kept together.
+    A campaign can miss some units, e.g. a module that was not measured, see `unit_campaigns`.
+
+    Parameters
+    ----------
+    campaigns : dict
+        {campaign: survey_files}
+
+    Returns
+    -------
+    units : list
+        Lists of keys of the survey files, in the order of the file lists
+    """
+    file_lists = list(campaigns.values())
+    keys = list(dict.fromkeys(key for survey_files in file_lists for key in survey_files))
+
+    units = {}
+    for key in keys:
+        units.setdefault(tuple(survey_files.get(key) for survey_files in file_lists), []).append(key)
+    return list(units.values())
+
+
+def unit_campaigns(campaigns, units):
+    """Get the campaigns that measured each unit
+
+    Parameters
+    ----------
+    campaigns : dict
+        {campaign: survey_files}
+    units : list
+        Units of survey data files, see `resampling_units`
+
+    Returns
+    -------
+    measured : list
+        Names of the campaigns that have all survey data files of a unit, for every unit
+    """
+    return [[name for name, survey_files in campaigns.items() if all(key in survey_files for key in unit)] for unit in units]
+
+
+def combine(campaigns, units, choice):
+    """Combine the measurements of several campaigns to one survey
+
+    Parameters
+    ----------
+    campaigns : dict
+        {campaign: survey_files}
+    units : list
+        Units of survey data files, see `resampling_units`
+    choice : tuple
+        Campaign to take each unit from, None to leave the unit out
+
+    Returns
+    -------
+    survey_files : dict
+        Paths to survey data files of the combined survey
+    """
+    return {key: campaigns[campaign][key] for unit, campaign in zip(units, choice) if campaign is not None for key in unit}
+
+
+def resample(campaigns, units, mode='bootstrap', samples=1000, seed=None):
+    """Choose the campaign of every unit for all surveys of a resampling
+
+    Every unit is only taken from the campaigns that measured it, see `unit_campaigns`.
+
+    Parameters
+    ----------
+    campaigns : dict
+        {campaign: survey_files}
+    units : list
+        Units of survey data files, see `resampling_units`
+    mode : str
+        'bootstrap': every unit is drawn from a random campaign, for samples surveys,
+        'jackknife': the surveys of the single campaigns, see `summarize`,
+        'all': every combination of campaigns, at most samples surveys
+    samples : int
+        Number of surveys for 'bootstrap', maximal number of surveys for 'all'
+    seed : int
+        Seed of the random number generator, only used for 'bootstrap'
+
+    Returns
+    -------
+    choices : list
+        Tuples of campaigns, one per unit, see `combine`
+    """
+    measured = unit_campaigns(campaigns, units)
+    if mode == 'bootstrap':
+        counts = np.array([len(names) for names in measured])
+        picks = np.random.default_rng(seed).integers(counts, size=(samples, len(units)))
+        return [tuple(names[i] for names, i in zip(measured, pick)) for pick in picks]
+    if mode == 'jackknife':
+        # the units a campaign did not measure are left out of its survey
+        return [tuple(name if name in names else None for names in measured) for name in campaigns]
+    if mode == 'all':
+        n_choices = int(np.prod([len(names) for names in measured]))
+        if n_choices > samples:
+            raise ValueError('{} combinations of {} units from {} campaigns, more than {}, use bootstrap instead'.format(
+                n_choices, len(units), len(campaigns), samples))
+        return list(itertools.product(*measured))
+    raise ValueError('Invalid resampling mode: {}'.format(mode))
+
+
+def merge_parameters(results):
+    """Merge the parameters of surveys with different SurveyVolumes
+
+    The surveys that leave out a unit, e.g. a sensor that was not measured in a campaign, have fewer
+    SurveyVolumes. Their missing SurveyVolumes get NaN parameters, see `summarize`.
+
+    Parameters
+    ----------
+    results : list
+        (names, parameters) of groups of surveys with the same SurveyVolumes, parameters of shape (surveys, volumes, 12)
+
+    Returns
+    -------
+    names : list
+        Names of the SurveyVolumes of all surveys, in output order
+    parameters : np.array
+        Parameters of the SurveyVolumes of each survey, shape (surveys, volumes, 12)
+    """
+    names = []
+    for group_names, _ in results:
+        for i, name in enumerate(group_names):
+            if name not in names:
+                # after the preceding SurveyVolume of the group, to keep the output order
+                names.insert(names.index(group_names[i - 1]) + 1 if i > 0 else 0, name)
+
+    parameters = np.full((sum(len(values) for _, values in results), len(names), len(PARAMETERS)), np.nan)
+    start = 0
+    for group_names, values in results:
+        parameters[start:start + len(values), [names.index(name) for name in group_names]] = values
+        start += len(values)
+    return names, parameters
+
+
+def survey_parameters(year, combinations, cache_dir=None, rebuild_cache=False):
+    """Build the surveys of several combinations of survey data files
+
+    This is run in a worker process, so the store of parsed survey data files is configured
+    again from the arguments. All surveys of a worker share the parsed reports of its parse cache,
+    so every report is parsed (or loaded from the store) only once per worker.
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    combinations : list
+        Paths to survey data files of each survey, see `combine`
+    cache_dir : str
+        Directory of the store of parsed survey data files, None to not use a store
+    rebuild_cache : bool
+        Parse all survey data files again and overwrite the store
+
+    Returns
+    -------
+    names : list
+        Names of the SurveyVolumes
+    parameters : np.array
+        Parameters of the SurveyVolumes of each survey, shape (surveys, volumes, 12), see `PARAMETERS`
+        and `merge_parameters`
+    """
+    if cache_dir is not None:
+        parse_cache.store = FeatureStore(cache_dir, rebuild=rebuild_cache)
+    else:
+        parse_cache.store = None
+
+    results = []
+    for survey_files in combinations:
+        volumes = make_survey(year, survey_files).survey_volumes()
+        results.append(([volume['name'] for volume in volumes], np.array([[volume_parameters(volume) for volume in volumes]])))
+    return merge_parameters(results)
+
+
+def run_combinations(year, combinations, jobs=None, cache_dir=None, rebuild_cache=False):
+    """Build the surveys of several combinations of survey data files in a process pool
+
+    The combinations are split into one chunk per worker, see `survey_parameters`.
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    combinations : list
+        Paths to survey data files of each survey, see `combine`
+    jobs : int
+        Number of worker processes, defaults to the number of CPUs
+    cache_dir : str
+        Directory of the store of parsed survey data files, None to not use a store
+    rebuild_cache : bool
+        Parse all survey data files again and overwrite the store
+
+    Returns
+    -------
+    names : list
+        Names of the SurveyVolumes
+    parameters : np.array
+        Parameters of the SurveyVolumes of each survey, shape (surveys, volumes, 12)
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(combinations)))
+    chunks = [list(chunk) for chunk in np.array_split(np.array(combinations, dtype=object), jobs)]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(survey_parameters, year, chunk, cache_dir, rebuild_cache) for chunk in chunks]
+        results = [future.result() for future in futures]
+
+    return merge_parameters(results)
+
+
+def summarize(names, parameters, jackknife=False):
+    """Get mean and covariance of the parameters of each SurveyVolume over the resampled surveys
+
+    The surveys that miss a SurveyVolume, i.e. with NaN parameters, are left out for it.
+
+    Parameters
+    ----------
+    names : list
+        Names of the SurveyVolumes
+    parameters : np.array
+        Parameters of the SurveyVolumes of each survey, shape (surveys, volumes, 12)
+    jackknife : bool
+        The surveys are those of the single campaigns, the covariance is the delete-one
+        jackknife estimate of the covariance of their mean
+
+    Returns
+    -------
+    results : list
+        {'name': str, 'surveys': int, 'mean': np.array, 'std': np.array, 'covariance': np.array} for every SurveyVolume
+    """
+    results = []
+    for i, name in enumerate(names):
+        values = parameters[:, i]
+        values = values[~np.isnan(values).any(axis=1)]
+        n_surveys = len(values)
+        mean = values.mean(axis=0)
+        if n_surveys < 2:
+            covariance = np.zeros((len(PARAMETERS), len(PARAMETERS)))
+        elif jackknife:
+            # mean of all but one survey, for every left out survey
+            left_out = (values.sum(axis=0) - values) / (n_surveys - 1)
+            deviations = left_out - left_out.mean(axis=0)
+            covariance = (n_surveys - 1) / n_surveys * deviations.T @ deviations
+        else:
+            covariance = np.cov(values, rowvar=False)
+        results.append({'name': name, 'surveys': n_surveys, 'mean': mean, 'std': np.sqrt(np.diag(covariance)), 'covariance': covariance})
+    return results
+
+
+def write_resampling(output_file, results, mode, campaigns, units, n_surveys):
+    """Write mean and spread of the SurveyVolumes to a JSON file
+
+    Parameters
+    ----------
+    output_file : str
+        Output file
+    results : list
+        Results of `summarize`
+    mode : str
+        Resampling mode
+    campaigns : list
+        Names of the campaigns
+    units : list
+        Units of survey data files, see `resampling_units`
+    n_surveys : int
+        Number of resampled surveys
+    """
+    output = {'mode': mode, 'surveys': n_surveys, 'campaigns': list(campaigns), 'units': units,
+              'parameters': PARAMETERS, 'volumes': []}
+    for result in results:
+        output['volumes'].append({'name': result['name'],
+                                  'surveys': result['surveys'],
+                                  'mean': result['mean'].tolist(),
+                                  'std': result['std'].tolist(),
+                                  'covariance': result['covariance'].tolist()})
+    with open(output_file, 'w') as json_file:
+        json.dump(output, json_file, indent=2)
+
+
+@app.command()
+def resampling(
+    year: int = typer.Argument(..., help='year of detector'),
+    file_lists: List[str] = typer.Argument(..., help='files containing paths to survey data files, one per campaign, glob patterns are expanded'),
+    mode: str = typer.Option('bootstrap', help='resampling mode: bootstrap, jackknife or all'),
+    samples: int = typer.Option(1000, help='number of bootstrap surveys, maximal number of surveys for all'),
+    seed: int = typer.Option(None, help='seed of the random number generator'),
+    output_file: str = typer.Option(None, help='JSON file to write the results to, defaults to {year}_survey_resampling.json'),
+    jobs: int = typer.Option(None, help='number of worker processes, defaults to the number of CPUs'),
+    cache_dir: Path = typer.Option(DEFAULT_CACHE_DIR, help='directory of the store of parsed survey data files'),
+    cache: bool = typer.Option(True, help='use the store of parsed survey data files'),
+    rebuild_cache: bool = typer.Option(False, help='parse all survey data files again and overwrite the store')
+):
+    """Combine repeated measurement campaigns of the same modules
+
+    The measurements of the campaigns are resampled per unit (uchannel volume, fixture or sensor),
+    e.g. the ball frames from one campaign and the sensors from another, and the survey is built
+    for every combination in a process pool. Mean, standard deviation and covariance of the origin
+    and unit vectors of every SurveyVolume over the combinations are written to a JSON file.
+    With --mode jackknife, the single campaigns are combined to the jackknife estimate of their mean.
+    """
+    if mode not in MODES:
+        raise ValueError('Invalid resampling mode: {}, use one of {}'.format(mode, MODES))
+
+    campaigns = {}
+    for file_list in find_file_lists(file_lists):
+        with open(file_list) as json_file:
+            campaigns[campaign_name(file_list)] = json.load(json_file)
+
+    if output_file is None:
+        output_file = f'{year}_survey_resampling.json'
+
+    units = resampling_units(campaigns)
+    for name, survey_files in campaigns.items():
+        missing = [key for unit in units for key in unit if key not in survey_files]
+        if missing:
+            print(f'campaign {name} is incomplete, no survey data files for {", ".join(missing)}')
+    combinations = [combine(campaigns, units, choice) for choice in resample(campaigns, units, mode, samples, seed)]
+    names, parameters = run_combinations(year, combinations, jobs, str(cache_dir) if cache else None, rebuild_cache)
+
+    results = summarize(names, parameters, jackknife=mode == 'jackknife')
+    write_resampling(output_file, results, mode, campaigns, units, len(combinations))
+    print_uncertainties(results)
+    print(f'{mode} of {len(combinations)} surveys from {len(campaigns)} campaigns written to {output_file}')
@@ -0,0 +1,189 @@
+
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import typer
+
+from ._cli import app
+from ._survey import make_survey
+from ._uncertainty import ANGLES, PARAMETERS, feature_sigmas, measured_features, survey_objects, volume_parameters
+
+# distance from the origin of a SurveyVolume at which its rotation is weighed against its shift, in mm,
+# about half the length of a sensor
+LEVER_ARM = 50.
+
+
+def sensitivity_inputs(survey):
+    """Get the measured coordinates of a survey
+
+    Parameters
+    ----------
+    survey : Survey
+        Survey object
+
+    Returns
+    -------
+    inputs : list
+        (object, attribute, feature, coordinate) of every measured coordinate,
+        e.g. (fixture, 'oripin_dict', Feature('oripin'), 'x')
+    """
+    inputs = []
+    for obj in survey_objects(survey):
+        for attr, feature in measured_features(obj).items():
+            try:
+                coords = getattr(obj, attr)
+            except KeyError:
+                # feature not measured in this survey, it cannot be used either
+                continue
+            inputs += [(obj, attr, feature, coordinate) for coordinate in coords]
+    return inputs
+
+
+def input_label(survey_files, obj, feature, coordinate):
+    """Get the label of a measured coordinate, e.g. 'fixture: oripin x'
+
+    The survey data file of the measurement is given by its keys in survey_files.
+    """
+    input_file = os.path.normpath(obj.parser.input_file)
+    keys = [key for key, path in survey_files.items() if os.path.normpath(path) == input_file]
+    return '{}: {} {}'.format('/'.join(keys), feature.name, coordinate)
+
+
+def jacobian(year, survey_files, position_step=1e-4, angle_step=1e-6):
+    """Compute the derivatives of all SurveyVolumes with respect to all measured coordinates
+
+    The derivatives are central differences. Each measured coordinate is shifted up and down
+    in its own entry of a batch of 2 * inputs surveys, so all shifts are evaluated in a single
+    pass through the frame chain.
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    survey_files : dict
+        Paths to survey data files
+    position_step : float
+        Step of positions in mm
+    angle_step : float
+        Step of angles in radians
+
+    Returns
+    -------
+    inputs : list
+        Measured coordinates, see `sensitivity_inputs`
+    results : list
+        {'name': str, 'jacobian': np.array} for every SurveyVolume, the Jacobian has shape (12, inputs),
+        rows as in `PARAMETERS`
+    """
+    survey = make_survey(year, survey_files)
+    inputs = sensitivity_inputs(survey)
+    steps = np.array([angle_step if coordinate in ANGLES else position_step for _, _, _, coordinate in inputs])
+
+    batched = {}
+    for i, (obj, attr, _, coordinate) in enumerate(inputs):
+        if (id(obj), attr) not in batched:
+            coords = {name: np.full(2 * len(inputs), float(value)) for name, value in getattr(obj, attr).items()}
+            batched[(id(obj), attr)] = obj, attr, coords
+        coords = batched[(id(obj), attr)][2]
+        coords[coordinate][2 * i] += steps[i]
+        coords[coordinate][2 * i + 1] -= steps[i]
+
+    for obj, attr, coords in batched.values():
+        setattr(obj, attr, coords)
+    for obj in {id(obj): obj for obj, _, _ in batched.values()}.values():
+        obj.changed()
+
+    results = []
+    for volume in survey.survey_volumes():
+        parameters = volume_parameters(volume)
+        results.append({'name': volume['name'], 'jacobian': ((parameters[0::2] - parameters[1::2]) / (2 * steps[:, np.newaxis])).T})
+    return inputs, results
+
+
+def rank_inputs(jacobian, sigmas, lever_arm=LEVER_ARM, rtol=1e-6):
+    """Rank the measured coordinates by their effect on a SurveyVolume
+
+    The effect of a coordinate is the change of the SurveyVolume if the coordinate is off
+    by its standard deviation: the shift of the origin and the largest change of the unit vectors,
+    which is the angle of the rotation for small changes. Shift and rotation are combined to the
+    displacement shift + rotation * lever_arm, the largest displacement of a point of the volume
+    at lever_arm from its origin, so coordinates that tilt the volume rank with those that move it.
+
+    The central differences of `jacobian` leave round-off noise in the derivatives of coordinates
+    that do not change the SurveyVolume, so coordinates whose displacement is below rtol times the
+    largest displacement are left out.
+
+    Parameters
+    ----------
+    jacobian : np.array
+        Jacobian of the SurveyVolume, shape (12, inputs)
+    sigmas : np.array
+        Standard deviations of the measured coordinates
+    lever_arm : float
+        Distance from the origin in mm at which the rotation is taken into account
+    rtol : float
+        Threshold relative to the largest displacement
+
+    Returns
+    -------
+    ranking : list
+        (input index, origin shift, rotation, displacement) of the coordinates that change the SurveyVolume,
+        ordered by decreasing displacement
+    """
+    shifts = np.linalg.norm(jacobian[:3], axis=0) * sigmas
+    rotations = np.linalg.norm(jacobian[3:].reshape(3, 3, -1), axis=1).max(axis=0) * sigmas
+    displacements = shifts + rotations * lever_arm
+    order = np.argsort(-displacements, kind='stable')
+    return [(i, shifts[i], rotations[i], displacements[i]) for i in order if displacements[i] > rtol * displacements.max(initial=0)]
+
+
+@app.command()
+def sensitivity(
+    year: int = typer.Argument(..., help='year of detector'),
+    input_file: Path = typer.Argument(..., help='file containing paths to survey data files'),
+    output_file: str = typer.Option(None, help='JSON file to write the Jacobians to, defaults to {year}_survey_sensitivity.json'),
+    top: int = typer.Option(10, help='number of measured coordinates to print per SurveyVolume'),
+    position_sigma: float = typer.Option(0.005, help='standard deviation of measured positions in mm, to rank the coordinates'),
+    angle_sigma: float = typer.Option(0.005, help='standard deviation of measured angles in degrees, to rank the coordinates'),
+    lever_arm: float = typer.Option(LEVER_ARM, help='distance from the origin in mm at which rotations are weighed against shifts')
+):
+    """Find the measured coordinates that drive each SurveyVolume
+
+    Computes the Jacobian of the origin and unit vectors of every SurveyVolume with respect to
+    the x, y, z, xy_angle and elevation of every measured feature. The coordinates are ranked by
+    the change of the SurveyVolume if they are off by their standard deviation, taken from the
+    tolerances of the OGP steps or the given defaults, see `survey uncertainty`. Shift and rotation
+    are combined to the displacement of a point at lever_arm from the origin of the SurveyVolume.
+    The Jacobians and rankings are written to a JSON file and the top coordinates are printed.
+    """
+    with open(input_file) as json_file:
+        survey_files = json.load(json_file)
+
+    if output_file is None:
+        output_file = f'{year}_survey_sensitivity.json'
+
+    inputs, results = jacobian(year, survey_files)
+    labels = [input_label(survey_files, obj, feature, coordinate) for obj, _, feature, coordinate in inputs]
+    sigmas = np.array([feature_sigmas(obj, feature, position_sigma, math.radians(angle_sigma))[coordinate]
+                       for obj, _, feature, coordinate in inputs])
+
+    output = {'inputs': labels, 'sigmas': sigmas.tolist(), 'parameters': PARAMETERS, 'volumes': []}
+    for result in results:
+        ranking = rank_inputs(result['jacobian'], sigmas, lever_arm)
+        output['volumes'].append({'name': result['name'],
+                                  'jacobian': result['jacobian'].tolist(),
+                                  'ranking': [{'input': labels[i], 'origin_shift': shift, 'rotation': rotation,
+                                               'displacement': displacement}
+                                              for i, shift, rotation, displacement in ranking]})
+
+        print(result['name'])
+        print(f'  {"rank":>4}  {"measured coordinate":<60} {"displacement (um)":>17} {"origin (um)":>11} {"rotation (mrad)":>15}')
+        for rank, (i, shift, rotation, displacement) in enumerate(ranking[:top]):
+            print(f'  {rank + 1:>4}  {labels[i]:<60} {displacement * 1000:17.3f} {shift * 1000:11.3f} {rotation * 1000:15.4f}')
+
+    with open(output_file, 'w') as json_file:
+        json.dump(output, json_file, indent=2)
+    print(f'Jacobians with respect to {len(inputs)} measured coordinates written to {output_file}')
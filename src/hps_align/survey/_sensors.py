@@ -3,11 +3,13 @@ import numpy as np
 
 from ._parser import Parser
 from ._fixture import *
+from ._transform import RigidTransform
 from ._utils import *
+from ._frames import Observable, memoized
 from ._cli import app
 
 
-class Sensor:
+class Sensor(Observable):
     """SVT sensor class
 
     The sensors are measured while mounted in the fixture.
@@ -34,6 +36,7 @@ class Sensor:
     def __init__(self, fixture, input_file=None):
 
         self.fixture = fixture
+        self.observe(fixture)
         if input_file is None:
             self.oriball_dict = {'x': 0, 'y': 0, 'z': 0}
             self.diagball_dict = {'x': 0, 'y': 0, 'z': 0}
@@ -69,6 +72,8 @@ class Sensor:
         else:
             raise ValueError('Invalid ball type: {}'.format(balltype))
 
+        self.changed()
+
     def get_ball(self, balltype):
         """Get ball coordinates from survey data file
 
@@ -89,8 +94,9 @@ class Sensor:
             ball = self.axiball_dict
         else:
             raise ValueError('Invalid ball type: {}'.format(balltype))
-        return np.array([ball['x'], ball['y'], ball['z']])
+        return location(ball)
 
+    @memoized
     def get_ball_basis(self):
         """Get ball basis
 
@@ -121,6 +127,8 @@ class Sensor:
 
         self.sensor_origin_dict = sensor_origin
 
+        self.changed()
+
     def get_sensor_origin(self):
         """Get sensor origin coordinates
 
@@ -129,8 +137,9 @@ class Sensor:
         origin : np.array
             Sensor origin in OGP (or other global) coordinates
         """
-        return np.array([self.sensor_origin_dict['x'], self.sensor_origin_dict['y'], self.sensor_origin_dict['z']])
+        return location(self.sensor_origin_dict)
 
+    @memoized
     def get_sensor_origin_ballframe(self):
         """Get sensor origin coordinates in fixture ballframe
 
@@ -139,12 +148,10 @@ class Sensor:
         origin : np.array
             Sensor origin coordinates in fixture ballframe
         """
-        ball_basis, ball_origin = self.get_ball_basis()  # in OGP coords
-        origin = self.get_sensor_origin() - ball_origin  # in OGP coords
-        origin = np.matmul(origin, np.linalg.inv(ball_basis))
-
-        return origin
+        ogp_ball = RigidTransform(*self.get_ball_basis())
+        return ogp_ball.inverse().apply(self.get_sensor_origin())
 
+    @memoized
     def get_sensor_origin_pinframe(self):
         """Get sensor origin coordinates in pinframe
 
@@ -153,13 +160,8 @@ class Sensor:
         origin : np.array
             Sensor origin in fixture pinframe
         """
-        origin = self.get_sensor_origin_ballframe()  # in fixture ballframe
-        pin_in_ball_origin = self.fixture.get_pin_in_ball()[1]  # in fixture ballframe
-        ball_in_pin_basis = self.fixture.get_ball_in_pin()[0]  # ball to pin
-        origin = origin - pin_in_ball_origin  # in fixture ballframe
-        origin = np.matmul(origin, ball_in_pin_basis)  # in pinframe
-
-        return origin
+        pin_ball = RigidTransform(*self.fixture.get_ball_in_pin())  # ball to pin
+        return pin_ball.apply(self.get_sensor_origin_ballframe())
 
     def set_sensor_plane(self, sensor_plane):
         """Set sensor plane coordinates
@@ -176,6 +178,8 @@ class Sensor:
 
         self.sensor_plane_dict = sensor_plane
 
+        self.changed()
+
     def get_sensor_normal(self):
         """Get sensor normal vector
 
@@ -186,6 +190,7 @@ class Sensor:
         """
         return normal_vector(self.sensor_plane_dict["xy_angle"], self.sensor_plane_dict["elevation"])
 
+    @memoized
     def get_sensor_normal_ballframe(self):
         """Get sensor normal coordinates in fixture ballframe
 
@@ -194,12 +199,10 @@ class Sensor:
         normal : np.array
             Sensor normal vector in fixture ballframe
         """
-        ball_basis = self.get_ball_basis()[0]  # ball to OGP, inverse: OGP to ball
-        normal = self.get_sensor_normal()  # in OGP coords
-        normal = np.matmul(normal, np.linalg.inv(ball_basis))  # in ballframe
-
-        return normal
+        ogp_ball = RigidTransform(*self.get_ball_basis())  # ball to OGP, inverse: OGP to ball
+        return ogp_ball.inverse().rotate(self.get_sensor_normal())
 
+    @memoized
     def get_sensor_normal_pinframe(self):
         """Get sensor normal vector in pinframe
 
@@ -208,9 +211,5 @@ class Sensor:
         normal : np.array
             Sensor normal vector in fixture pinframe
         """
-        normal = self.get_sensor_normal_ballframe()  # in fixture ballframe
-        ball_in_pin_basis = self.fixture.get_ball_in_pin()[0]  # ball to pin
-
-        normal = np.matmul(normal, ball_in_pin_basis)  # in pinframe
-
-        return normal
+        pin_ball = RigidTransform(*self.fixture.get_ball_in_pin())  # ball to pin
+        return pin_ball.rotate(self.get_sensor_normal_ballframe())
@@ -0,0 +1,127 @@
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from ._cli import app
+
+# bump whenever the layout of the step table changes, so old entries are not loaded
+STORE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'hps_align', 'survey')
+
+
+class FeatureStore:
+    """On-disk store of parsed survey data files
+
+    The step table of every parsed survey data file (see `Parser.read_steps`) is saved as a
+    ``.npz`` file in the cache directory. The entries are keyed by a hash of the file content,
+    so a file is only parsed again if it changed, independent of its path or modification time.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory to keep the parsed step tables in
+    rebuild : bool
+        Ignore existing entries and overwrite them with freshly parsed step tables
+
+    Attributes
+    ----------
+    cache_dir : str
+        Directory to keep the parsed step tables in
+    rebuild : bool
+        Whether existing entries are ignored
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, rebuild=False):
+        self.cache_dir = str(cache_dir)
+        self.rebuild = rebuild
+
+    @classmethod
+    def from_env(cls):
+        """Get store configured by the HPS_ALIGN_SURVEY_CACHE environment variable
+
+        Returns
+        -------
+        store : FeatureStore
+            Store in the directory given by HPS_ALIGN_SURVEY_CACHE, None if the variable is not set
+        """
+        cache_dir = os.environ.get('HPS_ALIGN_SURVEY_CACHE')
+        if not cache_dir:
+            return None
+        return cls(cache_dir)
+
+    @staticmethod
+    def key(content):
+        """Get store key of a survey data file
+
+        Parameters
+        ----------
+        content : bytes
+            Content of the survey data file
+
+        Returns
+        -------
+        key : str
+            Hex digest of the content hash
+        """
+        digest = hashlib.sha256('hps_align survey store v{}\n'.format(STORE_VERSION).encode())
+        digest.update(content)
+        return digest.hexdigest()
+
+    def path(self, key):
+        """Get path of the store entry for a key"""
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def load(self, key):
+        """Load step table from the store
+
+        Parameters
+        ----------
+        key : str
+            Store key, see `key`
+
+        Returns
+        -------
+        steps : np.ndarray
+            Step table, None if there is no entry for the key or the store is rebuilt
+        """
+        if self.rebuild:
+            return None
+
+        try:
+            with np.load(self.path(key), allow_pickle=False) as entry:
+                return entry['steps']
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, key, steps):
+        """Save step table to the store
+
+        Parameters
+        ----------
+        key : str
+            Store key, see `key`
+        steps : np.ndarray
+            Step table
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                np.savez(file, steps=steps)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def clear(self):
+        """Remove all entries from the store"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz'):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -1,14 +1,64 @@
 
+import warnings
+from xml.etree import ElementTree
+
 from ._utils import *
 from ._uchannel import UChannel
 from ._sensors import *
 from ._mattsensor import *
 from ._ballframe import *
 from ._pinframe import *
+from ._transform import RigidTransform
+from ._frames import FrameGraph, Observable, memoized
+from ._profile import profiler
 from ._cli import app
 
+# one row per SurveyVolume, see `Survey2019.volume_table`
+VOLUME_DTYPE = np.dtype([('name', 'U64'), ('parent', 'U64'), ('desc', 'U128'),
+                         ('origin', 'f8', (3,)), ('basis', 'f8', (3, 3))])
+
+VOLUME_TEMPLATE = ('<SurveyVolume name="{name}" desc="{desc}">\n'
+                   '<origin x="{origin[0]}" y="{origin[1]}" z="{origin[2]}" />\n'
+                   '<unitvec name="X" x="{basis[0][0]}" y="{basis[0][1]}" z="{basis[0][2]}" />\n'
+                   '<unitvec name="Y" x="{basis[1][0]}" y="{basis[1][1]}" z="{basis[1][2]}" />\n'
+                   '<unitvec name="Z" x="{basis[2][0]}" y="{basis[2][1]}" z="{basis[2][2]}" />\n'
+                   '</SurveyVolume>\n')
+
+# one row per SurveyVolume of a survey layout, see `make_layout`
+LAYOUT_DTYPE = np.dtype([('volume', 'U8'), ('layer', 'i4'), ('sensor', 'U8'), ('mount', 'U16')])
+
+
+def make_layout(layers, small_pin_layers=(), volumes=('top', 'bottom'), sensors=('axial', 'stereo')):
+    """Make the layout table of a survey
+
+    Every volume and layer has a module, given by the pin frame it is mounted on, and sensors.
+
+    Parameters
+    ----------
+    layers : list
+        Layer numbers
+    small_pin_layers : list
+        Layers whose modules are mounted on the small pins of a transition plate
+    volumes : list
+        Volumes
+    sensors : list
+        Sensors of each module
+
+    Returns
+    -------
+    layout : np.ndarray
+        Structured array with one row per SurveyVolume in output order, fields volume, layer,
+        sensor ('' for the module) and mount ('pin' or 'small pin')
+    """
+    rows = [(volume, layer, sensor, 'small pin' if layer in small_pin_layers else 'pin')
+            for volume in volumes for layer in layers for sensor in ('',) + tuple(sensors)]
+    return np.array(rows, dtype=LAYOUT_DTYPE)
+
+
+LAYOUT_2019 = make_layout([0, 1], small_pin_layers=[1])
 
-class Survey:
+
+class Survey(Observable):
     """SVT survey class
 
     This class combines the UChannel and sensor measurements.
@@ -35,14 +85,14 @@ class Survey:
         return self.uchannel.pin_in_ballframe(int(layer), volume)
 
     def transform_sensor_to_uchannel_ballframe(self, volume, layer, sensor_type):
-        basis, origin = self.get_pin_in_uchannel_ballframe(volume, layer)
+        ball_pin = RigidTransform(*self.get_pin_in_uchannel_ballframe(volume, layer))
         sensor = self.sensors[volume][layer][sensor_type]
 
         sensor_origin_pin = sensor.get_sensor_origin_pinframe()
         sensor_normal_pin = sensor.get_sensor_normal_pinframe()
 
-        sensor_origin_ball = origin + np.matmul(sensor_origin_pin, basis)
-        sensor_normal_ball = np.matmul(sensor_normal_pin, basis)
+        sensor_origin_ball = ball_pin.apply(sensor_origin_pin)
+        sensor_normal_ball = ball_pin.rotate(sensor_normal_pin)
 
         return sensor_origin_ball, sensor_normal_ball
 
@@ -50,10 +100,43 @@ class Survey:
 class Survey2019(Survey):
     """SVT survey class for 2019 configuration
 
-    Here, only the first two layers in top and bottom are used.
+    Here, only the first two layers in top and bottom are used, see `LAYOUT_2019`.
+    The modules and sensors of the survey are given by a layout table, see `make_layout`.
+    The pin frames of the modules of a volume are computed for all layers at once, see `module_frames`.
+
+    All frames of the survey are registered in a `FrameGraph`:
+
+    * '{volume} ogp': coordinate system of the uchannel measurement of a volume
+    * '{volume} ball', '{volume} L{layer} pin': uchannel ball frame and pin frame of each layer
+    * '{volume} L{layer} small pin': small pin frame of the transition plate on the (wide) pins of a layer
+    * 'fixture ogp', 'fixture ball', 'fixture pin': frames of the (wide) fixture measurement,
+      likewise for 'transition_fixture'
+    * '{volume} L{layer} {sensor}': axial and stereo sensor frames in the pin frame of their module
+
+    The SurveyVolumes are computed once into `volume_table`, which is kept until a measurement is overridden.
+
+    Sensors without a survey data file, e.g. of a module that was not measured in a campaign,
+    are left out of the layout with a warning, the file is not taken from another campaign.
+
+    Attributes
+    ----------
+    frames : FrameGraph
+        Frame graph of the survey
+    layout : np.ndarray
+        Layout table of the survey
+    missing_files : list
+        Keys of the sensor survey data files that are missing in survey_files
     """
-    def __init__(self, survey_files):
+    def __init__(self, survey_files, layout=LAYOUT_2019):
         """Initialize Survey object with 2019 configuration"""
+        self.survey_files = survey_files
+
+        keys = [f'L{layer}_{sensor}_{volume}' for volume, layer, sensor in layout[['volume', 'layer', 'sensor']].tolist()]
+        measured = np.array([not sensor or key in survey_files for key, sensor in zip(keys, layout['sensor'])], dtype=bool)
+        self.missing_files = [key for key, present in zip(keys, measured) if not present]
+        if self.missing_files:
+            warnings.warn('No survey data files for {}, the sensors are left out'.format(', '.join(self.missing_files)))
+        self.layout = layout[measured]
 
         ballframe_top = MattBallFrame(survey_files['ballframe_top'])
         ballframe_bottom = MattBallFrame(survey_files['ballframe_bottom'])
@@ -68,38 +151,104 @@ class Survey2019(Survey):
         self.fixture = Fixture(survey_files['fixture'])
         self.transition_fixture = Fixture(survey_files['transition_fixture'])
 
-        L0_axial_top = MattSensor(self.transition_fixture, survey_files['L0_axial_top'])
-        L0_stereo_top = MattSensor(self.transition_fixture, survey_files['L0_stereo_top'])
-        L1_axial_top = MattSensor(self.transition_fixture, survey_files['L1_axial_top'])
-        L1_stereo_top = MattSensor(self.transition_fixture, survey_files['L1_stereo_top'])
-
-        L0_axial_bottom = MattSensor(self.transition_fixture, survey_files['L0_axial_bottom'])
-        L0_stereo_bottom = MattSensor(self.transition_fixture, survey_files['L0_stereo_bottom'])
-        L1_axial_bottom = MattSensor(self.transition_fixture, survey_files['L1_axial_bottom'])
-        L1_stereo_bottom = MattSensor(self.transition_fixture, survey_files['L1_stereo_bottom'])
-
-        self.sensors = {
-            'top': {
-                '0': {
-                    'axial': L0_axial_top,
-                    'stereo': L0_stereo_top
-                },
-                '1': {
-                    'axial': L1_axial_top,
-                    'stereo': L1_stereo_top
-                }
-            },
-            'bottom': {
-                '0': {
-                    'axial': L0_axial_bottom,
-                    'stereo': L0_stereo_bottom
-                },
-                '1': {
-                    'axial': L1_axial_bottom,
-                    'stereo': L1_stereo_bottom
-                }
-            }
-        }
+        self.sensors = {}
+        for volume, layer, sensor in self.volume_keys():
+            if sensor is not None:
+                self.sensors.setdefault(volume, {}).setdefault(str(layer), {})[sensor] = MattSensor(
+                    self.transition_fixture, survey_files[f'L{layer}_{sensor}_{volume}'])
+
+        self.frames = FrameGraph()
+        self.uchannel.register_frames(self.frames, layers=sorted(set(range(4)) | set(layout['layer'].tolist())))
+        self.fixture.register_frames(self.frames, 'fixture')
+        self.transition_fixture.register_frames(self.frames, 'transition_fixture')
+        for volume, layer, sensor in self.volume_keys():
+            if sensor is not None:
+                self.sensors[volume][str(layer)][sensor].register_frames(self.frames, f'{volume} L{layer} {sensor}',
+                                                                         self.module_frame(volume, layer))
+            elif self.module_frame(volume, layer).endswith('small pin'):
+                self.frames.add_edge(f'{volume} L{layer} pin', self.module_frame(volume, layer), self.get_small_pin_in_wide_pin,
+                                     sources=[self.fixture, self.transition_fixture])
+
+        self.observe(self.uchannel, self.fixture, self.transition_fixture,
+                     *[sensor for layers in self.sensors.values() for sensors in layers.values() for sensor in sensors.values()])
+
+    def module_frame(self, volume, layer):
+        """Get name of the pin frame a module is mounted on
+
+        Parameters
+        ----------
+        volume : str
+            Volume ('top' or 'bottom')
+        layer : int
+            Layer number
+
+        Returns
+        -------
+        frame : str
+            Name of the frame in `frames`
+        """
+        modules = self._modules(volume)
+        mounts = modules['mount'][modules['layer'] == layer]
+        return f'{volume} L{layer} {mounts[0] if len(mounts) else "pin"}'
+
+    def _modules(self, volume):
+        """Get the rows of the layout table of the modules of a volume"""
+        return self.layout[(self.layout['volume'] == volume) & (self.layout['sensor'] == '')]
+
+    @memoized
+    def module_frames(self, volume):
+        """Get the pin frames of all modules of a volume in the uchannel ball frame
+
+        The pin frames of all layers are computed at once, the modules mounted on small pins
+        are shifted to the small pin frame of the transition plate, see `get_small_pin_in_wide_pin`.
+
+        Parameters
+        ----------
+        volume : str
+            Volume ('top' or 'bottom')
+
+        Returns
+        -------
+        bases : np.array
+            Basis vectors in uchannel ball frame, shape (modules, 3, 3), in the order of the layout table
+        origins : np.array
+            Origins in uchannel ball frame, shape (modules, 3)
+        """
+        modules = self._modules(volume)
+        ball_pins = RigidTransform(*self.uchannel.pins_in_ballframe(volume, tuple(modules['layer'].tolist())))
+
+        small = modules['mount'] == 'small pin'
+        if not small.any():
+            return tuple(ball_pins)
+
+        ball_small_pins = ball_pins @ RigidTransform(*self.get_small_pin_in_wide_pin())
+        basis_mask = small.reshape((-1,) + (1,) * (ball_pins.basis.ndim - 1))
+        origin_mask = small.reshape((-1,) + (1,) * (ball_pins.origin.ndim - 1))
+        return (np.where(basis_mask, ball_small_pins.basis, ball_pins.basis),
+                np.where(origin_mask, ball_small_pins.origin, ball_pins.origin))
+
+    def get_small_pin_in_wide_pin(self):
+        """Get small pin frame of the transition plate in the wide pin frame
+
+        The rotation is taken from the pin frames of both fixtures in ogp coordinates,
+        the translation from the pin frames in the fixture ball frames.
+
+        Returns
+        -------
+        basis : np.array
+            Basis vectors in wide pin frame
+        origin : np.array
+            Origin in wide pin frame
+        """
+        wide_fixture_basis = self.fixture.get_pin_basis()[0]
+        small_fixture_basis = self.transition_fixture.get_pin_basis()[0]
+        small_to_wide = np.matmul(small_fixture_basis, np.swapaxes(wide_fixture_basis, -1, -2))
+
+        wide_pin = RigidTransform(*self.fixture.get_pin_in_ball())
+        small_pin_fixball_origin = self.transition_fixture.get_pin_in_ball()[1]
+        wide_to_small_pin = wide_pin.inverse().rotate(small_pin_fixball_origin - wide_pin.origin)
+
+        return small_to_wide, wide_to_small_pin
 
     def get_pin_in_uchannel_ballframe(self, volume, layer):
         """Get pin frame basis vectors and origin in uchannel ball frame
@@ -123,64 +272,150 @@ class Survey2019(Survey):
         origin : np.array
             Origin in uchannel ball frame
         """
-        if layer == 1:
-            # pin frame in ogp coordinates
-            pin_basis, pin_origin = self.uchannel.get_pin_basis(layer, volume)
-            # ball frame in ogp coordinates
-            ball_basis, ball_origin = self.uchannel.get_ball_basis(volume)
-
-            # wide fixture pin frame in ogp coordinates
-            wide_fixture_basis = self.fixture.get_pin_basis()[0]
-            # small fixture pin frame in ogp coordinates
-            small_fixture_basis = self.transition_fixture.get_pin_basis()[0]
-
-            # rotation of basis vectors from small fixture pin frame to wide fixture pin frame
-            small_to_wide = np.matmul(small_fixture_basis, np.linalg.inv(wide_fixture_basis))
-            # small fixture pin frame in uchannel pin frame (= wide fixture pin frame) coordinates
-            pin_small_basis = np.matmul(small_to_wide, pin_basis)
-
-            # rotation of basis vectors from pin frame to uchannel ball frame
-            basis = np.matmul(pin_small_basis, np.linalg.inv(ball_basis))
-
-            if volume == 'top' and self.uchannel.ballframe_top.__class__.__name__ == 'MattBallFrame':
-                origin = pin_origin
-            elif volume == 'bottom' and self.uchannel.ballframe_bot.__class__.__name__ == 'MattBallFrame':
-                origin = pin_origin
-            else:
-                # translation of origin in ball frame
-                origin = pin_origin - ball_origin
-
-            wide_pin_fixball_basis, wide_pin_fixball_origin = self.fixture.get_pin_in_ball()
-            small_pin_fixball_origin = self.transition_fixture.get_pin_in_ball()[1]
-
-            # translation vector between pin frames in fixture ball frame
-            wide_to_small_fixball = small_pin_fixball_origin - wide_pin_fixball_origin
-            # translation vector between pin frames in uchannel pin frame
-            wide_to_small_pin = np.matmul(wide_to_small_fixball, np.linalg.inv(wide_pin_fixball_basis))
-            # translation vector between pin frames in uchannel ball frame
-            wide_to_small_ball = np.matmul(wide_to_small_pin, np.matmul(pin_basis, np.linalg.inv(ball_basis)))
-
-            # origin in uchannel ball frame
-            origin = np.matmul(origin, np.linalg.inv(ball_basis)) + wide_to_small_ball
-
-            return basis, origin
-
-        else:
-            return self.uchannel.pin_in_ballframe(int(layer), volume)
+        return tuple(self.frames.transform(self.module_frame(volume, int(layer)), f'{volume} ball'))
 
     def transform_sensor_to_uchannel_ballframe(self, volume, layer, sensor_type):
-        basis, origin = self.get_pin_in_uchannel_ballframe(volume, layer)
+        ball_pin = RigidTransform(*self.get_pin_in_uchannel_ballframe(volume, layer))
         sensor = self.sensors[volume][layer][sensor_type]
 
         sensor_origin_pin = sensor.get_sensor_origin_pinframe()
         sensor_normal_pin = sensor.get_sensor_normal_pinframe()
         print('sensor_origin_pin ', sensor_origin_pin)
 
-        sensor_origin_ball = origin + np.matmul(sensor_origin_pin, basis)
-        sensor_normal_ball = np.matmul(sensor_normal_pin, basis)
+        sensor_origin_ball = ball_pin.apply(sensor_origin_pin)
+        sensor_normal_ball = ball_pin.rotate(sensor_normal_pin)
 
         return sensor_origin_ball, sensor_normal_ball
 
+    def volume_keys(self):
+        """Get keys of all SurveyVolumes of the survey in output order
+
+        The keys are given by the layout table, for each volume and layer the pin frame is followed by the sensors.
+
+        Returns
+        -------
+        keys : list
+            List of (volume, layer, sensor) tuples, sensor is None for the pin frame
+        """
+        return [(str(volume), int(layer), str(sensor) if sensor else None)
+                for volume, layer, sensor in self.layout[['volume', 'layer', 'sensor']].tolist()]
+
+    def volume_inputs(self, volume, layer, sensor=None):
+        """Get the survey data files a SurveyVolume depends on
+
+        Parameters
+        ----------
+        volume : str
+            Volume ('top' or 'bottom')
+        layer : int
+            Layer number
+        sensor : str
+            Sensor ('axial' or 'stereo'), None for the pin frame
+
+        Returns
+        -------
+        inputs : list
+            Keys of survey_files the SurveyVolume is derived from
+        """
+        if sensor is not None:
+            return [f'L{layer}_{sensor}_{volume}', 'transition_fixture']
+        inputs = [f'ballframe_{volume}', f'pinframe_{volume}']
+        if self.module_frame(volume, layer).endswith('small pin'):
+            inputs += ['fixture', 'transition_fixture']
+        return inputs
+
+    def volume_name(self, volume, layer, sensor=None):
+        """Get name of a SurveyVolume, e.g. 'module_L1t' or 'module_L1t_halfmodule_axial'"""
+        name = 'module_L' + str(layer+1) + volume[0]
+        if sensor is None:
+            return name
+        return name + '_halfmodule_' + sensor
+
+    def volume_parent(self, volume, layer, sensor=None):
+        """Get name of the frame a SurveyVolume is given in
+
+        The pin frames are given in the uchannel ball frame '{volume} ball',
+        the sensors in the pin frame of their module, i.e. the SurveyVolume of the module.
+        """
+        if sensor is None:
+            return f'{volume} ball'
+        return self.volume_name(volume, layer)
+
+    def survey_volume(self, volume, layer, sensor=None):
+        """Get a SurveyVolume of the survey
+
+        The pin frame is given in the uchannel ball frame, the sensor frames in the pin frame.
+
+        Parameters
+        ----------
+        volume : str
+            Volume ('top' or 'bottom')
+        layer : int
+            Layer number
+        sensor : str
+            Sensor ('axial' or 'stereo'), None for the pin frame
+
+        Returns
+        -------
+        survey_volume : dict
+            {'name': str, 'desc': str, 'basis': np.array, 'origin': np.array}
+        """
+        name = self.volume_name(volume, layer, sensor)
+        if sensor is None:
+            bases, origins = self.module_frames(volume)
+            index = np.flatnonzero(self._modules(volume)['layer'] == layer)[0]
+            basis, origin = bases[index], origins[index]
+            return {'name': name, 'desc': volume + ' L' + str(layer+1) + ' pin basis in U-channel fiducial frame:',
+                    'basis': basis, 'origin': origin}
+
+        with profiler.timer('sensor transforms'):
+            basis, origin = self.frames.transform(f'{volume} L{layer} {sensor}', self.module_frame(volume, layer))
+        return {'name': name,
+                'desc': volume + ' L' + str(layer+1) + ' ' + sensor + ' sensor basis in pin frame:',
+                'basis': basis, 'origin': origin}
+
+    def survey_volumes(self):
+        """Get all SurveyVolumes of the survey
+
+        Returns
+        -------
+        volumes : list
+            List of SurveyVolumes in output order, see `survey_volume`
+        """
+        return [self.survey_volume(*key) for key in self.volume_keys()]
+
+    @memoized
+    @profiler.timed('frame construction')
+    def volume_table(self):
+        """Get all SurveyVolumes of the survey as table
+
+        The table is computed once and kept until a measurement of the survey is overridden,
+        it is the source of `print_results` and other output formats.
+
+        Returns
+        -------
+        table : np.ndarray
+            Read-only structured array with one row per SurveyVolume in output order, fields
+            name, parent (see `volume_parent`), desc, origin (3) and basis (3, 3)
+        """
+        table = np.zeros(len(self.volume_keys()), dtype=VOLUME_DTYPE)
+        for row, key in zip(table, self.volume_keys()):
+            volume = self.survey_volume(*key)
+            row['name'] = volume['name']
+            row['parent'] = self.volume_parent(*key)
+            row['desc'] = volume['desc']
+            row['origin'] = volume['origin']
+            row['basis'] = volume['basis']
+        return table
+
+    def get_volume(self, name):
+        """Get a SurveyVolume by name from `volume_table`, e.g. 'module_L1t'"""
+        table = self.volume_table()
+        rows = np.flatnonzero(table['name'] == name)
+        if len(rows) == 0:
+            raise KeyError('Unknown SurveyVolume: {}'.format(name))
+        return table[rows[0]]
+
     def print_results(self, out_name):
         """Print results to file
 
@@ -192,36 +427,86 @@ class Survey2019(Survey):
         out_name : str
             Output file name
         """
-        with open(out_name, 'w') as f:
-            for volume in ['top', 'bottom']:
-                if volume == 'top':
-                    short_name = 't'
-                else:
-                    short_name = 'b'
-                for layer in [1, 2]:
-                    f.write('<SurveyVolume name="module_L' + str(layer) + short_name + '" desc="'
-                            + volume + ' L' + str(layer) + ' pin basis in U-channel fiducial frame:">\n')
-                    basis, origin = self.get_pin_in_uchannel_ballframe(volume, layer-1)
-                    f.write('<origin x="' + str(origin[0]) + '" y="' + str(origin[1]) + '" z="' + str(origin[2]) + '" />\n')
-                    f.write('<unitvec name="X" x="' + str(basis[0][0]) + '" y="' + str(basis[0][1])
-                            + '" z="' + str(basis[0][2]) + '" />\n')
-                    f.write('<unitvec name="Y" x="' + str(basis[1][0]) + '" y="' + str(basis[1][1])
-                            + '" z="' + str(basis[1][2]) + '" />\n')
-                    f.write('<unitvec name="Z" x="' + str(basis[2][0]) + '" y="' + str(basis[2][1])
-                            + '" z="' + str(basis[2][2]) + '" />\n')
-                    f.write('</SurveyVolume>\n')
-
-                    for sensor in ['axial', 'stereo']:
-                        # print('volume ', volume, ' layer ', layer, ' sensor ', sensor)
-                        f.write('<SurveyVolume name="module_L' + str(layer) + short_name + '_halfmodule_' + sensor
-                                + '" desc="' + volume + ' L' + str(layer) + ' ' + sensor + ' sensor basis in pin frame:">\n')
-                        sensor_basis_pin, sensor_origin_pin = self.sensors[volume][str(layer-1)][sensor].get_sensor_basis_pinframe()
-                        f.write('<origin x="' + str(sensor_origin_pin[0]) + '" y="' + str(sensor_origin_pin[1])
-                                + '" z="' + str(sensor_origin_pin[2]) + '" />\n')
-                        f.write('<unitvec name="X" x="' + str(sensor_basis_pin[0][0]) + '" y="' + str(sensor_basis_pin[0][1])
-                                + '" z="' + str(sensor_basis_pin[0][2]) + '" />\n')
-                        f.write('<unitvec name="Y" x="' + str(sensor_basis_pin[1][0]) + '" y="' + str(sensor_basis_pin[1][1])
-                                + '" z="' + str(sensor_basis_pin[1][2]) + '" />\n')
-                        f.write('<unitvec name="Z" x="' + str(sensor_basis_pin[2][0]) + '" y="' + str(sensor_basis_pin[2][1])
-                                + '" z="' + str(sensor_basis_pin[2][2]) + '" />\n')
-                        f.write('</SurveyVolume>\n')
+        write_survey_volumes(out_name, self.volume_table())
+
+
+@profiler.timed('xml writing')
+def write_survey_volumes(out_name, volumes):
+    """Write SurveyVolumes to file
+
+    Parameters
+    ----------
+    out_name : str
+        Output file name
+    volumes : list
+        List of SurveyVolumes, see `Survey2019.survey_volume`, or rows of `Survey2019.volume_table`
+    """
+    with open(out_name, 'w') as f:
+        f.write(''.join(VOLUME_TEMPLATE.format(name=volume['name'], desc=volume['desc'],
+                                               origin=np.asarray(volume['origin']).tolist(),
+                                               basis=np.asarray(volume['basis']).tolist())
+                        for volume in volumes))
+
+
+def read_survey_volumes(in_name, chunk_size=1 << 16):
+    """Read SurveyVolumes from file
+
+    Reads files written by `write_survey_volumes`. The SurveyVolume elements are not enclosed in
+    a root element, they are parsed one by one while the file is read in chunks.
+
+    Parameters
+    ----------
+    in_name : str
+        Input file name
+    chunk_size : int
+        Number of characters read at once
+
+    Returns
+    -------
+    volumes : np.ndarray
+        Structured array with one row per SurveyVolume in file order, see `VOLUME_DTYPE`,
+        the parent is not part of the file and left empty
+    """
+    parser = ElementTree.XMLPullParser(events=('end',))
+    parser.feed('<SurveyVolumes>')
+    rows = []
+    with open(in_name) as f:
+        for chunk in iter(lambda: f.read(chunk_size), ''):
+            parser.feed(chunk)
+            rows += [_volume_row(element) for _, element in parser.read_events() if element.tag == 'SurveyVolume']
+    parser.feed('</SurveyVolumes>')
+    rows += [_volume_row(element) for _, element in parser.read_events() if element.tag == 'SurveyVolume']
+    parser.close()
+
+    return np.array(rows, dtype=VOLUME_DTYPE)
+
+
+def _volume_row(element):
+    """Convert a SurveyVolume element to a row of `VOLUME_DTYPE` and free the element"""
+    origin = element.find('origin')
+    unitvecs = {unitvec.get('name'): unitvec for unitvec in element.iter('unitvec')}
+    row = (element.get('name'), '', element.get('desc', ''),
+           [float(origin.get(axis)) for axis in 'xyz'],
+           [[float(unitvecs[name].get(axis)) for axis in 'xyz'] for name in 'XYZ'])
+    element.clear()
+    return row
+
+
+def make_survey(year, survey_files):
+    """Construct the survey of a given year
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    survey_files : dict
+        Paths to survey data files, see `Survey2019`
+
+    Returns
+    -------
+    survey : Survey
+        Survey object for the given year
+    """
+    if year == 2019:
+        return Survey2019(survey_files)
+    raise ValueError(f'year {year} not supported')
@@ -0,0 +1,194 @@
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import typer
+
+from ._cli import app
+from ._parser import Parser, QUANTITIES
+
+RTF_HEADER = ('{\\rtf1\\ansi\\deff0{\\fonttbl{\\f0\\froman\\fprq1 Courier New;}}\r\n'
+              '{\\colortbl ;\\red255\\green255lue255;}\r\n'
+              '{\\*\\generator Msftedit 5.41.15.1507;}\\viewkind4\\uc1\\lang1033\\f0\\fs20 {name}\r\n'
+              ' ' + '=' * 79 + '\r\n'
+              ' Header:   \r\n'
+              ' ' + '-' * 79 + '\r\n'
+              ' Setup:    \r\n'
+              ' ' + '=' * 79 + '\r\n')
+RTF_FOOTER = '\r\n}\r\n\x00'
+SEPARATOR = '-' * 79 + '\r\n'
+
+# order of the quantities within a step, labels as given in the survey data file
+LABEL_ORDER = ['Diameter', 'XY Angle', 'Elevation', 'X Location', 'Y Location', 'Z Location']
+
+# quantities measured for each type of synthetic feature and the form error reported below them
+FEATURES = {
+    'Sphere': (['diameter', 'x', 'y', 'z'], 'Sphericity'),
+    'Plane': (['xy_angle', 'elevation', 'x', 'y', 'z'], 'Flatness'),
+    'Point': (['x', 'y', 'z'], None),
+    'Line': (['xy_angle', 'elevation', 'x', 'y', 'z'], '3D Straightness'),
+}
+
+
+def format_step(number, comment, feature, values):
+    """Format a step of an OGP report
+
+    Parameters
+    ----------
+    number : int
+        Step number
+    comment : str
+        Comment of the step, usually the name of the feature
+    feature : str
+        Feature type, e.g. 'Sphere'
+    values : dict
+        {quantity: (actual, nominal)} with quantities as in `QUANTITIES`, angles in degrees
+
+    Returns
+    -------
+    step : str
+        Step block including the trailing separator line
+    """
+    lines = [f' Step:  {number:<6}MM     Cart  Decimal Degree   Measure                     ANSI ',
+             'Comment:    ',
+             f'{comment:<76}',
+             'Prompt:     ',
+             ' ' * 76,
+             f' {feature:<12}',
+             ' ' * 34 + 'Actual     Nominal     Upper     Lower']
+    for label in LABEL_ORDER:
+        name = QUANTITIES[label]
+        if name in values:
+            actual, nominal = values[name]
+            lines.append(' ' * 13 + f'{label:<21}{actual:+010.5f}  {nominal:+010.5f} +00.00000 -00.00000')
+
+    form = FEATURES.get(feature, (None, None))[1]
+    if form is not None:
+        lines += ['', ' ' * 34 + 'Actual   Tolerance                    ', ' ' * 13 + f'{form:<21}+000.00000   +00.00000']
+    lines += ['        Skip:    No  ',
+              'Points: 10     Touch Probe        Data Stream:   No          Hide:    No  ',
+              'DSM : 2MM_20MM  Tip # 1']
+    return '\r\n'.join(lines) + '\r\n' + SEPARATOR
+
+
+def template_values(step):
+    """Get nominal values of a step of the step table, see `Parser.read_steps`"""
+    return {name: step['actual'][name] for name in QUANTITIES.values() if np.isfinite(step['actual'][name])}
+
+
+def random_values(feature, rng):
+    """Get random nominal values of a synthetic feature within the volume of the OGP"""
+    values = {'x': rng.uniform(-300, 300), 'y': rng.uniform(-300, 300), 'z': rng.uniform(-50, 50),
+              'diameter': rng.uniform(1, 10), 'xy_angle': rng.uniform(-180, 180), 'elevation': rng.uniform(-90, 90)}
+    return {name: values[name] for name in FEATURES[feature][0]}
+
+
+def generate_report(output_file, n_steps, seed=0, template=None, noise=0.005):
+    """Write a synthetic OGP report
+
+    If a template survey data file is given, all its steps are written first with the same step
+    numbers, comments and feature types, so the report can replace the template in a survey.
+    The report is filled up with random Sphere, Plane, Point and Line features to n_steps.
+    The actual values are the nominal values smeared by a gaussian.
+
+    Parameters
+    ----------
+    output_file : str
+        Path to the report to write
+    n_steps : int
+        Number of steps, at least the number of steps of the template
+    seed : int
+        Seed of the random number generator
+    template : str
+        Survey data file to take the first steps from
+    noise : float
+        Standard deviation of the actual values around the nominal values in mm and degrees
+
+    Returns
+    -------
+    n_steps : int
+        Number of steps written
+    """
+    rng = np.random.default_rng(seed)
+
+    steps = []
+    if template is not None:
+        for step in Parser(template, cache=None).index:
+            steps.append((step['comment'], step['feature'], template_values(step)))
+
+    features = list(FEATURES)
+    for number in range(len(steps) + 1, n_steps + 1):
+        feature = features[rng.integers(len(features))]
+        steps.append((f'synthetic {feature.lower()} {number}', feature, random_values(feature, rng)))
+
+    with open(output_file, 'w', newline='') as file:
+        file.write(RTF_HEADER.replace('{name}', os.path.basename(output_file)))
+        for number, (comment, feature, nominal) in enumerate(steps, start=1):
+            values = {name: (value + rng.normal(0, noise), value) for name, value in nominal.items()}
+            if 'elevation' in values:
+                actual, value = values['elevation']
+                values['elevation'] = (np.clip(actual, -90, 90), value)
+            file.write(format_step(number, comment, feature, values))
+        file.write(RTF_FOOTER)
+
+    return len(steps)
+
+
+def generate_survey(output_dir, survey_files, n_steps, seed=0):
+    """Write synthetic OGP reports for all survey data files of a survey
+
+    Every survey data file is used as the template of one report (see `generate_report`),
+    so the synthetic survey can be processed like the real one.
+
+    Parameters
+    ----------
+    output_dir : str
+        Directory to write the reports to
+    survey_files : dict
+        Paths to survey data files, see `Survey2019`
+    n_steps : int
+        Number of steps of every report
+    seed : int
+        Seed of the random number generators
+
+    Returns
+    -------
+    survey_files : dict
+        Paths to the synthetic reports with the same keys as survey_files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    reports = {}
+    synthetic_files = {}
+    for key, template in survey_files.items():
+        # survey data files used for several frames are generated only once
+        if template not in reports:
+            report = os.path.join(output_dir, f'synthetic_{len(reports)}_{Path(template).name}')
+            n_template = len(Parser(template, cache=None).index)
+            generate_report(report, max(n_steps, n_template), seed=seed + len(reports), template=template)
+            reports[template] = report
+        synthetic_files[key] = reports[template]
+    return synthetic_files
+
+
+@app.command()
+def synthesize(
+    output_dir: Path = typer.Argument(..., help='directory to write the synthetic reports to'),
+    input_file: Path = typer.Option('survey_data/2019_file_list.json', help='file containing paths to survey data files used as templates'),
+    steps: int = typer.Option(1000, help='number of steps of every report'),
+    seed: int = typer.Option(0, help='seed of the random number generator')
+):
+    """Write synthetic OGP reports for benchmarks
+
+    One report is written for every survey data file, starting with its steps followed by random features.
+    The paths to the reports are written to file_list.json in output_dir.
+    """
+    with open(input_file) as json_file:
+        survey_files = json.load(json_file)
+
+    synthetic_files = generate_survey(output_dir, survey_files, steps, seed=seed)
+    with open(os.path.join(output_dir, 'file_list.json'), 'w') as json_file:
+        json.dump(synthetic_files, json_file, indent=4)
+    print(f'{len(set(synthetic_files.values()))} reports written to {output_dir}')
@@ -0,0 +1,110 @@
+
+import numpy as np
+
+from ._profile import profiler
+from ._cli import app
+
+
+class RigidTransform:
+    """Rigid transformation of a local frame into its parent frame
+
+    A frame is given by its orthonormal basis vectors and its origin in the parent frame,
+    as returned by the get_basis methods of the survey classes. With the basis vectors as rows,
+    a point p in the local frame is at ``origin + p @ basis`` in the parent frame.
+    Since the basis is orthonormal, the inverse is given by the transposed basis.
+
+    Transformations are composed with ``@``: if ``a_b`` is frame b in frame a and ``b_c`` is
+    frame c in frame b, ``a_b @ b_c`` is frame c in frame a.
+
+    The basis and origin can have leading batch dimensions, shape (..., 3, 3) and (..., 3),
+    e.g. to transform many frames at once. Batch dimensions are broadcast like numpy arrays.
+
+    Parameters
+    ----------
+    basis : np.array
+        Basis vectors (rows) of the local frame in the parent frame, identity if not given
+    origin : np.array
+        Origin of the local frame in the parent frame, zero if not given
+
+    Attributes
+    ----------
+    basis : np.array
+        Basis vectors (rows) of the local frame in the parent frame
+    origin : np.array
+        Origin of the local frame in the parent frame
+    """
+    __slots__ = ('basis', 'origin')
+
+    def __init__(self, basis=None, origin=None):
+        self.basis = np.identity(3) if basis is None else np.asarray(basis, dtype=float)
+        self.origin = np.zeros(self.basis.shape[:-1]) if origin is None else np.asarray(origin, dtype=float)
+
+    def __iter__(self):
+        """Unpack into basis and origin like the (basis, origin) tuples of the survey classes"""
+        return iter((self.basis, self.origin))
+
+    def __repr__(self):
+        return 'RigidTransform(basis={!r}, origin={!r})'.format(self.basis, self.origin)
+
+    def rotate(self, vectors):
+        """Transform directions from the local frame into the parent frame
+
+        Parameters
+        ----------
+        vectors : np.array
+            Direction vector(s) in the local frame, shape (..., 3)
+
+        Returns
+        -------
+        vectors : np.array
+            Direction vector(s) in the parent frame
+        """
+        vectors = np.asarray(vectors, dtype=float)
+        if self.basis.ndim == 2:
+            return np.matmul(vectors, self.basis)
+        return np.matmul(vectors[..., np.newaxis, :], self.basis)[..., 0, :]
+
+    def apply(self, points):
+        """Transform points from the local frame into the parent frame
+
+        Parameters
+        ----------
+        points : np.array
+            Point(s) in the local frame, shape (..., 3)
+
+        Returns
+        -------
+        points : np.array
+            Point(s) in the parent frame
+        """
+        return self.origin + self.rotate(points)
+
+    def inverse(self):
+        """Get the parent frame in the local frame
+
+        Returns
+        -------
+        inverse : RigidTransform
+            Inverse transformation, basis transposed instead of inverted
+        """
+        profiler.count('frame inversions')
+        basis = np.swapaxes(self.basis, -1, -2)
+        return RigidTransform(basis, -RigidTransform(basis).rotate(self.origin))
+
+    def compose(self, other):
+        """Chain with a transformation of a frame given in the local frame
+
+        Parameters
+        ----------
+        other : RigidTransform
+            Frame given in the local frame of this transformation
+
+        Returns
+        -------
+        transform : RigidTransform
+            Frame of other in the parent frame of this transformation
+        """
+        return RigidTransform(np.matmul(other.basis, self.basis), self.apply(other.origin))
+
+    def __matmul__(self, other):
+        return self.compose(other)
@@ -1,11 +1,15 @@
 
+import functools
+
 from ._utils import *
 from ._ballframe import BallFrame
 from ._pinframe import PinFrame
+from ._transform import RigidTransform
+from ._frames import Observable, memoized
 from ._cli import app
 
 
-class UChannel:
+class UChannel(Observable):
     """SVT uchannel class
 
     The uchannel has two volumes, top and bottom. Each volume has a ball frame and multiple pin frames.
@@ -22,17 +26,33 @@ class UChannel:
         PinFrame object for top volume, contains information for each layer
     pinframe_bot : PinFrame
         PinFrame object for bottom volume, contains information for each layer
+
+    Frames that are not given are created without input file, every uchannel gets its own.
+    The bases are computed once and kept until a measurement of the ball or pin frames is overridden.
     """
-    def __init__(self, ballframe_top=BallFrame(),
-                 ballframe_bot=BallFrame(),
-                 pinframe_top=PinFrame(),
-                 pinframe_bot=PinFrame()):
+    def __init__(self, ballframe_top=None,
+                 ballframe_bot=None,
+                 pinframe_top=None,
+                 pinframe_bot=None):
+
+        if ballframe_top is None:
+            ballframe_top = BallFrame()
+        if ballframe_bot is None:
+            ballframe_bot = BallFrame()
+        if pinframe_top is None:
+            pinframe_top = PinFrame()
+        if pinframe_bot is None:
+            pinframe_bot = PinFrame()
 
         self.ballframe_top = ballframe_top
         self.pinframe_top = pinframe_top
         self.ballframe_bot = ballframe_bot
         self.pinframe_bot = pinframe_bot
 
+        self.observe(ballframe_top, ballframe_bot,
+                     pinframe_top.pins, pinframe_top.base_planes, pinframe_bot.pins, pinframe_bot.base_planes)
+
+    @memoized
     def get_ball_basis(self, volume):
         """Get basis vectors and origin for ball frame
 
@@ -61,6 +81,7 @@ class UChannel:
 
         return basis, origin
 
+    @memoized
     def get_pin_basis(self, layer, volume):
         """Get basis vectors and origin for pin frame
 
@@ -90,6 +111,7 @@ class UChannel:
         basis, origin = pin_frame.get_basis(layer)
         return basis, origin
 
+    @memoized
     def pin_in_ballframe(self, layer, volume):
         """Transform pin coordinates to ball frame coordinates
 
@@ -105,19 +127,82 @@ class UChannel:
         pin_to_ball : np.array
             Numpy array of pin coordinates in ball frame
         """
-        pin_basis, pin_origin = self.get_pin_basis(layer, volume)
-        ball_basis, ball_origin = self.get_ball_basis(volume)
-        # rotation of basis vectors from pin frame to ball frame
-        basis = np.matmul(pin_basis, np.linalg.inv(ball_basis))
+        ogp_pin = RigidTransform(*self.get_pin_basis(layer, volume))
+        ogp_ball = self.get_ball_frame(volume)
+
+        return tuple(ogp_ball.inverse() @ ogp_pin)
+
+    @memoized
+    def pins_in_ballframe(self, volume, layers):
+        """Get the pin frames of several layers in the ball frame at once
+
+        Parameters
+        ----------
+        volume : str
+            Volume ('top' or 'bottom')
+        layers : tuple
+            Layer numbers
+
+        Returns
+        -------
+        bases : np.array
+            Basis vectors of the pin frames in the ball frame, shape (layers, 3, 3)
+        origins : np.array
+            Origins of the pin frames in the ball frame, shape (layers, 3)
+        """
+        if volume == 'top':
+            pin_frame = self.pinframe_top
+        elif volume == 'bottom':
+            pin_frame = self.pinframe_bot
+        else:
+            raise ValueError('Invalid volume: {}'.format(volume))
+
+        ogp_pins = RigidTransform(*pin_frame.get_bases(layers))
+        return tuple(self.get_ball_frame(volume).inverse() @ ogp_pins)
+
+    @memoized
+    def get_ball_frame(self, volume):
+        """Get ball frame as used to express the pin frames in it
+
+        For the MattBallFrame, the pin origins are not shifted by the ball frame origin,
+        i.e. the ball frame is taken to be at the origin of the Matt system.
+
+        Parameters
+        ----------
+        volume : str
+            Volume ('top' or 'bottom')
+
+        Returns
+        -------
+        ball_frame : RigidTransform
+            Ball frame in OGP (or other global) coordinates
+        """
+        ogp_ball = RigidTransform(*self.get_ball_basis(volume))
 
         if volume == 'top' and self.ballframe_top.__class__.__name__ == 'MattBallFrame':
-            origin = pin_origin
+            ogp_ball = RigidTransform(ogp_ball.basis)
         elif volume == 'bottom' and self.ballframe_bot.__class__.__name__ == 'MattBallFrame':
-            origin = pin_origin
-        else:
-            # translation of origin in ball frame
-            origin = pin_origin - ball_origin
+            ogp_ball = RigidTransform(ogp_ball.basis)
 
-        origin = np.matmul(origin, np.linalg.inv(ball_basis))
+        return ogp_ball
 
-        return basis, origin
+    def register_frames(self, frames, layers=range(4)):
+        """Register the uchannel frames in a frame graph
+
+        For each volume, the ball frame '{volume} ball' and the pin frames '{volume} L{layer} pin'
+        are registered in the coordinate system of the uchannel measurement '{volume} ogp'.
+
+        Parameters
+        ----------
+        frames : FrameGraph
+            Frame graph of the survey
+        layers : list
+            Layers to register pin frames for
+        """
+        for volume, ballframe, pinframe in [('top', self.ballframe_top, self.pinframe_top),
+                                            ('bottom', self.ballframe_bot, self.pinframe_bot)]:
+            frames.add_edge(f'{volume} ogp', f'{volume} ball', functools.partial(self.get_ball_frame, volume),
+                            sources=[ballframe])
+            for layer in layers:
+                frames.add_edge(f'{volume} ogp', f'{volume} L{layer} pin', functools.partial(self.get_pin_basis, layer, volume),
+                                sources=[pinframe.pins, pinframe.base_planes])
@@ -0,0 +1,269 @@
+
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import typer
+
+from ._cli import app
+from ._parser import Feature
+from ._survey import make_survey
+
+# parameters of a SurveyVolume in the order of the rows and columns of its covariance matrix
+PARAMETERS = ['origin_x', 'origin_y', 'origin_z',
+              'X_x', 'X_y', 'X_z',
+              'Y_x', 'Y_y', 'Y_z',
+              'Z_x', 'Z_y', 'Z_z']
+POSITIONS = ('x', 'y', 'z')
+ANGLES = ('xy_angle', 'elevation')
+
+
+def survey_objects(survey):
+    """Get the survey objects holding the measurements of a survey
+
+    Parameters
+    ----------
+    survey : Survey
+        Survey object
+
+    Returns
+    -------
+    objects : list
+        Ball frames, pins, base planes, fixtures and sensors of the survey, each object once
+    """
+    uchannel = survey.uchannel
+    objects = [uchannel.ballframe_top, uchannel.ballframe_bot,
+               uchannel.pinframe_top.pins, uchannel.pinframe_top.base_planes,
+               uchannel.pinframe_bot.pins, uchannel.pinframe_bot.base_planes]
+    for volume in survey.sensors.values():
+        for layer in volume.values():
+            for sensor in layer.values():
+                objects += [sensor.fixture, sensor]
+    objects += [getattr(survey, name) for name in ['fixture', 'transition_fixture'] if hasattr(survey, name)]
+
+    unique = {}
+    for obj in objects:
+        unique.setdefault(id(obj), obj)
+    return list(unique.values())
+
+
+def measured_features(obj):
+    """Get the features of a survey object that are read from its survey data file
+
+    Parameters
+    ----------
+    obj : object
+        Survey object, e.g. Fixture or MattSensor
+
+    Returns
+    -------
+    features : dict
+        {attribute: Feature}
+    """
+    features = {}
+    for cls in reversed(type(obj).__mro__):
+        for attr, value in vars(cls).items():
+            if isinstance(value, Feature):
+                features[attr] = value
+    return features
+
+
+def feature_sigmas(obj, feature, position_sigma, angle_sigma):
+    """Get the standard deviations of the coordinates of a feature
+
+    Half of the tolerance band of the OGP step is taken as standard deviation.
+    Coordinates without tolerance in the survey data file get the default standard deviations.
+
+    Parameters
+    ----------
+    obj : object
+        Survey object the feature belongs to
+    feature : Feature
+        Feature of the survey object
+    position_sigma : float
+        Default standard deviation of positions in mm
+    angle_sigma : float
+        Default standard deviation of angles in radians
+
+    Returns
+    -------
+    sigmas : dict
+        Standard deviations {'x': sigma_x, ...}, angles in radians
+    """
+    sigmas = {name: position_sigma for name in POSITIONS}
+    sigmas.update({name: angle_sigma for name in ANGLES})
+
+    parser = getattr(obj, 'parser', None)
+    if parser is None or not parser.indexed:
+        return sigmas
+
+    step = feature.lookup(parser.find_step)
+    for name in sigmas:
+        band = float(step['upper'][name]) - float(step['lower'][name])
+        if band > 0:
+            sigmas[name] = math.radians(band / 2) if name in ANGLES else band / 2
+    return sigmas
+
+
+def perturb_survey(survey, n_draws, rng, position_sigma=0.005, angle_sigma=math.radians(0.005)):
+    """Replace all measurements of a survey by normally distributed draws
+
+    The coordinates of every measured feature become arrays of n_draws values around the
+    measured value, so the SurveyVolumes of the survey are computed for all draws at once,
+    with an additional leading axis of length n_draws.
+
+    Parameters
+    ----------
+    survey : Survey
+        Survey object, its measurements are overridden
+    n_draws : int
+        Number of draws
+    rng : np.random.Generator
+        Random number generator
+    position_sigma : float
+        Default standard deviation of positions in mm, see `feature_sigmas`
+    angle_sigma : float
+        Default standard deviation of angles in radians, see `feature_sigmas`
+
+    Returns
+    -------
+    n_features : int
+        Number of perturbed features
+    """
+    n_features = 0
+    for obj in survey_objects(survey):
+        for attr, feature in measured_features(obj).items():
+            try:
+                coords = getattr(obj, attr)
+            except KeyError:
+                # feature not measured in this survey, it cannot be used either
+                continue
+
+            sigmas = feature_sigmas(obj, feature, position_sigma, angle_sigma)
+            setattr(obj, attr, {name: value + sigmas[name] * rng.standard_normal(n_draws)
+                                for name, value in coords.items()})
+            n_features += 1
+        obj.changed()
+    return n_features
+
+
+def volume_parameters(volume):
+    """Get the parameters of SurveyVolumes as array
+
+    Parameters
+    ----------
+    volume : dict
+        SurveyVolume, see `Survey2019.survey_volume`, with basis (..., 3, 3) and origin (..., 3)
+
+    Returns
+    -------
+    parameters : np.array
+        Origin and unit vectors X, Y, Z, shape (..., 12), see `PARAMETERS`
+    """
+    basis = np.asarray(volume['basis'])
+    origin = np.asarray(volume['origin'])
+    return np.concatenate([origin, basis.reshape(basis.shape[:-2] + (9,))], axis=-1)
+
+
+def propagate(year, survey_files, n_draws=100000, seed=None, position_sigma=0.005, angle_sigma=math.radians(0.005)):
+    """Propagate the measurement uncertainties to the SurveyVolumes
+
+    All draws are pushed through the frame chain of the survey at once, see `perturb_survey`.
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    survey_files : dict
+        Paths to survey data files
+    n_draws : int
+        Number of draws
+    seed : int
+        Seed of the random number generator
+    position_sigma : float
+        Default standard deviation of positions in mm
+    angle_sigma : float
+        Default standard deviation of angles in radians
+
+    Returns
+    -------
+    results : list
+        {'name': str, 'origin': np.array, 'basis': np.array, 'mean': np.array, 'covariance': np.array}
+        for every SurveyVolume, mean and covariance of the parameters in `PARAMETERS`
+    """
+    nominal = make_survey(year, survey_files).survey_volumes()
+
+    survey = make_survey(year, survey_files)
+    perturb_survey(survey, n_draws, np.random.default_rng(seed), position_sigma, angle_sigma)
+
+    results = []
+    for volume, draws in zip(nominal, survey.survey_volumes()):
+        parameters = volume_parameters(draws)
+        results.append({'name': volume['name'], 'origin': volume['origin'], 'basis': volume['basis'],
+                        'mean': parameters.mean(axis=0), 'covariance': np.cov(parameters, rowvar=False)})
+    return results
+
+
+def write_uncertainties(output_file, results, n_draws):
+    """Write the covariances of the SurveyVolumes to a JSON file
+
+    Parameters
+    ----------
+    output_file : str
+        Output file
+    results : list
+        Results of `propagate`
+    n_draws : int
+        Number of draws the covariances were estimated from
+    """
+    output = {'draws': n_draws, 'parameters': PARAMETERS, 'volumes': []}
+    for result in results:
+        output['volumes'].append({'name': result['name'],
+                                  'origin': result['origin'].tolist(),
+                                  'basis': result['basis'].tolist(),
+                                  'mean': result['mean'].tolist(),
+                                  'std': np.sqrt(np.diag(result['covariance'])).tolist(),
+                                  'covariance': result['covariance'].tolist()})
+    with open(output_file, 'w') as json_file:
+        json.dump(output, json_file, indent=2)
+
+
+def print_uncertainties(results):
+    """Print the standard deviations of the origins in um and of the unit vectors in mrad"""
+    print(f'{"volume":<32} {"origin x":>9} {"origin y":>9} {"origin z":>9} {"X":>9} {"Y":>9} {"Z":>9}')
+    for result in results:
+        std = np.sqrt(np.diag(result['covariance']))
+        # for small rotations, the standard deviation of a unit vector is the angle of the rotation
+        angles = [np.linalg.norm(std[i:i+3]) for i in (3, 6, 9)]
+        print(f'{result["name"]:<32} ' + ' '.join(f'{value * 1000:9.2f}' for value in list(std[:3]) + angles))
+
+
+@app.command()
+def uncertainty(
+    year: int = typer.Argument(..., help='year of detector'),
+    input_file: Path = typer.Argument(..., help='file containing paths to survey data files'),
+    output_file: str = typer.Option(None, help='JSON file to write the covariances to, defaults to {year}_survey_uncertainties.json'),
+    draws: int = typer.Option(100000, help='number of Monte Carlo draws'),
+    seed: int = typer.Option(None, help='seed of the random number generator'),
+    position_sigma: float = typer.Option(0.005, help='standard deviation of measured positions in mm'),
+    angle_sigma: float = typer.Option(0.005, help='standard deviation of measured angles in degrees')
+):
+    """Propagate the measurement uncertainties to the SurveyVolumes
+
+    Every measured ball, pin, plane and sensor feature is drawn from a normal distribution
+    around its measured value, with half of the tolerance band of its OGP step as standard deviation,
+    or the given defaults if the step has no tolerance. The covariance of the origin and unit vectors
+    of every SurveyVolume is written to a JSON file, the standard deviations of the origins (um)
+    and unit vectors (mrad) are printed.
+    """
+    with open(input_file) as json_file:
+        survey_files = json.load(json_file)
+
+    if output_file is None:
+        output_file = f'{year}_survey_uncertainties.json'
+
+    results = propagate(year, survey_files, draws, seed, position_sigma, math.radians(angle_sigma))
+    write_uncertainties(output_file, results, draws)
+    print_uncertainties(results)
+    print(f'covariances from {draws} draws written to {output_file}')
@@ -4,8 +4,20 @@ import numpy as np
 from ._cli import app
 
 
+def location(coords):
+    """Get the position of a measured feature from its coordinates {'x': x, 'y': y, 'z': z}
+
+    The coordinates can also be arrays of N values, e.g. draws of a measurement,
+    the position then has shape (N, 3).
+    """
+    position = np.array([coords['x'], coords['y'], coords['z']])
+    return position if position.ndim == 1 else np.moveaxis(position, 0, -1)
+
+
 def normalize(vec):
-    """Normalize a vector"""
+    """Normalize a vector, see `normalize_batch` for arrays of vectors"""
+    if np.ndim(vec) > 1:
+        return normalize_batch(vec)
     if np.linalg.norm(vec) == 0:
         return vec
     return vec/np.linalg.norm(vec)
@@ -25,7 +37,11 @@ def normal_vector(az, el):
     -------
     normal : np.array
         Normal vector
+
+    Arrays of angles are handled by `normal_vector_batch`.
     """
+    if np.ndim(az) > 0 or np.ndim(el) > 0:
+        return normal_vector_batch(az, el)
     if (el < 0):
         az = az + math.pi
         el = -1.0 * el
@@ -38,7 +54,9 @@ def normal_vector(az, el):
 
 
 def orthogonalize(vec1, vec2):
-    """Orthogonalize vec2 with respect to vec1"""
+    """Orthogonalize vec2 with respect to vec1, see `orthogonalize_batch` for arrays of vectors"""
+    if max(np.ndim(vec1), np.ndim(vec2)) > 1:
+        return orthogonalize_batch(vec1, vec2)
     if np.dot(vec1, vec1) == 0:
         return vec2
     return vec2 - np.dot(vec1, vec2)/np.dot(vec1, vec1) * vec1
@@ -58,7 +76,11 @@ def make_basis(vec1, vec2):
     -------
     basis : np.array
         Orthonormal basis
+
+    Arrays of vectors are handled by `make_basis_batch`.
     """
+    if max(np.ndim(vec1), np.ndim(vec2)) > 1:
+        return make_basis_batch(vec1, vec2)
     basis = np.empty([3, 3])
 
     basis[0] = normalize(vec1)
@@ -69,5 +91,127 @@ def make_basis(vec1, vec2):
 
 
 def project_to_plane(vec, plane_origin, plane_normal):
-    """Project a vector onto a plane"""
+    """Project a vector onto a plane, see `project_to_plane_batch` for arrays of vectors"""
+    if max(np.ndim(vec), np.ndim(plane_origin), np.ndim(plane_normal)) > 1:
+        return project_to_plane_batch(vec, plane_origin, plane_normal)
     return vec - np.dot(vec - plane_origin, plane_normal) * plane_normal
+
+
+def _dot(vec1, vec2):
+    """Row-wise dot product of arrays of vectors, keeps the last axis for broadcasting"""
+    return np.einsum('...i,...i->...', vec1, vec2)[..., np.newaxis]
+
+
+def normalize_batch(vecs):
+    """Normalize many vectors at once
+
+    Vectors of zero length are returned unchanged, like in `normalize`.
+
+    Parameters
+    ----------
+    vecs : np.array
+        Vectors, shape (N, 3)
+
+    Returns
+    -------
+    normalized : np.array
+        Normalized vectors, shape (N, 3)
+    """
+    vecs = np.asarray(vecs, dtype=float)
+    norms = np.linalg.norm(vecs, axis=-1, keepdims=True)
+    return np.divide(vecs, norms, out=vecs.copy(), where=norms != 0)
+
+
+def normal_vector_batch(az, el):
+    """Return normal vectors for arrays of azimuth and elevation angles
+
+    Negative elevations are flipped to the upper hemisphere like in `normal_vector`.
+
+    Parameters
+    ----------
+    az : np.array
+        Azimuth angles in radians, shape (N,)
+    el : np.array
+        Elevation angles in radians, shape (N,)
+
+    Returns
+    -------
+    normals : np.array
+        Normal vectors, shape (N, 3)
+    """
+    az, el = np.broadcast_arrays(np.asarray(az, dtype=float), np.asarray(el, dtype=float))
+    flip = el < 0
+    az = np.where(flip, az + math.pi, az)
+    el = np.where(flip, -el, el)
+    return np.stack([np.cos(az) * np.cos(el), np.sin(az) * np.cos(el), np.sin(el)], axis=-1)
+
+
+def orthogonalize_batch(vecs1, vecs2):
+    """Orthogonalize each of vecs2 with respect to the matching vector in vecs1
+
+    Where vecs1 is a zero vector, vecs2 is returned unchanged like in `orthogonalize`.
+
+    Parameters
+    ----------
+    vecs1 : np.array
+        Reference vectors, shape (N, 3)
+    vecs2 : np.array
+        Vectors to orthogonalize, shape (N, 3)
+
+    Returns
+    -------
+    orthogonalized : np.array
+        Orthogonalized vectors, shape (N, 3)
+    """
+    vecs1 = np.asarray(vecs1, dtype=float)
+    vecs2 = np.asarray(vecs2, dtype=float)
+    norms = _dot(vecs1, vecs1)
+    scale = np.divide(_dot(vecs1, vecs2), norms, out=np.zeros_like(norms), where=norms != 0)
+    return vecs2 - scale * vecs1
+
+
+def make_basis_batch(vecs1, vecs2):
+    """Make orthonormal bases from pairs of vectors, see `make_basis`
+
+    Parameters
+    ----------
+    vecs1 : np.array
+        First vectors, shape (N, 3)
+    vecs2 : np.array
+        Second vectors, shape (N, 3)
+
+    Returns
+    -------
+    bases : np.array
+        Orthonormal bases with the basis vectors as rows, shape (N, 3, 3)
+    """
+    vecs1, vecs2 = np.broadcast_arrays(np.asarray(vecs1, dtype=float), np.asarray(vecs2, dtype=float))
+    bases = np.empty(vecs1.shape[:-1] + (3, 3))
+
+    bases[..., 0, :] = normalize_batch(vecs1)
+    bases[..., 1, :] = normalize_batch(orthogonalize_batch(vecs1, vecs2))
+    bases[..., 2, :] = np.cross(bases[..., 0, :], bases[..., 1, :])
+
+    return bases
+
+
+def project_to_plane_batch(vecs, plane_origins, plane_normals):
+    """Project many vectors onto planes
+
+    Parameters
+    ----------
+    vecs : np.array
+        Vectors, shape (N, 3)
+    plane_origins : np.array
+        Plane origins, shape (N, 3) or (3,) for a common plane
+    plane_normals : np.array
+        Plane normals, shape (N, 3) or (3,) for a common plane
+
+    Returns
+    -------
+    projected : np.array
+        Projected vectors, shape (N, 3)
+    """
+    vecs = np.asarray(vecs, dtype=float)
+    plane_normals = np.asarray(plane_normals, dtype=float)
+    return vecs - _dot(vecs - plane_origins, plane_normals) * plane_normals
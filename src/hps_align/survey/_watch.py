@@ -0,0 +1,215 @@
+
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import typer
+
+from ._cli import app
+from ._incremental import update_survey_volumes, state_file_name
+from ._survey import write_survey_volumes
+
+
+def snapshot(directory, files=(), exclude=()):
+    """Get modification times and sizes of the files in a directory
+
+    Parameters
+    ----------
+    directory : str
+        Directory that is searched recursively
+    files : list
+        Additional files, e.g. survey data files outside of the directory
+    exclude : list
+        Files to ignore, e.g. output files written to the directory
+
+    Returns
+    -------
+    snapshot : dict
+        {path: (mtime_ns, size)} of all existing files
+    """
+    paths = [path for path in Path(directory).rglob('*') if path.is_file()]
+    paths += [Path(path) for path in files]
+
+    exclude = {os.path.realpath(path) for path in exclude}
+    result = {}
+    for path in paths:
+        if os.path.realpath(path) in exclude:
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        result[os.path.realpath(path)] = (stat.st_mtime_ns, stat.st_size)
+    return result
+
+
+def volume_delta(old, new):
+    """Get the change of a SurveyVolume
+
+    The origins and bases can also be arrays of many SurveyVolumes, shape (..., 3) and (..., 3, 3),
+    they are broadcast against each other.
+
+    Parameters
+    ----------
+    old : dict
+        SurveyVolume before the change, see `Survey2019.survey_volume`
+    new : dict
+        SurveyVolume after the change
+
+    Returns
+    -------
+    shift : float
+        Distance between the origins
+    angle : float
+        Rotation angle between the bases in rad
+    """
+    shift = np.linalg.norm(np.asarray(new['origin']) - np.asarray(old['origin']), axis=-1)
+    # for orthonormal bases, |new - old| = |rotation - 1| = 2 sqrt(2) sin(angle / 2),
+    # which unlike the trace of the rotation is precise for small angles
+    distance = np.linalg.norm(np.asarray(new['basis']) - np.asarray(old['basis']), axis=(-2, -1))
+    angle = 2 * np.arcsin(np.clip(distance / (2 * np.sqrt(2)), 0, 1))
+    return shift, angle
+
+
+class SurveyWatcher:
+    """Re-derive SurveyVolumes when survey data files change
+
+    The directory is polled for new or modified files. Once no file changed for the debounce time,
+    the SurveyVolumes depending on changed survey data files are recomputed (see `update_survey_volumes`)
+    and the output file is rewritten. Unchanged survey data files are not parsed again thanks to the
+    parse cache, SurveyVolumes whose survey data files do not exist yet are left out.
+
+    Parameters
+    ----------
+    year : int
+        Year of detector
+    directory : str
+        Directory the survey data files are written to
+    survey_files : dict
+        Paths to survey data files, see `Survey2019`
+    output_file : str
+        Output file to write the SurveyVolumes to
+    debounce : float
+        Time in s without any change before the SurveyVolumes are updated
+
+    Attributes
+    ----------
+    volumes : dict
+        Current SurveyVolumes {name: SurveyVolume}
+    """
+
+    def __init__(self, year, directory, survey_files, output_file, debounce=0.5):
+        self.year = year
+        self.directory = directory
+        self.survey_files = survey_files
+        self.output_file = output_file
+        self.debounce = debounce
+
+        self.volumes = {}
+        self._snapshot = None
+        self._changed_at = None
+
+    def update(self):
+        """Recompute SurveyVolumes of changed survey data files and rewrite the output file
+
+        Returns
+        -------
+        changes : list
+            List of (name, shift, angle) of the recomputed SurveyVolumes, see `volume_delta`.
+            shift and angle are None for new SurveyVolumes.
+        """
+        volumes, recomputed = update_survey_volumes(self.year, self.survey_files, state_file_name(self.output_file),
+                                                    skip_missing=True)
+        write_survey_volumes(self.output_file, volumes)
+
+        changes = []
+        volumes = {volume['name']: volume for volume in volumes}
+        for name in recomputed:
+            if name in self.volumes:
+                changes.append((name, *volume_delta(self.volumes[name], volumes[name])))
+            else:
+                changes.append((name, None, None))
+        self.volumes = volumes
+        return changes
+
+    def poll(self, now=None):
+        """Check for changed files and update once they are settled
+
+        Parameters
+        ----------
+        now : float
+            Current time in s, defaults to time.monotonic()
+
+        Returns
+        -------
+        changes : list
+            Changes of the SurveyVolumes if they were updated, see `update`, None otherwise
+        """
+        if now is None:
+            now = time.monotonic()
+
+        current = snapshot(self.directory, self.survey_files.values(),
+                           exclude=[self.output_file, state_file_name(self.output_file)])
+        if current != self._snapshot:
+            # files are still being written, wait until they are settled
+            self._snapshot = current
+            self._changed_at = now
+            return None
+
+        if self._changed_at is None or now - self._changed_at < self.debounce:
+            return None
+
+        self._changed_at = None
+        return self.update()
+
+
+def print_changes(changes):
+    """Print changes of the SurveyVolumes, see `SurveyWatcher.update`"""
+    for name, shift, angle in changes:
+        if shift is None:
+            print(f'  {name:<32} new')
+        else:
+            print(f'  {name:<32} origin {1e3 * shift:10.3f} um   rotation {1e3 * angle:10.4f} mrad')
+
+
+@app.command()
+def watch(
+    directory: Path = typer.Argument(..., help='directory the survey data files are written to'),
+    input_file: Path = typer.Argument(..., help='file containing paths to survey data files'),
+    year: int = typer.Option(2019, help='year of detector'),
+    output_file: str = typer.Option(None, help='output file to write data to'),
+    interval: float = typer.Option(0.2, help='time in s between checks of the directory'),
+    debounce: float = typer.Option(0.5, help='time in s without any change before the survey data is updated')
+):
+    """Update survey data whenever survey data files change
+
+    The directory is polled for new or modified files. Once they are settled, only the
+    SurveyVolumes depending on changed survey data files are recomputed, the output file is
+    rewritten and the changes of the SurveyVolumes are printed. Stop with Ctrl+C.
+    """
+    with open(input_file) as json_file:
+        survey_files = json.load(json_file)
+
+    if output_file is None:
+        output_file = f'{year}_survey_results.xml'
+
+    watcher = SurveyWatcher(year, directory, survey_files, output_file, debounce=debounce)
+    print(f'watching {directory}, writing {output_file}')
+    try:
+        while True:
+            try:
+                changes = watcher.poll()
+            except (KeyError, ValueError) as e:
+                # e.g. a survey data file that is incomplete, wait for the next change
+                print(f'survey data not usable: {e}')
+                continue
+            finally:
+                time.sleep(interval)
+
+            if changes:
+                print(f'{time.strftime("%H:%M:%S")} updated {len(changes)} of {len(watcher.volumes)} SurveyVolumes')
+                print_changes(changes)
+    except KeyboardInterrupt:
+        pass
@@ -1,12 +1,15 @@
 import warnings
 
 from ._utils import *
-from ._parser import Parser
+from ._parser import Parser, Feature
 from ._cli import app
 
 
 class Wire:
 
+    parallel_wire_dict = Feature('Parallel wire')
+    diagonal_wire_dict = Feature('Diagonal wire')
+
     def __init__(self, input_file=None):
         """Initialize Wire object
 
@@ -23,6 +26,3 @@ class Wire:
 
         self.input_file = input_file
         self.parser = Parser(input_file)
-
-        self.parallel_wire_dict = self.parser.get_coords('Parallel wire')
-        self.diagonal_wire_dict = self.parser.get_coords('Diagonal wire')
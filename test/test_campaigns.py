@@ -0,0 +1,52 @@
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from hps_align.survey._campaigns import campaigns, find_file_lists, run_campaign, TABLE_HEADER
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestCampaigns(unittest.TestCase):
+
+    def setUp(self):
+        # the file lists contain paths relative to the repository
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.output_dir)
+
+    def test_find_file_lists(self):
+        file_lists = find_file_lists(['survey_data/2019_file_list*.json', 'survey_data/2019_file_list.json'])
+        self.assertEqual(['survey_data/2019_file_list.json',
+                          'survey_data/2019_file_list_meas2.json',
+                          'survey_data/2019_file_list_meas3.json'], file_lists)
+
+        with self.assertRaises(ValueError):
+            find_file_lists(['survey_data/no_such_list*.json'])
+
+    def test_same_as_serial(self):
+        serial_file = os.path.join(self.output_dir, 'serial.xml')
+        volumes = run_campaign(2019, 'survey_data/2019_file_list.json', serial_file)
+
+        campaigns(2019, ['survey_data/2019_file_list*.json'], output_dir=self.output_dir, table=None, jobs=2,
+                  cache_dir=None, cache=False, rebuild_cache=False)
+
+        with open(serial_file) as serial, open(os.path.join(self.output_dir, '2019_file_list_survey_results.xml')) as parallel:
+            self.assertEqual(serial.read(), parallel.read())
+        for name in ['2019_file_list_meas2', '2019_file_list_meas3']:
+            self.assertTrue(os.path.isfile(os.path.join(self.output_dir, f'{name}_survey_results.xml')))
+
+        with open(os.path.join(self.output_dir, '2019_survey_campaigns.csv')) as table:
+            rows = list(csv.reader(table))
+        self.assertEqual(TABLE_HEADER, rows[0])
+        # meas3 has no L1 axial top measurement
+        self.assertEqual(3 * len(volumes) - 1, len(rows) - 1)
+        self.assertNotIn(['2019_file_list_meas3', 'module_L2t_halfmodule_axial'], [row[:2] for row in rows])
+        self.assertEqual(['2019_file_list', volumes[0]['name'], str(volumes[0]['origin'][0])], rows[1][:3])
@@ -0,0 +1,64 @@
+
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from hps_align.survey._diff import diff_survey_volumes
+from hps_align.survey._survey import Survey2019, read_survey_volumes, write_survey_volumes
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def rotation_z(angle):
+    return np.array([[np.cos(angle), np.sin(angle), 0], [-np.sin(angle), np.cos(angle), 0], [0, 0, 1]])
+
+
+class TestReadSurveyVolumes(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey = Survey2019(json.load(json_file))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        file_name = os.path.join(self.tmp_dir.name, 'results.xml')
+        self.survey.print_results(file_name)
+        table = self.survey.volume_table()
+
+        # small chunks split the elements
+        volumes = read_survey_volumes(file_name, chunk_size=50)
+        for field in ['name', 'desc', 'origin', 'basis']:
+            np.testing.assert_array_equal(table[field], volumes[field])
+
+        copy_name = os.path.join(self.tmp_dir.name, 'copy.xml')
+        write_survey_volumes(copy_name, volumes)
+        with open(file_name) as original, open(copy_name) as copy:
+            self.assertEqual(original.read(), copy.read())
+
+    def test_diff(self):
+        table = self.survey.volume_table()
+        moved = table.copy()
+        moved['origin'][1] += [0.003, 0, -0.004]
+        moved['basis'][2] = np.matmul(rotation_z(1e-6), moved['basis'][2])
+        shortened = table[:-1]
+
+        names, deltas, shifts, angles, missing = diff_survey_volumes([table, moved, shortened])
+        self.assertEqual(table['name'].tolist()[:-1], names)
+        self.assertEqual([[], [], [table['name'][-1]]], missing)
+        self.assertEqual((3, 11, 3), deltas.shape)
+
+        np.testing.assert_allclose([0.003, 0, -0.004], deltas[1, 1], atol=1e-15)
+        self.assertAlmostEqual(0.005, shifts[1, 1])
+        self.assertAlmostEqual(1e-6, angles[1, 2], delta=1e-12)
+        self.assertEqual(0, angles[1, 1])
+        np.testing.assert_array_equal(np.zeros((11,)), shifts[2])
+        np.testing.assert_array_equal(np.zeros((11,)), angles[0])
@@ -0,0 +1,62 @@
+
+import os
+import unittest
+import warnings
+from unittest import mock
+
+import numpy as np
+
+from hps_align.survey._edges import SensorEdge
+from hps_align.survey._fixture import Fixture
+from hps_align.survey._mattsensor import MattSensor
+from hps_align.survey._parser import Parser
+
+INPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'survey_data', 'meas2', 'uchannel_full_top_2.txt')
+
+
+class TestSensorEdge(unittest.TestCase):
+
+    def test_no_input(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            edges = SensorEdge()
+        point, direction = edges.get_edge(2, 'stereo')
+        np.testing.assert_array_equal(np.zeros(3), point)
+        with self.assertRaises(ValueError):
+            edges.get_edge(4, 'axial')
+        with self.assertRaises(ValueError):
+            edges.get_edge(0, 'front')
+
+    def test_edges(self):
+        edges = SensorEdge(INPUT_FILE)
+        scan = Parser(INPUT_FILE, indexed=False)
+        self.assertEqual(scan.get_coords('L3 axial front edge'), edges.L3_axial_frontedge_dict)
+        self.assertEqual(scan.get_coords('L2 stereo back edge'), edges.L2_stereo_backedge_dict)
+        self.assertEqual(scan.get_coords('Step:  51', 20), edges.L1_stereo_backedge_dict)
+
+        point, direction = edges.get_edge(3, 'axial')
+        np.testing.assert_allclose(1, np.linalg.norm(direction))
+        self.assertEqual(edges.L3_axial_frontedge_dict['x'], point[0])
+
+
+class TestMattSensorEdges(unittest.TestCase):
+
+    def setUp(self):
+        self.input_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'survey_data', 'meas1', 'L0_axial_top_module1_1.txt')
+        fixture_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'survey_data', 'fixture', 'L0', 'transitionPlate_ogp_coords.txt')
+        self.sensor = MattSensor(Fixture(fixture_file), self.input_file)
+
+    def test_edges(self):
+        scan = Parser(self.input_file, indexed=False)
+        for attr, name in [('active_edge_beam_dict', 'Active edge beam'), ('active_edge_away_dict', 'Active edge away'),
+                           ('physical_edge_dict', 'Sensor physical edge')]:
+            self.assertEqual(scan.get_coords(name), getattr(self.sensor, attr))
+
+    def test_no_file_access(self):
+        basis, origin = self.sensor.get_sensor_basis_pinframe()
+        self.sensor.changed()
+        # all measurements are kept in the sensor, the basis is derived again without reading the file
+        with mock.patch('builtins.open', side_effect=AssertionError('survey data file read')):
+            new_basis, new_origin = self.sensor.get_sensor_basis_pinframe()
+        np.testing.assert_array_equal(basis, new_basis)
+        np.testing.assert_array_equal(origin, new_origin)
@@ -0,0 +1,171 @@
+
+import json
+import os
+import unittest
+
+import numpy as np
+
+from hps_align.survey._fixture import Fixture
+from hps_align.survey._frames import FrameGraph
+from hps_align.survey._survey import Survey2019
+from hps_align.survey._transform import RigidTransform
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def rotation_z(angle):
+    return np.array([[np.cos(angle), np.sin(angle), 0], [-np.sin(angle), np.cos(angle), 0], [0, 0, 1]])
+
+
+class TestFrameGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.frames = FrameGraph()
+        self.frames.add_edge('a', 'b', lambda: self.derive('b', rotation_z(0.1), [1, 0, 0]))
+        self.frames.add_edge('b', 'c', lambda: self.derive('c', rotation_z(0.2), [0, 2, 0]))
+        self.frames.add_edge('a', 'd', lambda: self.derive('d', rotation_z(-0.5), [0, 0, 3]))
+
+    def derive(self, name, basis, origin):
+        self.calls.append(name)
+        return basis, np.array(origin)
+
+    def test_path(self):
+        self.assertEqual(['c', 'b', 'a', 'd'], self.frames.path('c', 'd'))
+        self.assertEqual(['a'], self.frames.path('a', 'a'))
+
+        self.frames.add_edge('e', 'f', lambda: (np.identity(3), np.zeros(3)))
+        with self.assertRaises(ValueError):
+            self.frames.path('a', 'f')
+        with self.assertRaises(KeyError):
+            self.frames.path('a', 'g')
+        with self.assertRaises(ValueError):
+            self.frames.add_edge('b', 'a', lambda: (np.identity(3), np.zeros(3)))
+
+    def test_transform(self):
+        a_b = RigidTransform(rotation_z(0.1), [1, 0, 0])
+        b_c = RigidTransform(rotation_z(0.2), [0, 2, 0])
+        a_d = RigidTransform(rotation_z(-0.5), [0, 0, 3])
+        point = np.array([1, -2, 0.5])
+
+        np.testing.assert_allclose((a_b @ b_c).apply(point), self.frames.transform('c', 'a').apply(point))
+        np.testing.assert_allclose((a_d.inverse() @ a_b @ b_c).apply(point), self.frames.transform('c', 'd').apply(point))
+        np.testing.assert_allclose(point, self.frames.transform('d', 'd').apply(point))
+
+    def test_cache(self):
+        transform = self.frames.transform('c', 'd')
+        self.assertIs(transform, self.frames.transform('c', 'd'))
+        self.frames.transform('b', 'd')
+        self.assertEqual(['b', 'c', 'd'], sorted(self.calls))
+
+        self.frames.invalidate()
+        self.assertIsNot(transform, self.frames.transform('c', 'd'))
+        self.assertEqual(6, len(self.calls))
+
+
+class TestInvalidation(unittest.TestCase):
+
+    def test_fixture(self):
+        fixture = Fixture()
+        fixture.set_ball({'x': 0, 'y': 0, 'z': 0}, 'oriball')
+        fixture.set_ball({'x': 0, 'y': 1, 'z': 0}, 'diagball')
+        fixture.set_ball({'x': 1, 'y': 0, 'z': 0}, 'axiball')
+        fixture.set_base_plane({'x': 0, 'y': 0, 'z': 0, 'xy_angle': 0, 'elevation': np.pi/2})
+        fixture.set_pin({'x': 1, 'y': 1, 'z': 0}, 'oripin')
+        fixture.set_pin({'x': 3, 'y': 1, 'z': 0}, 'axipin')
+
+        frames = FrameGraph()
+        fixture.register_frames(frames, 'fixture')
+        other = FrameGraph()
+        fixture.register_frames(other, 'fixture')
+
+        transform = frames.transform('fixture pin', 'fixture ball')
+        np.testing.assert_allclose(fixture.get_pin_in_ball()[1], transform.origin)
+        np.testing.assert_allclose([3, 1, 0], transform.origin, atol=1e-12)
+        other.transform('fixture pin', 'fixture ball')
+
+        fixture.set_ball({'x': -1, 'y': 0, 'z': 0}, 'oriball')
+        for graph in [frames, other]:
+            transform = graph.transform('fixture pin', 'fixture ball')
+            np.testing.assert_allclose([4, 1, 0], transform.origin, atol=1e-12)
+
+
+class TestSurvey2019Frames(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey = Survey2019(json.load(json_file))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_sensor_in_ballframe(self):
+        frames = self.survey.frames
+        ball_pin = RigidTransform(*self.survey.get_pin_in_uchannel_ballframe('top', 1))
+        pin_sensor = RigidTransform(*self.survey.sensors['top']['1']['stereo'].get_sensor_basis_pinframe())
+
+        ball_sensor = frames.transform('top L1 stereo', 'top ball')
+        np.testing.assert_allclose((ball_pin @ pin_sensor).basis, ball_sensor.basis, atol=1e-12)
+        np.testing.assert_allclose((ball_pin @ pin_sensor).origin, ball_sensor.origin, atol=1e-12)
+        self.assertIs(ball_sensor, frames.transform('top L1 stereo', 'top ball'))
+
+    def test_override(self):
+        before = self.survey.survey_volume('top', 1)
+        sensor_before = self.survey.survey_volume('top', 0, 'axial')
+
+        fixture = self.survey.fixture
+        pin = fixture.get_pin('oripin')
+        fixture.set_pin({'x': pin[0], 'y': pin[1] + 0.5, 'z': pin[2]}, 'oripin')
+
+        after = self.survey.survey_volume('top', 1)
+        self.assertFalse(np.allclose(before['basis'], after['basis']))
+        # the sensors are measured on the transition fixture, they are unaffected
+        np.testing.assert_array_equal(sensor_before['basis'], self.survey.survey_volume('top', 0, 'axial')['basis'])
+
+
+class TestMemoized(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey = Survey2019(json.load(json_file))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_cached(self):
+        fixture = self.survey.fixture
+        basis, origin = fixture.get_pin_in_ball()
+        self.assertIs(basis, fixture.get_pin_in_ball()[0])
+        self.assertIs(self.survey.uchannel.get_ball_frame('top'), self.survey.uchannel.get_ball_frame('top'))
+        with self.assertRaises(ValueError):
+            origin[0] = 0.
+
+    def test_override(self):
+        fixture = self.survey.fixture
+        uchannel = self.survey.uchannel
+        basis, origin = fixture.get_pin_in_ball()
+        ball_frame = uchannel.get_ball_frame('top')
+        pin = uchannel.pin_in_ballframe(1, 'top')
+
+        ball = fixture.get_ball('oriball')
+        fixture.set_ball({'x': ball[0] + 0.5, 'y': ball[1], 'z': ball[2]}, 'oriball')
+        self.assertFalse(np.allclose(origin, fixture.get_pin_in_ball()[1]))
+
+        ballframe = uchannel.ballframe_top
+        ball = ballframe.get_ball(1, 'hole')
+        ballframe.set_ball({'x': ball[0], 'y': ball[1] + 0.5, 'z': ball[2]}, 1, 'hole')
+        self.assertIsNot(ball_frame, uchannel.get_ball_frame('top'))
+        self.assertFalse(np.allclose(pin[0], uchannel.pin_in_ballframe(1, 'top')[0]))
+
+    def test_sensor_fixture(self):
+        sensor = self.survey.sensors['top']['0']['axial']
+        origin = sensor.get_sensor_origin_pinframe()
+        self.assertIs(origin, sensor.get_sensor_origin_pinframe())
+
+        pin = sensor.fixture.get_pin('oripin')
+        sensor.fixture.set_pin({'x': pin[0] + 0.5, 'y': pin[1], 'z': pin[2]}, 'oripin')
+        self.assertFalse(np.allclose(origin, sensor.get_sensor_origin_pinframe()))
@@ -0,0 +1,216 @@
+
+import csv
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from hps_align.detdump._global import (BATCH_MARKER, GLOBAL_HEADER, GeometryParser, csv_name, global_coord, parse_geometry,
+                                       write_global)
+
+
+def sensor_record(name, hps_position, svt_position, u=(1., 0., 0.), v=(0., 1., 0.), w=(0., 0., 1.)):
+    """Lines printed by the PrintGeometryDriver for one sensor, ending with the labelled SVT frame position"""
+    def vector(values):
+        return '[ ' + ', '.join(f'{value:.6f}' for value in values) + ']'
+
+    return ([f'{name}: {vector(hps_position)} {vector(u)} {vector(v)} {vector(w)}',
+             'Local to global transform',
+             f'  rotation {vector(u)}',
+             f'           {vector(v)}',
+             f'           {vector(w)}',
+             f'  translation {vector(hps_position)}',
+             'Global to local transform',
+             '  rotation [ 1.000000, 0.000000, 0.000000]',
+             '           [ 0.000000, 1.000000, 0.000000]',
+             '           [ 0.000000, 0.000000, 1.000000]',
+             '  translation [ 0.000000, 0.000000, 0.000000]',
+             'Position in',
+             'the SVT frame',
+             f'  {vector(svt_position)}'])
+
+
+def driver_output(offset=0.):
+    """Output of the PrintGeometryDriver for a detector with two sensors, framed by log lines"""
+    return (['PrintGeometryDriver: detector changed'] +
+            sensor_record('module_L1t_halfmodule_axial_sensor0', [20.1 + offset, 5.2, 100.3], [1.5, 0.2 + offset, -3.25],
+                          u=(0., 1., 0.), v=(-1., 0., 0.)) +
+            sensor_record('module_L1b_halfmodule_stereo_sensor0', [19.8, -5.1 + offset, 108.3], [-1.4, 0.1, 4.75 + offset],
+                          w=(0., 0.0998, 0.995)) +
+            ['PrintGeometryDriver: done'])
+
+
+def baseline_parse(lines):
+    """Parser of global-coord before the output was parsed while java runs"""
+    sensor_map = {}
+    svtFrameCount = False
+    svtFrameLine = 0
+
+    for line in lines:
+        if 'sensor' in line and ':' in line:
+            svtFrameCount = True
+            line_elements = line.strip().split()
+            name = line_elements[0][:-1]
+            position = [float(line_elements[i][:-1]) for i in range(2, 5)]
+            u = [float(line_elements[i][:-1]) for i in range(6, 9)]
+            v = [float(line_elements[i][:-1]) for i in range(10, 13)]
+            w = [float(line_elements[i][:-1]) for i in range(14, 17)]
+            sensor_map[name] = dict(hps_position=position, u=u, v=v, w=w)
+        if svtFrameCount:
+            svtFrameLine += 1
+        if svtFrameLine == 14:
+            svtFrameLine = 0
+            svtFrameCount = False
+            line_elements = line.strip().split()
+            position = [float(line_elements[i][:-1]) for i in range(1, 4)]
+            sensor_map[name]['svt_position'] = position
+    return sensor_map
+
+
+class TestGeometryParser(unittest.TestCase):
+
+    def test_single(self):
+        lines = driver_output()
+        sensor_map = parse_geometry(lines)
+        self.assertEqual(baseline_parse(lines), sensor_map)
+        self.assertEqual(['module_L1t_halfmodule_axial_sensor0', 'module_L1b_halfmodule_stereo_sensor0'], list(sensor_map))
+        self.assertEqual([1.5, 0.2, -3.25], sensor_map['module_L1t_halfmodule_axial_sensor0']['svt_position'])
+        self.assertEqual([0., 0.0998, 0.995], sensor_map['module_L1b_halfmodule_stereo_sensor0']['w'])
+
+        # lines fed as read from the pipe
+        parser = GeometryParser('det')
+        for line in lines:
+            parser.feed(line + '\n')
+        self.assertEqual({'det': sensor_map}, parser.close())
+
+    def test_stray_lines(self):
+        record = sensor_record('sensor0', [1., 2., 3.], [4., 5., 6.])
+        self.assertEqual(GeometryParser.SVT_POSITION_LABEL, record[-2])
+        expected = parse_geometry(record)
+        self.assertEqual([4., 5., 6.], expected['sensor0']['svt_position'])
+
+        # log lines interleaved with the record, also before and after the SVT frame label,
+        # and one more transform line shift the position, it is still found after its label
+        lines = (record[:3] + ['INFO: sensor conditions loaded'] + record[3:6] + ['  scale [ 1.000000, 1.000000, 1.000000]']
+                 + record[6:-1] + ['WARNING: slow database connection'] + record[-1:])
+        self.assertEqual(expected, parse_geometry(lines))
+
+    def test_batch(self):
+        lines = (['Loading conditions', 'sensor: no record before the first detector']
+                 + [BATCH_MARKER + 'detector_a'] + driver_output()
+                 + [BATCH_MARKER + 'detector_b'] + driver_output(offset=0.5))
+        parser = GeometryParser()
+        for line in lines:
+            parser.feed(line)
+        geometries = parser.close()
+
+        self.assertEqual(['detector_a', 'detector_b'], list(geometries))
+        self.assertEqual(baseline_parse(driver_output()), geometries['detector_a'])
+        self.assertEqual(baseline_parse(driver_output(offset=0.5)), geometries['detector_b'])
+        self.assertEqual([1.5, 0.7, -3.25], geometries['detector_b']['module_L1t_halfmodule_axial_sensor0']['svt_position'])
+
+    def test_truncated(self):
+        record = sensor_record('sensor0', [1., 2., 3.], [4., 5., 6.])
+        parser = GeometryParser()
+        for line in [BATCH_MARKER + 'detector_a'] + record[:5]:
+            parser.feed(line)
+        with self.assertRaisesRegex(ValueError, 'sensor0 ended before its SVT frame position'):
+            parser.feed(BATCH_MARKER + 'detector_b')
+
+        with self.assertRaisesRegex(ValueError, 'ended before its SVT frame position'):
+            parse_geometry(record[:-1])
+
+    def test_bad_svt_position(self):
+        record = sensor_record('sensor0', [1., 2., 3.], [4., 5., 6.])
+        record[-1] = '[ 4.000000, NaN?]'
+        with self.assertRaisesRegex(ValueError, 'expected SVT frame position of sensor0'):
+            parse_geometry(record)
+
+        # without its label the position is not taken from a line count
+        record = sensor_record('sensor0', [1., 2., 3.], [4., 5., 6.])
+        del record[-2]
+        with self.assertRaisesRegex(ValueError, 'sensor0 ended before its SVT frame position'):
+            parse_geometry(record + sensor_record('sensor1', [1., 2., 3.], [4., 5., 6.]))
+
+    def test_write_global(self):
+        sensor_map = parse_geometry(driver_output())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = os.path.join(tmp_dir, 'det-global.csv')
+            write_global(output_file, sensor_map)
+            with open(output_file) as csvfile:
+                rows = list(csv.reader(csvfile))
+        self.assertEqual(GLOBAL_HEADER, rows[0])
+        self.assertEqual(3, len(rows))
+        self.assertEqual(['module_L1t_halfmodule_axial_sensor0', '20.1', '5.2', '100.3', '1.5', '0.2', '-3.25'], rows[1][:7])
+
+
+class TestCsvName(unittest.TestCase):
+
+    def test_csv_name(self):
+        self.assertEqual('det-global.csv', csv_name('det'))
+        self.assertEqual(str(Path('out') / 'det-global.csv'), csv_name('det', output_dir=Path('out')))
+        self.assertEqual('mine.csv', csv_name('det', 'mine'))
+        self.assertEqual('mine.json', csv_name('det', 'mine.json', Path('out')))
+
+
+class FakeProcess:
+    """Stand-in of the java process, prints the given lines"""
+
+    def __init__(self, lines, returncode=0):
+        self.stdout = iter(line + '\n' for line in lines)
+        self.returncode = returncode
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def kill(self):
+        pass
+
+
+class TestGlobalCoord(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_java(self, detnames, lines, **kwargs):
+        kwargs = dict(dict(jar=Path('bin.jar'), output_file=None, output_dir=self.output_dir, log_file=None), **kwargs)
+        with mock.patch('subprocess.Popen', return_value=FakeProcess(lines)) as popen:
+            global_coord(detnames, Path('events.slcio'), 10716, **kwargs)
+        return popen.call_args[0][0]
+
+    def test_batch(self):
+        lines = ([BATCH_MARKER + 'detector_a'] + driver_output()
+                 + [BATCH_MARKER + 'detector_b'] + driver_output(offset=0.5))
+        command = self.run_java(['detector_a', 'detector_b'], lines)
+
+        self.assertEqual(['-cp', 'bin.jar'], command[3:5])
+        self.assertTrue(command[5].endswith('PrintGeometries.java'))
+        self.assertEqual(['events.slcio', '10716', 'detector_a', 'detector_b'], command[6:])
+        self.assertTrue((self.output_dir / 'detector_a-global.log').is_file())
+
+        for detname, svt_y in [('detector_a', '0.2'), ('detector_b', '0.7')]:
+            with open(self.output_dir / f'{detname}-global.csv') as csvfile:
+                rows = list(csv.reader(csvfile))
+            self.assertEqual(GLOBAL_HEADER, rows[0])
+            self.assertEqual(svt_y, rows[1][5])
+
+    def test_single(self):
+        output_file = str(self.output_dir / 'mine')
+        command = self.run_java(['detector_a'], driver_output(), output_file=output_file)
+        self.assertEqual(['-i', 'events.slcio', '-d', 'detector_a', '-R', '10716', '-n', '1'], command[6:])
+        self.assertTrue(os.path.isfile(output_file + '.csv'))
+        self.assertTrue(os.path.isfile(output_file + '.log'))
+
+    def test_errors(self):
+        with self.assertRaisesRegex(ValueError, '--output-file'):
+            self.run_java(['detector_a', 'detector_b'], [], output_file='mine.csv')
+        with self.assertRaisesRegex(ValueError, 'no geometry printed for detector detector_b'):
+            self.run_java(['detector_a', 'detector_b'], [BATCH_MARKER + 'detector_a'] + driver_output())
@@ -0,0 +1,79 @@
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hps_align.survey._incremental import update_survey_volumes, load_state
+from hps_align.survey._survey import Survey2019
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestUpdateSurveyVolumes(unittest.TestCase):
+
+    def setUp(self):
+        # work on copies of the survey data files, so they can be modified
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(os.path.join(REPO, 'survey_data', '2019_file_list.json')) as json_file:
+            file_list = json.load(json_file)
+
+        self.survey_files = {}
+        for key, path in file_list.items():
+            tmp_path = os.path.join(self.tmp_dir, key + '.txt')
+            shutil.copy(os.path.join(REPO, path), tmp_path)
+            self.survey_files[key] = tmp_path
+        self.state_file = os.path.join(self.tmp_dir, 'results.xml.deps.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def touch(self, key):
+        with open(self.survey_files[key], 'a') as file:
+            file.write('\n')
+
+    def assertSameAsFull(self, volumes):
+        full = Survey2019(self.survey_files).survey_volumes()
+        self.assertEqual([volume['name'] for volume in full], [volume['name'] for volume in volumes])
+        for expected, volume in zip(full, volumes):
+            self.assertEqual(expected['desc'], volume['desc'])
+            np.testing.assert_array_equal(expected['origin'], volume['origin'])
+            np.testing.assert_array_equal(expected['basis'], volume['basis'])
+
+    def test_first_run(self):
+        volumes, recomputed = update_survey_volumes(2019, self.survey_files, self.state_file)
+
+        self.assertEqual(12, len(recomputed))
+        self.assertSameAsFull(volumes)
+        self.assertEqual(set(recomputed), set(load_state(self.state_file, 2019)))
+        self.assertEqual({}, load_state(self.state_file, 2016))
+
+    def test_unchanged(self):
+        update_survey_volumes(2019, self.survey_files, self.state_file)
+        volumes, recomputed = update_survey_volumes(2019, self.survey_files, self.state_file)
+
+        self.assertEqual([], recomputed)
+        self.assertSameAsFull(volumes)
+
+    def test_sensor_changed(self):
+        update_survey_volumes(2019, self.survey_files, self.state_file)
+        self.touch('L1_stereo_top')
+        volumes, recomputed = update_survey_volumes(2019, self.survey_files, self.state_file)
+
+        self.assertEqual(['module_L2t_halfmodule_stereo'], recomputed)
+        self.assertSameAsFull(volumes)
+
+    def test_fixture_changed(self):
+        update_survey_volumes(2019, self.survey_files, self.state_file)
+        self.touch('fixture')
+        _, recomputed = update_survey_volumes(2019, self.survey_files, self.state_file)
+        self.assertEqual(['module_L2t', 'module_L2b'], recomputed)
+
+        self.touch('transition_fixture')
+        volumes, recomputed = update_survey_volumes(2019, self.survey_files, self.state_file)
+        self.assertEqual(10, len(recomputed))
+        self.assertNotIn('module_L1t', recomputed)
+        self.assertSameAsFull(volumes)
@@ -0,0 +1,173 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hps_align.survey._parser import Parser, ParseCache, Feature
+
+SURVEY_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'survey_data')
+UCHANNEL_TOP = os.path.join(SURVEY_DATA, 'meas1', 'uchannel_empty_top_1.txt')
+SENSOR = os.path.join(SURVEY_DATA, 'meas1', 'L1_axial_top_module3_1.txt')
+
+
+class TestInit(unittest.TestCase):
+
+    def test_no_input(self):
+        with self.assertRaises(ValueError):
+            Parser(None)
+
+
+class TestIndex(unittest.TestCase):
+
+    def test_steps(self):
+        parser = Parser(UCHANNEL_TOP)
+
+        steps = parser.index
+        self.assertEqual(list(range(1, len(steps) + 1)), steps['step'].tolist())
+
+        step = steps[0]
+        self.assertEqual(1, step['step'])
+        self.assertEqual('L1 slot ball', step['comment'])
+        self.assertEqual('Sphere', step['feature'])
+        self.assertEqual(228.71093, step['actual']['x'])
+        self.assertEqual(228.71093, step['nominal']['x'])
+        self.assertEqual(0.0, step['upper']['x'])
+        self.assertEqual(0.0, step['lower']['x'])
+        self.assertEqual(5.99973, step['actual']['diameter'])
+        self.assertTrue(np.isnan(step['actual']['xy_angle']))
+
+    def test_vectorized(self):
+        steps = Parser(UCHANNEL_TOP).index
+
+        planes = steps[steps['feature'] == 'Plane']
+        self.assertTrue(np.all(np.isfinite(planes['actual']['elevation'])))
+        # no tolerances are given in the survey data files
+        self.assertTrue(np.all(planes['actual']['x'] - planes['nominal']['x'] <= planes['upper']['x']))
+
+    def test_find_step(self):
+        parser = Parser(UCHANNEL_TOP)
+
+        self.assertEqual(5, parser.find_step('Step:  5')['step'])
+        self.assertEqual('L0 base plane', parser.find_step('L0 base plane')['comment'])
+
+        with self.assertRaises(KeyError):
+            parser.find_step('not a feature')
+
+    def test_find_step_case(self):
+        # the stereo sensors of the later campaigns spell 'sensor plane' in lower case,
+        # the lookup is case sensitive for the indexed and the scanning parser alike
+        input_file = os.path.join(SURVEY_DATA, 'meas2', 'L0_stereo_top_module1_2.txt')
+        for parser in [Parser(input_file), Parser(input_file, indexed=False)]:
+            with self.assertRaises(KeyError):
+                parser.get_coords('Sensor plane')
+
+    def test_feature_aliases(self):
+        class Sensor:
+            sensor_plane_dict = Feature('Sensor plane', aliases=('sensor plane',))
+
+            def __init__(self, parser):
+                self.parser = parser
+
+        input_file = os.path.join(SURVEY_DATA, 'meas2', 'L0_stereo_top_module1_2.txt')
+        indexed = Sensor(Parser(input_file)).sensor_plane_dict
+        self.assertEqual(Sensor(Parser(input_file, indexed=False)).sensor_plane_dict, indexed)
+        self.assertEqual(Parser(input_file).get_coords('sensor plane'), indexed)
+
+        self.assertEqual('sensor plane', Sensor.sensor_plane_dict.lookup(Parser(input_file).find_step)['comment'])
+        with self.assertRaises(KeyError):
+            Feature('no plane', aliases=('no plane either',)).lookup(Parser(input_file).find_step)
+
+    def test_read_once(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            tmp_file = os.path.join(tmp_dir, 'report.txt')
+            shutil.copy(UCHANNEL_TOP, tmp_file)
+
+            parser = Parser(tmp_file)
+            parser.get_coords('L1 hole pin')
+            os.remove(tmp_file)
+
+            # all further lookups are served from memory
+            self.assertIn('x', parser.get_coords('L3 slot pin'))
+            self.assertIn('elevation', parser.get_coords('L2 base plane'))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class TestBackends(unittest.TestCase):
+
+    def test_same_steps(self):
+        for input_file in [UCHANNEL_TOP, SENSOR]:
+            lines = Parser.parse_file(input_file, 'lines')
+            scanned = Parser.parse_file(input_file, 'mmap')
+            self.assertEqual(lines.tobytes(), scanned.tobytes())
+
+            with open(input_file, 'rb') as file:
+                content = file.read()
+            self.assertEqual(lines.tobytes(), Parser.parse_content(content, 'lines').tobytes())
+            self.assertEqual(lines.tobytes(), Parser.parse_content(content, 'mmap').tobytes())
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            Parser(UCHANNEL_TOP, backend='foo')
+
+
+class TestGetCoords(unittest.TestCase):
+
+    def test_same_as_line_scan(self):
+        for input_file, names in [(UCHANNEL_TOP, ['L1 hole ball', 'L3 slot ball', 'L0 hole pin', 'L1 base plane']),
+                                  (SENSOR, ['oriball', 'axiball', 'Sensor origin', 'Sensor plane', 'Active edge beam'])]:
+            indexed = Parser(input_file)
+            line_scan = Parser(input_file, indexed=False)
+            for name in names:
+                self.assertEqual(line_scan.get_coords(name), indexed.get_coords(name))
+
+    def test_step(self):
+        indexed = Parser(UCHANNEL_TOP)
+        line_scan = Parser(UCHANNEL_TOP, indexed=False)
+
+        self.assertEqual(line_scan.get_coords('Step:  5', 20), indexed.get_coords('Step:  5', 20))
+        self.assertEqual(line_scan.get_coords('Step:  6', 20), indexed.get_coords('Step:  6', 20))
+
+
+class TestParseCache(unittest.TestCase):
+
+    def test_shared(self):
+        cache = ParseCache()
+        first = Parser(UCHANNEL_TOP, cache=cache)
+        second = Parser(os.path.join(SURVEY_DATA, '..', 'survey_data', 'meas1', 'uchannel_empty_top_1.txt'), cache=cache)
+
+        self.assertIs(first.index, second.index)
+        self.assertEqual({'files': 1, 'hits': 1, 'misses': 1, 'loaded': 0}, cache.stats())
+
+    def test_modified(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            tmp_file = os.path.join(tmp_dir, 'report.txt')
+            shutil.copy(UCHANNEL_TOP, tmp_file)
+
+            cache = ParseCache()
+            steps = cache.get(tmp_file)
+            with open(tmp_file, 'a') as file:
+                file.write('\n')
+
+            self.assertIsNot(steps, cache.get(tmp_file))
+            self.assertEqual(2, cache.misses)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_evict_clear(self):
+        cache = ParseCache()
+        cache.get(UCHANNEL_TOP)
+        cache.get(SENSOR)
+        self.assertIn(UCHANNEL_TOP, cache)
+
+        cache.evict(UCHANNEL_TOP)
+        self.assertNotIn(UCHANNEL_TOP, cache)
+        self.assertEqual(1, len(cache))
+
+        cache.clear()
+        self.assertEqual({'files': 0, 'hits': 0, 'misses': 0, 'loaded': 0}, cache.stats())
@@ -1,8 +1,11 @@
 
+import os
 import unittest
 
 from hps_align.survey._pins import Pin
 
+UCHANNEL_TOP = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'survey_data', 'meas1', 'uchannel_empty_top_1.txt')
+
 
 class TestInit(unittest.TestCase):
 
@@ -82,5 +85,23 @@ class TestSetPin(unittest.TestCase):
             pin.set_pin({'x': 1, 'y': 2, 'z': 0}, 3, 'foo')
 
 
+class TestLazyInput(unittest.TestCase):
+
+    def test_resolved_on_first_use(self):
+        pin = Pin(UCHANNEL_TOP)
+        self.assertNotIn('L1_hole_pin_dict', vars(pin))
+
+        hole_pin = pin.get_pin(1, 'hole')
+        self.assertEqual(pin.parser.get_coords('L1 hole pin'), pin.L1_hole_pin_dict)
+        self.assertEqual(hole_pin.tolist(), [pin.L1_hole_pin_dict[c] for c in 'xyz'])
+        self.assertNotIn('L3_hole_pin_dict', vars(pin))
+
+    def test_set_overrides_file(self):
+        pin = Pin(UCHANNEL_TOP)
+        pin.set_pin({'x': 1, 'y': 2, 'z': 0}, 2, 'slot')
+
+        self.assertEqual(pin.get_pin(2, 'slot').tolist(), [1, 2, 0])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,112 @@
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from hps_align.survey._parser import parse_cache
+from hps_align.survey._profile import Profiler, profiler, profiling
+from hps_align.survey._survey import Survey2019
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_disabled(self):
+        profiler = Profiler()
+        profiler.count('files opened', 1, 'a.txt')
+        with profiler.timer('parsing'):
+            pass
+        lines = ['a', 'b']
+        self.assertIs(lines, profiler.lines(lines))
+        self.assertEqual({'counters': {}, 'timers': {}}, profiler.report())
+
+    def test_counters(self):
+        profiler = Profiler()
+        profiler.enabled = True
+        profiler.count('files opened', 1, 'a.txt')
+        profiler.count('files opened', 2, os.path.abspath('a.txt'))
+        profiler.count('frame inversions')
+        self.assertEqual(['x', 'y'], list(profiler.lines(['x', 'y'], 'b.txt')))
+
+        counters = profiler.report()['counters']
+        self.assertEqual({'total': 3, 'files': {'a.txt': 3}}, counters['files opened'])
+        self.assertEqual({'total': 1, 'files': {}}, counters['frame inversions'])
+        self.assertEqual({'total': 2, 'files': {'b.txt': 2}}, counters['lines scanned'])
+
+    def test_nested_timers(self):
+        profiler = Profiler()
+        profiler.enabled = True
+
+        @profiler.timed('outer')
+        def outer():
+            time.sleep(0.01)
+            for _ in range(2):
+                with profiler.timer('inner'):
+                    time.sleep(0.01)
+
+        outer()
+        timers = profiler.report()['timers']
+        self.assertEqual(1, timers['outer']['calls'])
+        self.assertEqual(2, timers['inner']['calls'])
+        self.assertAlmostEqual(timers['outer']['total'], timers['outer']['self'] + timers['inner']['total'])
+        self.assertAlmostEqual(timers['inner']['total'], timers['inner']['self'])
+
+
+class TestProfileSurvey(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = parse_cache.store
+        parse_cache.store = None
+        parse_cache.clear()
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey_files = json.load(json_file)
+
+    def tearDown(self):
+        parse_cache.clear()
+        parse_cache.store = self.store
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_survey(self):
+        self.assertFalse(profiler.enabled)
+        with profiling():
+            Survey2019(self.survey_files).print_results(os.path.join(self.tmp_dir, 'survey_results.xml'))
+            report = profiler.report()
+        self.assertFalse(profiler.enabled)
+
+        # every survey data file is opened once
+        files = {os.path.normpath(path) for path in self.survey_files.values()}
+        self.assertEqual(files, set(report['counters']['files opened']['files']))
+        self.assertEqual(len(files), report['counters']['files opened']['total'])
+        self.assertGreater(report['counters']['get_coords calls']['total'], len(files))
+        self.assertGreater(report['counters']['frame inversions']['total'], 0)
+
+        for stage in ['parsing', 'frame construction', 'sensor transforms', 'xml writing']:
+            self.assertIn(stage, report['timers'])
+        self.assertEqual(8, report['timers']['sensor transforms']['calls'])
+
+    def test_data_command(self):
+        from typer.testing import CliRunner
+        import hps_align.survey  # noqa: F401, registers the data command
+        from hps_align.survey._cli import app
+
+        output_file = os.path.join(self.tmp_dir, 'survey_results.xml')
+        profile_file = os.path.join(self.tmp_dir, 'profile.json')
+        result = CliRunner().invoke(app, ['data', '2019', os.path.join('survey_data', '2019_file_list.json'),
+                                          '--output-file', output_file, '--no-cache', '--profile-output', profile_file])
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn('frame construction', result.output)
+        self.assertTrue(os.path.exists(output_file))
+
+        with open(profile_file) as json_file:
+            report = json.load(json_file)
+        self.assertEqual(2019, report['year'])
+        self.assertIn('xml writing', report['timers'])
+        self.assertGreater(report['counters']['lines scanned']['total'], 0)
@@ -0,0 +1,99 @@
+
+import json
+import os
+import unittest
+
+import numpy as np
+
+from hps_align.survey._registration import kabsch, register_campaigns, registration_frames, measured_points
+from hps_align.survey._survey import Survey2019
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestKabsch(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.source = rng.normal(scale=100, size=(4, 6, 3))
+        q, r = np.linalg.qr(rng.normal(size=(4, 3, 3)))
+        self.basis = q * np.sign(np.diagonal(r, axis1=-2, axis2=-1))[:, np.newaxis]
+        self.basis[np.linalg.det(self.basis) < 0] *= -1
+        self.origin = rng.normal(scale=10, size=(4, 3))
+        self.target = self.origin[:, np.newaxis] + self.source @ self.basis
+
+    def test_exact(self):
+        transform, rms = kabsch(self.source, self.target)
+        np.testing.assert_allclose(self.basis, transform.basis, atol=1e-12)
+        np.testing.assert_allclose(self.origin, transform.origin, atol=1e-10)
+        np.testing.assert_allclose(np.zeros(4), rms, atol=1e-10)
+
+    def test_broadcast(self):
+        transform, rms = kabsch(self.source[:1], self.target[:1] + np.zeros((3, 1, 1, 1)))
+        self.assertEqual((3, 1, 3, 3), transform.basis.shape)
+        np.testing.assert_allclose(np.broadcast_to(self.basis[0], (3, 1, 3, 3)), transform.basis, atol=1e-12)
+
+    def test_rms(self):
+        noise = np.zeros_like(self.target)
+        noise[..., 0, 2] = 1
+        noise[..., 1, 2] = -1
+        transform, rms = kabsch(self.source, self.target + noise)
+        # the best fit cannot be worse than the true transformation
+        self.assertTrue(np.all(rms <= np.sqrt(2 / 6) + 1e-12))
+        self.assertTrue(np.all(rms > 0))
+
+        weights = np.ones((4, 6))
+        weights[:, :2] = 0
+        transform, rms = kabsch(self.source, self.target + noise, weights)
+        np.testing.assert_allclose(self.basis, transform.basis, atol=1e-12)
+        np.testing.assert_allclose(np.zeros(4), rms, atol=1e-10)
+
+    def test_reflection(self):
+        # planar points fit a reflection as well as a rotation, only the rotation may be returned
+        source = self.source.copy()
+        source[..., 2] = 0
+        target = self.origin[:, np.newaxis] + source @ self.basis
+        transform, rms = kabsch(source, target)
+        np.testing.assert_allclose(np.ones(4), np.linalg.det(transform.basis))
+        np.testing.assert_allclose(self.basis, transform.basis, atol=1e-12)
+
+
+class TestRegistration(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        self.surveys = {}
+        for name in ['meas1', 'meas2', 'meas3']:
+            file_list = 'survey_data/2019_file_list.json' if name == 'meas1' else f'survey_data/2019_file_list_{name}.json'
+            with open(file_list) as json_file:
+                self.surveys[name] = Survey2019(json.load(json_file))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_frames(self):
+        frames = registration_frames(self.surveys['meas1'])
+        self.assertEqual(['top ball', 'bottom ball', 'fixture ball', 'transition_fixture ball'], list(frames))
+        self.assertEqual(6, len(measured_points(*frames['top ball'][:2])))
+
+    def test_register_campaigns(self):
+        results = register_campaigns(self.surveys)
+        self.assertEqual(4, len(results))
+        for result in results:
+            self.assertEqual((3,), result['rms'].shape)
+            np.testing.assert_allclose(0, result['rms'][0], atol=1e-10)
+            np.testing.assert_allclose(0, result['frame_angle'][0], atol=1e-10)
+
+        top = results[0]
+        self.assertEqual('top ball', top['frame'])
+        # the campaigns agree to some um
+        self.assertTrue(np.all(top['rms'][1:] > 0))
+        self.assertTrue(np.all(top['rms'] < 0.05))
+
+        # registering onto another campaign gives the inverse transformation
+        results = register_campaigns(self.surveys, reference='meas2')
+        np.testing.assert_allclose(top['rms'][1], results[0]['rms'][0], rtol=1e-6)
+
+        with self.assertRaises(ValueError):
+            register_campaigns(self.surveys, reference='meas4')
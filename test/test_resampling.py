@@ -0,0 +1,114 @@
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hps_align.survey._resampling import (combine, merge_parameters, resample, resampling, resampling_units, run_combinations,
+                                          summarize, survey_parameters, unit_campaigns)
+from hps_align.survey._survey import Survey2019
+from hps_align.survey._uncertainty import volume_parameters
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestResampling(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.campaigns = {}
+        for name in ['meas1', 'meas2', 'meas3']:
+            file_list = 'survey_data/2019_file_list.json' if name == 'meas1' else f'survey_data/2019_file_list_{name}.json'
+            with open(file_list) as json_file:
+                self.campaigns[name] = json.load(json_file)
+        self.units = resampling_units(self.campaigns)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_units(self):
+        self.assertEqual(12, len(self.units))
+        self.assertIn(['ballframe_top', 'pinframe_top'], self.units)
+        self.assertIn(['L1_axial_top'], self.units)
+
+        # meas3 has no L1 axial top measurement
+        measured = unit_campaigns(self.campaigns, self.units)
+        self.assertEqual(['meas1', 'meas2'], measured[self.units.index(['L1_axial_top'])])
+        self.assertEqual(['meas1', 'meas2', 'meas3'], measured[self.units.index(['ballframe_top', 'pinframe_top'])])
+
+    def test_resample(self):
+        choices = resample(self.campaigns, self.units, 'bootstrap', 50, seed=1)
+        self.assertEqual(50, len(choices))
+        self.assertEqual(choices, resample(self.campaigns, self.units, 'bootstrap', 50, seed=1))
+        self.assertTrue(all(len(choice) == len(self.units) for choice in choices))
+        axial_top = self.units.index(['L1_axial_top'])
+        self.assertNotIn('meas3', [choice[axial_top] for choice in choices])
+
+        choices = resample(self.campaigns, self.units, 'jackknife')
+        self.assertEqual(self.campaigns['meas2'], combine(self.campaigns, self.units, choices[1]))
+        self.assertEqual(self.campaigns['meas3'], combine(self.campaigns, self.units, choices[2]))
+
+        with self.assertRaises(ValueError):
+            resample(self.campaigns, self.units, 'all', 1000)
+        self.assertEqual(9, len(resample(self.campaigns, self.units[:2], 'all', 1000)))
+
+        survey_files = combine(self.campaigns, self.units, ('meas2',) + ('meas1',) * (len(self.units) - 1))
+        self.assertEqual(self.campaigns['meas2']['pinframe_top'], survey_files['pinframe_top'])
+        self.assertEqual(self.campaigns['meas1']['pinframe_bottom'], survey_files['pinframe_bottom'])
+
+    def test_parameters(self):
+        names, parameters = survey_parameters(2019, [self.campaigns['meas1'], self.campaigns['meas3']])
+        self.assertEqual((2, 12, 12), parameters.shape)
+
+        self.assertEqual([volume['name'] for volume in Survey2019(self.campaigns['meas1']).survey_volumes()], names)
+        with self.assertWarns(UserWarning):
+            volumes = Survey2019(self.campaigns['meas3']).survey_volumes()
+        np.testing.assert_array_equal(volume_parameters(volumes[4]), parameters[1, names.index(volumes[4]['name'])])
+        # the sensor missing in meas3
+        self.assertTrue(np.isnan(parameters[1, names.index('module_L2t_halfmodule_axial')]).all())
+        self.assertFalse(np.isnan(parameters[0]).any())
+
+        parallel_names, parallel = run_combinations(2019, [self.campaigns['meas1'], self.campaigns['meas3']] * 2, jobs=2)
+        self.assertEqual(names, parallel_names)
+        np.testing.assert_array_equal(np.concatenate([parameters, parameters]), parallel)
+
+    def test_summarize(self):
+        rng = np.random.default_rng(1)
+        parameters = rng.normal(size=(5, 2, 12))
+        results = summarize(['a', 'b'], parameters)
+        np.testing.assert_allclose(parameters[:, 1].mean(axis=0), results[1]['mean'])
+        np.testing.assert_allclose(parameters[:, 1].std(axis=0, ddof=1), results[1]['std'])
+
+        # the jackknife error of a mean is the standard error of the mean
+        results = summarize(['a', 'b'], parameters, jackknife=True)
+        np.testing.assert_allclose(parameters[:, 0].std(axis=0, ddof=1) / np.sqrt(5), results[0]['std'])
+
+        # surveys missing a SurveyVolume are left out for it
+        parameters[0, 1] = np.nan
+        results = summarize(['a', 'b'], parameters)
+        self.assertEqual([5, 4], [result['surveys'] for result in results])
+        np.testing.assert_allclose(parameters[1:, 1].mean(axis=0), results[1]['mean'])
+
+    def test_merge_parameters(self):
+        names, parameters = merge_parameters([(['a', 'c'], np.ones((1, 2, 12))), (['a', 'b', 'c'], np.zeros((2, 3, 12)))])
+        self.assertEqual(['a', 'b', 'c'], names)
+        self.assertEqual((3, 3, 12), parameters.shape)
+        self.assertTrue(np.isnan(parameters[0, 1]).all())
+        np.testing.assert_array_equal(np.ones(12), parameters[0, 2])
+        np.testing.assert_array_equal(np.zeros((2, 3, 12)), parameters[1:])
+
+    def test_command(self):
+        output_file = os.path.join(self.tmp_dir, 'resampling.json')
+        resampling(2019, ['survey_data/2019_file_list*.json'], mode='bootstrap', samples=4, seed=1, output_file=output_file,
+                   jobs=1, cache_dir=None, cache=False, rebuild_cache=False)
+        with open(output_file) as json_file:
+            output = json.load(json_file)
+        self.assertEqual(4, output['surveys'])
+        self.assertEqual(['2019_file_list', '2019_file_list_meas2', '2019_file_list_meas3'], output['campaigns'])
+        self.assertEqual(12, len(output['volumes']))
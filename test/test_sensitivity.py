@@ -0,0 +1,80 @@
+
+import json
+import os
+import unittest
+
+import numpy as np
+
+from hps_align.survey._sensitivity import input_label, jacobian, rank_inputs
+from hps_align.survey._survey import Survey2019
+from hps_align.survey._uncertainty import volume_parameters
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestSensitivity(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey_files = json.load(json_file)
+        self.inputs, self.results = jacobian(2019, self.survey_files)
+        self.labels = [input_label(self.survey_files, obj, feature, coordinate) for obj, _, feature, coordinate in self.inputs]
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_labels(self):
+        self.assertEqual(len(self.labels), len(set(self.labels)))
+        self.assertIn('fixture: oripin x', self.labels)
+        self.assertIn('ballframe_top/pinframe_top: L1 hole pin y', self.labels)
+        self.assertEqual((12, len(self.inputs)), self.results[0]['jacobian'].shape)
+
+    def test_rebuild(self):
+        # shift the oripin of the fixture and rebuild the survey
+        step = 1e-3
+        survey = Survey2019(self.survey_files)
+        before = volume_parameters(survey.survey_volume('top', 1))
+        pin = survey.fixture.get_pin('oripin')
+        survey.fixture.set_pin({'x': pin[0] + step, 'y': pin[1], 'z': pin[2]}, 'oripin')
+        after = volume_parameters(survey.survey_volume('top', 1))
+
+        column = self.labels.index('fixture: oripin x')
+        np.testing.assert_allclose((after - before) / step, self.results[3]['jacobian'][:, column], atol=1e-4)
+
+        # the sensors are measured on the transition fixture, the fixture does not move them
+        self.assertTrue(np.all(self.results[4]['jacobian'][:, column] == 0))
+
+    def test_ranking(self):
+        sigmas = np.full(len(self.inputs), 0.005)
+        ranking = rank_inputs(self.results[1]['jacobian'], sigmas)
+        displacements = [displacement for _, _, _, displacement in ranking]
+        self.assertEqual(sorted(displacements, reverse=True), displacements)
+        self.assertNotIn(self.labels.index('fixture: oripin x'), [i for i, _, _, _ in ranking])
+
+        # the sensor origin is only rotated into the pin frame, it moves the sensor one to one
+        column = self.labels.index('L0_axial_top: Sensor origin x')
+        np.testing.assert_allclose(0.005, dict((i, shift) for i, shift, _, _ in ranking)[column])
+
+        # round-off noise of the central differences is not ranked
+        noisy = self.results[1]['jacobian'].copy()
+        noisy[:, self.labels.index('fixture: oripin x')] = 1e-12
+        self.assertEqual(ranking, rank_inputs(noisy, sigmas))
+        self.assertIn(self.labels.index('fixture: oripin x'), [i for i, _, _, _ in rank_inputs(noisy, sigmas, rtol=0)])
+
+    def test_ranking_rotation(self):
+        # input 0 shifts the origin by 10 um, input 1 only tilts the volume by 0.3 mrad about x,
+        # input 2 shifts by 3 um and tilts by 0.1 mrad about z
+        jacobian = np.zeros((12, 3))
+        jacobian[0, 0] = 0.01
+        jacobian[[8, 10], 1] = [3e-4, -3e-4]
+        jacobian[1, 2] = 0.003
+        jacobian[[4, 6], 2] = [1e-4, -1e-4]
+        ranking = rank_inputs(jacobian, np.ones(3))
+        self.assertEqual([1, 0, 2], [i for i, _, _, _ in ranking])
+        np.testing.assert_allclose([0.015, 0.01, 0.008], [displacement for _, _, _, displacement in ranking])
+        self.assertEqual((0., 3e-4), ranking[0][1:3])
+
+        # without lever arm only the shifts count
+        self.assertEqual([0, 2], [i for i, _, _, _ in rank_inputs(jacobian, np.ones(3), lever_arm=0)])
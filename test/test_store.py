@@ -0,0 +1,56 @@
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hps_align.survey._parser import Parser, ParseCache
+from hps_align.survey._store import FeatureStore
+
+SURVEY_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'survey_data')
+UCHANNEL_TOP = os.path.join(SURVEY_DATA, 'meas1', 'uchannel_empty_top_1.txt')
+
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_save_load(self):
+        store = FeatureStore(self.cache_dir)
+        steps = Parser(UCHANNEL_TOP, cache=None).index
+        key = store.key(b'content')
+
+        self.assertIsNone(store.load(key))
+        store.save(key, steps)
+        loaded = store.load(key)
+
+        self.assertEqual(steps.dtype, loaded.dtype)
+        self.assertTrue(np.array_equal(steps['comment'], loaded['comment']))
+        self.assertTrue(np.array_equal(steps['actual']['x'], loaded['actual']['x'], equal_nan=True))
+
+        store.clear()
+        self.assertIsNone(store.load(key))
+
+    def test_key(self):
+        self.assertEqual(FeatureStore.key(b'content'), FeatureStore.key(b'content'))
+        self.assertNotEqual(FeatureStore.key(b'content'), FeatureStore.key(b'content2'))
+
+    def test_parse_cache(self):
+        cache = ParseCache(FeatureStore(self.cache_dir))
+        parsed = cache.get(UCHANNEL_TOP)
+
+        # a new process starts with an empty cache but finds the file in the store
+        cache = ParseCache(FeatureStore(self.cache_dir))
+        loaded = cache.get(UCHANNEL_TOP)
+        self.assertEqual(1, cache.loaded)
+        self.assertTrue(np.array_equal(parsed['actual']['z'], loaded['actual']['z'], equal_nan=True))
+
+        cache = ParseCache(FeatureStore(self.cache_dir, rebuild=True))
+        cache.get(UCHANNEL_TOP)
+        self.assertEqual(0, cache.loaded)
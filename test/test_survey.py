@@ -1,4 +1,7 @@
 
+import json
+import os
+import tempfile
 import unittest
 
 from hps_align.survey._sensors import *
@@ -297,3 +300,102 @@ class TestSurvey2019(unittest.TestCase):
 #         sensor_origin_ball = survey.transform_sensor_to_uchannel_ballframe('top', '1', 'stereo')
 #         print('sensor in uchannel: ', sensor_origin_ball)
         # survey.print_results('survey_results_2019.xml')
+
+
+class TestVolumeTable(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey = Survey2019(json.load(json_file))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_table(self):
+        table = self.survey.volume_table()
+        self.assertIs(table, self.survey.volume_table())
+        self.assertFalse(table.flags.writeable)
+
+        volumes = self.survey.survey_volumes()
+        self.assertEqual([volume['name'] for volume in volumes], table['name'].tolist())
+        for volume, row in zip(volumes, table):
+            np.testing.assert_array_equal(volume['origin'], row['origin'])
+            np.testing.assert_array_equal(volume['basis'], row['basis'])
+
+        self.assertEqual('top ball', self.survey.get_volume('module_L2t')['parent'])
+        self.assertEqual('module_L2t', self.survey.get_volume('module_L2t_halfmodule_stereo')['parent'])
+        with self.assertRaises(KeyError):
+            self.survey.get_volume('module_L5t')
+
+    def test_override(self):
+        table = self.survey.volume_table()
+        fixture = self.survey.transition_fixture
+        pin = fixture.get_pin('axipin')
+        fixture.set_pin({'x': pin[0], 'y': pin[1] + 0.1, 'z': pin[2]}, 'axipin')
+
+        self.assertIsNot(table, self.survey.volume_table())
+        self.assertFalse(np.allclose(table['origin'], self.survey.volume_table()['origin']))
+
+    def test_print_results(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            table_file = os.path.join(tmp_dir, 'table.xml')
+            volumes_file = os.path.join(tmp_dir, 'volumes.xml')
+            self.survey.print_results(table_file)
+            write_survey_volumes(volumes_file, self.survey.survey_volumes())
+            with open(table_file) as table, open(volumes_file) as volumes:
+                lines = table.read()
+                self.assertEqual(volumes.read(), lines)
+        self.assertEqual(12 * 6, len(lines.splitlines()))
+        self.assertTrue(lines.startswith('<SurveyVolume name="module_L1t" desc="top L1 pin basis in U-channel fiducial frame:">'))
+
+
+class TestLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey_files = json.load(json_file)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_layout_2019(self):
+        self.assertEqual(12, len(LAYOUT_2019))
+        survey = Survey2019(self.survey_files)
+        self.assertEqual(('top', 0, None), survey.volume_keys()[0])
+        self.assertEqual(('bottom', 1, 'stereo'), survey.volume_keys()[-1])
+        self.assertEqual('top L1 small pin', survey.module_frame('top', 1))
+        self.assertEqual(['L1_axial_top', 'transition_fixture'], survey.volume_inputs('top', 1, 'axial'))
+        self.assertEqual(['ballframe_top', 'pinframe_top', 'fixture', 'transition_fixture'], survey.volume_inputs('top', 1))
+
+    def test_all_layers(self):
+        layout = make_layout([0, 1, 2, 3], small_pin_layers=[1, 3], sensors=())
+        survey = Survey2019(self.survey_files, layout)
+        self.assertEqual(8, len(survey.volume_table()))
+        self.assertEqual({}, survey.sensors)
+
+        for volume in ['top', 'bottom']:
+            bases, origins = survey.module_frames(volume)
+            self.assertEqual((4, 3, 3), bases.shape)
+            for layer in range(4):
+                # the frame graph composes the frames one by one
+                transform = survey.frames.transform(survey.module_frame(volume, layer), f'{volume} ball')
+                np.testing.assert_allclose(transform.basis, bases[layer], atol=1e-12)
+                np.testing.assert_allclose(transform.origin, origins[layer], atol=1e-12)
+        self.assertEqual('bottom L3 small pin', survey.module_frame('bottom', 3))
+
+    def test_missing_sensor(self):
+        survey_files = dict(self.survey_files)
+        del survey_files['L1_axial_top']
+        with self.assertWarns(UserWarning):
+            survey = Survey2019(survey_files)
+        self.assertEqual(['L1_axial_top'], survey.missing_files)
+        self.assertEqual(11, len(survey.volume_table()))
+        self.assertNotIn('axial', survey.sensors['top']['1'])
+        self.assertNotIn(('top', 1, 'axial'), survey.volume_keys())
+        # the module of the missing sensor is kept
+        self.assertEqual(Survey2019(self.survey_files).get_volume('module_L2t')['origin'].tolist(),
+                         survey.get_volume('module_L2t')['origin'].tolist())
@@ -0,0 +1,76 @@
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hps_align.survey._benchmark import benchmark_survey, PHASES
+from hps_align.survey._parser import Parser
+from hps_align.survey._survey import Survey2019
+from hps_align.survey._synthetic import generate_report, generate_survey
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SENSOR = os.path.join(REPO, 'survey_data', 'meas1', 'L1_axial_top_module3_1.txt')
+
+
+class TestGenerateReport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.report = os.path.join(self.tmp_dir, 'report.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_random(self):
+        self.assertEqual(50, generate_report(self.report, 50, seed=1))
+
+        steps = Parser.parse_file(self.report, 'lines')
+        self.assertEqual(list(range(1, 51)), steps['step'].tolist())
+        self.assertEqual(steps.tobytes(), Parser.parse_file(self.report, 'mmap').tobytes())
+        self.assertTrue(set(steps['feature']) <= {'Sphere', 'Plane', 'Point', 'Line'})
+
+        spheres = steps[steps['feature'] == 'Sphere']
+        self.assertTrue(np.all(np.isfinite(spheres['actual']['diameter'])))
+        self.assertTrue(np.all(np.abs(spheres['actual']['x'] - spheres['nominal']['x']) < 0.05))
+
+    def test_template(self):
+        template = Parser.parse_file(SENSOR, 'lines')
+        generate_report(self.report, 100, template=SENSOR)
+
+        steps = Parser.parse_file(self.report, 'lines')[:len(template)]
+        self.assertEqual(template['comment'].tolist(), steps['comment'].tolist())
+        self.assertEqual(template['feature'].tolist(), steps['feature'].tolist())
+        np.testing.assert_array_equal(template['actual']['x'], steps['nominal']['x'])
+
+
+class TestGenerateSurvey(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey_files = json.load(json_file)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_same_survey(self):
+        synthetic_files = generate_survey(self.tmp_dir, self.survey_files, 60)
+        self.assertEqual(synthetic_files['ballframe_top'], synthetic_files['pinframe_top'])
+
+        # the actual values are smeared by a few um around the measured ones
+        for real, synthetic in zip(Survey2019(self.survey_files).survey_volumes(), Survey2019(synthetic_files).survey_volumes()):
+            self.assertEqual(real['name'], synthetic['name'])
+            np.testing.assert_allclose(real['origin'], synthetic['origin'], atol=0.1)
+            np.testing.assert_allclose(real['basis'], synthetic['basis'], atol=0.01)
+
+    def test_benchmark(self):
+        result = benchmark_survey(2019, self.survey_files, repeat=1)
+        self.assertEqual(12, result['files'])
+        self.assertEqual(set(PHASES), set(result['timings']))
@@ -0,0 +1,70 @@
+
+import unittest
+
+import numpy as np
+
+from hps_align.survey._transform import RigidTransform
+from hps_align.survey._utils import make_basis
+
+
+def rotation_z(angle):
+    return np.array([[np.cos(angle), np.sin(angle), 0], [-np.sin(angle), np.cos(angle), 0], [0, 0, 1]])
+
+
+class TestRigidTransform(unittest.TestCase):
+
+    def setUp(self):
+        self.transform = RigidTransform(make_basis(np.array([1, 2, 0.5]), np.array([0, 1, 3])), np.array([10, -4, 2]))
+
+    def test_identity(self):
+        identity = RigidTransform()
+        np.testing.assert_array_equal(np.identity(3), identity.basis)
+        np.testing.assert_array_equal(np.zeros(3), identity.origin)
+        np.testing.assert_array_equal([1, 2, 3], identity.apply([1, 2, 3]))
+
+    def test_apply(self):
+        transform = RigidTransform(rotation_z(np.pi / 2), [1, 0, 0])
+        # local x axis points along parent y
+        np.testing.assert_allclose([1, 2, 0], transform.apply([2, 0, 0]), atol=1e-15)
+        np.testing.assert_allclose([0, 2, 0], transform.rotate([2, 0, 0]), atol=1e-15)
+
+    def test_unpack(self):
+        basis, origin = self.transform
+        self.assertIs(self.transform.basis, basis)
+        self.assertIs(self.transform.origin, origin)
+
+    def test_inverse(self):
+        inverse = self.transform.inverse()
+        np.testing.assert_allclose(np.linalg.inv(self.transform.basis), inverse.basis, atol=1e-15)
+
+        point = np.array([0.3, -7, 2])
+        np.testing.assert_allclose(point, inverse.apply(self.transform.apply(point)))
+        np.testing.assert_allclose(np.identity(3), (self.transform @ inverse).basis, atol=1e-15)
+        np.testing.assert_allclose(np.zeros(3), (self.transform @ inverse).origin, atol=1e-14)
+
+    def test_compose(self):
+        other = RigidTransform(rotation_z(0.3), [1, 2, 3])
+        point = np.array([0.5, 1.5, -2])
+
+        composed = self.transform @ other
+        np.testing.assert_allclose(self.transform.apply(other.apply(point)), composed.apply(point))
+        np.testing.assert_allclose(composed.basis, self.transform.compose(other).basis)
+
+    def test_points(self):
+        points = np.array([[0, 0, 0], [1, 0, 0], [0, 2, 3], [-1, 5, 2]])
+        expected = [self.transform.apply(point) for point in points]
+        np.testing.assert_allclose(expected, self.transform.apply(points))
+
+    def test_batch(self):
+        angles = np.linspace(0, np.pi, 5)
+        batch = RigidTransform(np.array([rotation_z(angle) for angle in angles]), np.arange(15).reshape(5, 3))
+        points = np.arange(15, 30).reshape(5, 3)
+
+        transformed = batch.apply(points)
+        composed = (self.transform @ batch).apply(points)
+        inverse = batch.inverse().apply(transformed)
+        for i, angle in enumerate(angles):
+            single = RigidTransform(rotation_z(angle), batch.origin[i])
+            np.testing.assert_allclose(single.apply(points[i]), transformed[i])
+            np.testing.assert_allclose(self.transform.apply(single.apply(points[i])), composed[i])
+            np.testing.assert_allclose(points[i], inverse[i])
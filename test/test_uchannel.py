@@ -52,6 +52,18 @@ class TestInit(unittest.TestCase):
         self.assertEqual(empty_dict_point, uchannel.ballframe_bot.L3_hole_ball_dict)
         self.assertEqual(empty_dict_point, uchannel.ballframe_bot.L3_slot_ball_dict)
 
+    def test_own_frames(self):
+        uchannel = UChannel()
+        other = UChannel()
+        self.assertIsNot(uchannel.ballframe_top, other.ballframe_top)
+        self.assertIsNot(uchannel.pinframe_bot.pins, other.pinframe_bot.pins)
+
+        # overriding a measurement of one uchannel leaves the bases of the other
+        basis = other.get_ball_basis('top')
+        uchannel.ballframe_top.set_ball({'x': 1, 'y': 0, 'z': 0}, 1, 'hole')
+        self.assertIs(basis, other.get_ball_basis('top'))
+        self.assertEqual(1, len(other.ballframe_top._observers))
+
 
 class TestGetBallBasis(unittest.TestCase):
 
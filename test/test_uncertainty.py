@@ -0,0 +1,77 @@
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hps_align.survey._parser import Feature
+from hps_align.survey._survey import Survey2019
+from hps_align.survey._uncertainty import (PARAMETERS, feature_sigmas, measured_features, perturb_survey,
+                                           propagate, survey_objects, volume_parameters, write_uncertainties)
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestUncertainty(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(REPO)
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(os.path.join('survey_data', '2019_file_list.json')) as json_file:
+            self.survey_files = json.load(json_file)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_objects(self):
+        survey = Survey2019(self.survey_files)
+        objects = survey_objects(survey)
+        # 2 ball frames, 2 pins, 2 base planes, 2 fixtures and 8 sensors
+        self.assertEqual(16, len(objects))
+
+        features = measured_features(survey.sensors['top']['0']['axial'])
+        self.assertEqual({'oriball_dict', 'diagball_dict', 'axiball_dict', 'ball_plane_dict', 'sensor_origin_dict',
+                          'sensor_plane_dict', 'active_edge_beam_dict', 'active_edge_away_dict', 'physical_edge_dict'}, set(features))
+        self.assertTrue(all(isinstance(feature, Feature) for feature in features.values()))
+
+        # no tolerances in the survey data files, the defaults are used
+        sigmas = feature_sigmas(survey.fixture, features['oriball_dict'], 0.01, 0.001)
+        self.assertEqual({'x': 0.01, 'y': 0.01, 'z': 0.01, 'xy_angle': 0.001, 'elevation': 0.001}, sigmas)
+
+    def test_batched_chain(self):
+        survey = Survey2019(self.survey_files)
+        nominal = survey.survey_volumes()
+        perturb_survey(survey, 5, np.random.default_rng(1), 0, 0)
+
+        for volume, draws in zip(nominal, survey.survey_volumes()):
+            self.assertEqual((5, 3, 3), draws['basis'].shape)
+            self.assertEqual((5, 12), volume_parameters(draws).shape)
+            for draw in volume_parameters(draws):
+                np.testing.assert_allclose(volume_parameters(volume), draw, atol=1e-12)
+
+    def test_covariance(self):
+        results = propagate(2019, self.survey_files, 2000, seed=1)
+        doubled = propagate(2019, self.survey_files, 2000, seed=1, position_sigma=0.01, angle_sigma=2 * np.radians(0.005))
+        self.assertEqual(12, len(results))
+
+        for result, result_doubled in zip(results, doubled):
+            covariance = result['covariance']
+            self.assertEqual((12, 12), covariance.shape)
+            np.testing.assert_allclose(covariance, covariance.T)
+            self.assertTrue(np.all(np.diag(covariance)[:3] > 0))
+            np.testing.assert_allclose(volume_parameters(result), result['mean'], atol=0.01)
+            # small perturbations propagate linearly to the origins
+            np.testing.assert_allclose(4 * np.diag(covariance)[:3], np.diag(result_doubled['covariance'])[:3], rtol=0.05)
+
+        output_file = os.path.join(self.tmp_dir, 'uncertainties.json')
+        write_uncertainties(output_file, results, 2000)
+        with open(output_file) as json_file:
+            output = json.load(json_file)
+        self.assertEqual(PARAMETERS, output['parameters'])
+        self.assertEqual(results[0]['name'], output['volumes'][0]['name'])
+        np.testing.assert_allclose(np.sqrt(np.diag(results[0]['covariance'])), output['volumes'][0]['std'])
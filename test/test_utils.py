@@ -285,5 +285,51 @@ class TestProjectToPlane(unittest.TestCase):
         self.assertAlmostEqual(0, proj[2])
 
 
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.vecs1 = rng.normal(size=(20, 3))
+        self.vecs2 = rng.normal(size=(20, 3))
+        self.vecs1[3] = 0
+        self.vecs2[5] = 0
+        self.vecs2[7] = 2 * self.vecs1[7]
+
+    def test_normalize(self):
+        normalized = utils.normalize_batch(self.vecs1)
+        for vec, norm in zip(self.vecs1, normalized):
+            np.testing.assert_allclose(utils.normalize(vec), norm)
+        np.testing.assert_array_equal([0, 0, 0], normalized[3])
+
+    def test_normal_vector(self):
+        az = np.linspace(-np.pi, np.pi, 9)
+        el = np.linspace(-np.pi/2, np.pi/2, 9)
+        normals = utils.normal_vector_batch(az, el)
+        self.assertEqual((9, 3), normals.shape)
+        for i in range(len(az)):
+            np.testing.assert_allclose(utils.normal_vector(az[i], el[i]), normals[i], atol=1e-15)
+        self.assertTrue(np.all(normals[:, 2] >= 0))
+
+    def test_orthogonalize(self):
+        orthogonalized = utils.orthogonalize_batch(self.vecs1, self.vecs2)
+        for i in range(len(self.vecs1)):
+            np.testing.assert_allclose(utils.orthogonalize(self.vecs1[i], self.vecs2[i]), orthogonalized[i], atol=1e-15)
+        np.testing.assert_array_equal(self.vecs2[3], orthogonalized[3])
+
+    def test_make_basis(self):
+        bases = utils.make_basis_batch(self.vecs1, self.vecs2)
+        self.assertEqual((20, 3, 3), bases.shape)
+        for i in range(len(self.vecs1)):
+            np.testing.assert_allclose(utils.make_basis(self.vecs1[i], self.vecs2[i]), bases[i], atol=1e-15)
+
+    def test_project_to_plane(self):
+        normals = utils.normalize_batch(self.vecs2)
+        projected = utils.project_to_plane_batch(self.vecs1, self.vecs2, normals)
+        common = utils.project_to_plane_batch(self.vecs1, self.vecs2[0], normals[0])
+        for i in range(len(self.vecs1)):
+            np.testing.assert_allclose(utils.project_to_plane(self.vecs1[i], self.vecs2[i], normals[i]), projected[i])
+            np.testing.assert_allclose(utils.project_to_plane(self.vecs1[i], self.vecs2[0], normals[0]), common[i])
+
+
 if __name__ == '__main__':
     unittest.main()
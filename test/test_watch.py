@@ -0,0 +1,72 @@
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from hps_align.survey._watch import SurveyWatcher, volume_delta
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+class TestVolumeDelta(unittest.TestCase):
+
+    def test_delta(self):
+        old = {'origin': np.array([1., 2., 3.]), 'basis': np.identity(3)}
+        angle = 0.01
+        new = {'origin': np.array([1., 2., 3.5]),
+               'basis': np.array([[np.cos(angle), np.sin(angle), 0], [-np.sin(angle), np.cos(angle), 0], [0, 0, 1]])}
+
+        shift, rotation = volume_delta(old, new)
+        self.assertAlmostEqual(0.5, shift)
+        self.assertAlmostEqual(angle, rotation)
+        self.assertEqual((0, 0), volume_delta(old, old))
+
+
+class TestSurveyWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(os.path.join(REPO, 'survey_data', '2019_file_list.json')) as json_file:
+            self.file_list = json.load(json_file)
+        self.survey_files = {key: os.path.join(self.tmp_dir, key + '.txt') for key in self.file_list}
+        self.output_file = os.path.join(self.tmp_dir, 'results.xml')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def measure(self, *keys):
+        for key in keys:
+            shutil.copy(os.path.join(REPO, self.file_list[key]), self.survey_files[key])
+
+    def test_campaign(self):
+        watcher = SurveyWatcher(2019, self.tmp_dir, self.survey_files, self.output_file, debounce=0.5)
+
+        # reports of the uchannel, all pin frames can be derived without the sensors
+        self.measure('ballframe_top', 'ballframe_bottom', 'pinframe_top', 'pinframe_bottom', 'fixture', 'transition_fixture')
+        self.assertIsNone(watcher.poll(now=0))
+        self.assertIsNone(watcher.poll(now=0.2))
+        changes = watcher.poll(now=0.6)
+        self.assertEqual(['module_L1t', 'module_L2t', 'module_L1b', 'module_L2b'], [name for name, _, _ in changes])
+        self.assertIsNone(watcher.poll(now=2))
+
+        # first sensor report
+        self.measure('L0_axial_top')
+        self.assertIsNone(watcher.poll(now=3))
+        self.assertEqual([('module_L1t_halfmodule_axial', None, None)], watcher.poll(now=4))
+
+        # re-measured sensor, diagball moved by 10 um
+        with open(self.survey_files['L0_axial_top'], 'rb') as file:
+            content = file.read()
+        with open(self.survey_files['L0_axial_top'], 'wb') as file:
+            file.write(content.replace(b'+309.57221', b'+309.58221', 1))
+        self.assertIsNone(watcher.poll(now=5))
+        (name, shift, angle), = watcher.poll(now=6)
+        self.assertEqual('module_L1t_halfmodule_axial', name)
+        self.assertGreater(shift + angle, 0)
+
+        with open(self.output_file) as file:
+            self.assertEqual(5, file.read().count('<SurveyVolume '))